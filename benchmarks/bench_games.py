@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares the pitch resolution of get_games and get_game with the row-wise implementation it replaced.
+
+    python benchmarks/bench_games.py --seasons 10 --games-per-season 380
+    python benchmarks/bench_games.py --fixture recorded_games.json.gz
+
+Both implementations run on the same payload; the script fails if their outputs differ.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+import legacy
+from pypff import pff
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type = int, default = 10, help = 'number of seasons of the synthetic competition')
+    parser.add_argument('--games-per-season', type = int, default = 380)
+    parser.add_argument('--fixture', help = 'recorded games response to use instead of a synthetic competition')
+    parser.add_argument('--games', type = int, default = 20, help = 'number of games to compare get_game on')
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+
+    if args.fixture:
+        data = fixtures.load_fixture(args.fixture)
+    else:
+        data = fixtures.games(1, args.seasons, args.games_per_season)
+
+    legacy_time, expected = best_of(args.repeat, legacy.games, data)
+    new_time, result = best_of(args.repeat, pff._games_frame, data['competition'])
+    pd.testing.assert_frame_equal(expected, result)
+    print(f"{'function':>10} {'games':>8} {'legacy (s)':>12} {'new (s)':>10} {'speedup':>8}")
+    print(f"{'get_games':>10} {len(result):>8} {legacy_time:>12.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x")
+
+    # get_game on a sample of the games, each with the competition it belongs to
+    competition = {'id': data['competition']['id'], 'name': data['competition']['name']}
+    games = [{'game': dict(game, competition = competition)} for game in data['competition']['games'][:args.games]]
+    legacy_time = new_time = 0.0
+    for game in games:
+        timing, expected = best_of(args.repeat, legacy.game, game)
+        legacy_time += timing
+        timing, result = best_of(args.repeat, pff._game_frame, game['game'])
+        new_time += timing
+        pd.testing.assert_frame_equal(expected, result)
+    print(f"{'get_game':>10} {len(games):>8} {legacy_time:>12.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares pypff.lineups with per-game loops over the On-The-Ball rows, on several seasons of games.
+
+    python benchmarks/bench_lineups.py --seasons 3 --games-per-season 380
+    python benchmarks/bench_lineups.py --distinct 40 --events 3000
+
+Synthetic games are expensive to make, so --distinct games are generated and repeated
+under new game ids to fill the seasons. The script fails if the minutes played differ.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+import legacy
+from pypff import lineups
+from pypff import pff
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def otb_seasons(seasons, games_per_season, distinct, events):
+    '''
+    Returns the On-The-Ball rows of seasons * games_per_season games, made of distinct synthetic games.
+    '''
+    games = [pff._otb_frame(game_id, fixtures.game_events(game_id, events)['game']['gameEvents']) for game_id in range(1, distinct + 1)]
+    frames = []
+    for season in range(seasons):
+        for number in range(games_per_season):
+            game = games[(season * games_per_season + number) % distinct].copy()
+            game['gameId'] = 1000000 + (2010 + season) * 1000 + number
+            frames.append(game)
+    return pd.concat(frames, ignore_index = True)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type = int, default = 3)
+    parser.add_argument('--games-per-season', type = int, default = 380)
+    parser.add_argument('--distinct', type = int, default = 20, help = 'number of distinct synthetic games')
+    parser.add_argument('--events', type = int, default = 1800, help = 'events per synthetic game')
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+
+    df = otb_seasons(args.seasons, args.games_per_season, args.distinct, args.events)
+    print(f'{df["gameId"].nunique()} games, {len(df)} rows')
+
+    legacy_time, expected = best_of(1, legacy.minutes_played, df)
+    new_time, result = best_of(args.repeat, lineups.minutes_played, df)
+    result = result[['gameId', 'teamId', 'playerId', 'minutes']].sort_values(['gameId', 'teamId', 'playerId']).reset_index(drop = True)
+    pd.testing.assert_frame_equal(expected, result, check_dtype = False)
+    assert np.allclose(expected['minutes'], result['minutes'])
+
+    spells = lineups.intervals(df)
+    intervals_time, _ = best_of(args.repeat, lineups.intervals, df)
+    lineups_time, _ = best_of(args.repeat, lineups.lineups, df, None, spells)
+    print(f"{'stage':>16} {'time (s)':>10} {'rows/s':>12}")
+    print(f"{'legacy minutes':>16} {legacy_time:>10.3f} {len(df) / legacy_time:>12.0f}")
+    print(f"{'minutes_played':>16} {new_time:>10.3f} {len(df) / new_time:>12.0f}   {legacy_time / new_time:.1f}x")
+    print(f"{'intervals':>16} {intervals_time:>10.3f} {len(df) / intervals_time:>12.0f}")
+    print(f"{'lineups':>16} {lineups_time:>10.3f} {len(df) / lineups_time:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares the flattening of get_otb_data with the row-wise implementation it replaced.
+
+    python benchmarks/bench_otb_data.py --games 5
+    python benchmarks/bench_otb_data.py --fixture recorded_game.json.gz --game-id 1234
+
+Both implementations run on the same payload; the script fails if their outputs differ.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+import legacy
+from pypff import pff
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type = int, default = 3, help = 'number of synthetic games')
+    parser.add_argument('--events', type = int, default = 1800, help = 'events per synthetic game')
+    parser.add_argument('--fixture', help = 'recorded gameEvents response to use instead of synthetic games')
+    parser.add_argument('--game-id', type = int, default = 0, help = 'game id of the recorded response')
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+
+    if args.fixture:
+        payloads = [(args.game_id, fixtures.load_fixture(args.fixture))]
+    else:
+        payloads = [(game_id, fixtures.game_events(game_id, args.events)) for game_id in range(1, args.games + 1)]
+
+    total_legacy = total_new = 0.0
+    print(f"{'game':>8} {'rows':>8} {'legacy (s)':>12} {'new (s)':>10} {'speedup':>8}")
+    for game_id, data in payloads:
+        legacy_time, expected = best_of(args.repeat, legacy.otb_data, game_id, data)
+        new_time, result = best_of(args.repeat, pff._otb_frame, game_id, data['game']['gameEvents'])
+        pd.testing.assert_frame_equal(expected, result)
+        total_legacy += legacy_time
+        total_new += new_time
+        print(f'{game_id:>8} {len(result):>8} {legacy_time:>12.3f} {new_time:>10.3f} {legacy_time / new_time:>7.1f}x')
+    print(f"{'total':>8} {'':>8} {total_legacy:>12.3f} {total_new:>10.3f} {total_legacy / total_new:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
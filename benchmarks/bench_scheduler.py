@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs a bulk get_game_events_games job and interactive get_game lookups with the same
+API key against a rate limited stand-in API, without and with a scheduler.Scheduler.
+
+    python benchmarks/bench_scheduler.py
+    python benchmarks/bench_scheduler.py --rate-limit 20 --games 120 --workers 8
+
+Without a scheduler the workers run into the rate limit, wait for the Retry-After of
+their own answers and hold up the lookups. With a scheduler at the rate limit no
+request is refused, and the lookups go ahead of the bulk job.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypff import instrument
+from pypff import pff
+from pypff import scheduler
+
+def start_server(args):
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_server.py'), '--port', '0',
+               '--latency', str(args.latency), '--events', str(args.events), '--games-per-season', str(args.games),
+               '--rate-limit', str(args.rate_limit)]
+    server = subprocess.Popen(command, stdout = subprocess.PIPE, text = True)
+    return server, server.stdout.readline().split()[-1]
+
+def run(url, args, shared):
+    '''
+    Runs the bulk job and the lookups at the same time and returns their measures.
+    '''
+    bulk, interactive = pff.PFFClient(url, 'key', scheduler = shared), pff.PFFClient(url, 'key', scheduler = shared)
+    game_ids = [3010000 + number for number in range(1, args.games + 1)]
+    latencies, done = [], threading.Event()
+
+    def lookups():
+        with scheduler.priority('interactive'):
+            number = 0
+            while not done.is_set():
+                start = time.perf_counter()
+                interactive.get_game(game_ids[number % len(game_ids)], return_type = 'records')
+                latencies.append(time.perf_counter() - start)
+                number += 1
+                done.wait(args.interval)
+
+    with instrument.Summary() as summary:
+        thread = threading.Thread(target = lookups)
+        thread.start()
+        start = time.perf_counter()
+        with scheduler.priority('bulk'):
+            # Few fields keep the job bound by requests rather than by decoding
+            _, failures = bulk.get_game_events_games(game_ids, max_workers = args.workers, return_failures = True, fields = ['startTime', 'gameEventType'],
+                                                     return_type = 'records')
+        wall = time.perf_counter() - start
+        done.set()
+        thread.join()
+    bulk.close()
+    interactive.close()
+
+    requests = summary.requests
+    latencies = sorted(latencies)
+    return {'bulk wall (s)': wall, 'games/s': len(game_ids) / wall, 'failed games': len(failures),
+            'requests': len(requests), 'refused (429)': sum(event['retries'] for event in requests) + sum(event['status'] == 429 for event in requests),
+            'lookups': len(latencies), 'lookup p50 (ms)': 1000 * statistics.median(latencies),
+            'lookup p95 (ms)': 1000 * latencies[int(0.95 * (len(latencies) - 1))], 'lookup max (ms)': 1000 * latencies[-1]}
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate-limit', type = float, default = 20.0, help = 'requests per second of the API key')
+    parser.add_argument('--games', type = int, default = 120, help = 'games of the bulk job')
+    parser.add_argument('--workers', type = int, default = 8, help = 'max_workers of the bulk job')
+    parser.add_argument('--interval', type = float, default = 0.2, help = 'seconds between lookups')
+    parser.add_argument('--latency', type = float, default = 20.0, help = 'milliseconds the stand-in waits before every answer')
+    parser.add_argument('--events', type = int, default = 300, help = 'events of a synthetic game')
+    args = parser.parse_args()
+
+    server, url = start_server(args)
+    try:
+        # The stand-in generates its answers once, so that both runs measure the same work
+        warmup = pff.PFFClient(url, 'warmup', scheduler = scheduler.Scheduler(rate = args.rate_limit))
+        warmup.get_game_events_games([3010000 + number for number in range(1, args.games + 1)], max_workers = 4, fields = ['startTime', 'gameEventType'],
+                                     return_type = 'raw')
+        results = {'no scheduler': run(url, args, None)}
+        time.sleep(2)
+        shared = scheduler.Scheduler(rate = args.rate_limit)
+        results['scheduler'] = run(url, args, shared)
+    finally:
+        server.terminate()
+        server.wait()
+
+    names = list(results['scheduler'])
+    print(f'{"":16}' + ''.join(f'{name:>17}' for name in names))
+    for mode, result in results.items():
+        print(f'{mode:16}' + ''.join(f'{result[name]:17.1f}' for name in names))
+    metrics = shared.metrics()
+    print('scheduler: max queued %d, mean wait %.3f s, p95 wait %.3f s, throttled %d' % (metrics['max_queued'], metrics['mean_wait'], metrics['p95_wait'],
+                                                                                        metrics['throttled']))
+    for level, values in metrics['priorities'].items():
+        print('  %-12s %5d requests, mean wait %.3f s, max wait %.3f s' % (level, values['requests'], values['mean_wait'], values['max_wait']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares pypff.sequences with a row-by-row loop over the On-The-Ball rows, on several seasons
+of games, and times the season split in chunks of games over a process pool.
+
+    python benchmarks/bench_sequences.py --seasons 3 --games-per-season 380
+    python benchmarks/bench_sequences.py --chunks 8 --workers 4
+
+The script fails if the sequences differ from those of the loop, or if the chunks give a
+different result than the whole season.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import legacy
+from bench_lineups import best_of
+from bench_lineups import otb_seasons
+from pypff import sequences
+
+def in_chunks(executor, chunks):
+    return pd.concat(executor.map(sequences.sequences, chunks), ignore_index = True)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type = int, default = 3)
+    parser.add_argument('--games-per-season', type = int, default = 380)
+    parser.add_argument('--distinct', type = int, default = 20, help = 'number of distinct synthetic games')
+    parser.add_argument('--events', type = int, default = 1800, help = 'events per synthetic game')
+    parser.add_argument('--chunks', type = int, default = 8, help = 'chunks of games for the process pool')
+    parser.add_argument('--workers', type = int, default = os.cpu_count())
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+
+    df = otb_seasons(args.seasons, args.games_per_season, args.distinct, args.events)
+    print(f'{df["gameId"].nunique()} games, {len(df)} rows')
+
+    legacy_time, expected = best_of(1, legacy.sequences, df)
+    new_time, result = best_of(args.repeat, sequences.sequences, df)
+    pd.testing.assert_frame_equal(expected, result[expected.columns], check_dtype = False)
+    assign_time, _ = best_of(args.repeat, sequences.assign, df)
+    possessions_time, _ = best_of(args.repeat, sequences.possessions, df)
+
+    # Whole games per chunk, so that every chunk numbers its games as the whole season does
+    games = df['gameId'].drop_duplicates()
+    chunk_of = pd.Series(range(len(games)), index = games.to_numpy()) * args.chunks // len(games)
+    chunks = [chunk for _, chunk in df.groupby(df['gameId'].map(chunk_of))]
+    with ProcessPoolExecutor(args.workers) as executor:
+        in_chunks(executor, chunks)
+        chunks_time, chunked = best_of(args.repeat, in_chunks, executor, chunks)
+    pd.testing.assert_frame_equal(result, chunked)
+
+    print(f"{len(result)} sequences, {result['possession'].groupby(result['gameId']).max().sum()} possessions")
+    print(f"{'stage':>22} {'time (s)':>10} {'rows/s':>12}")
+    print(f"{'legacy sequences':>22} {legacy_time:>10.3f} {len(df) / legacy_time:>12.0f}")
+    print(f"{'sequences':>22} {new_time:>10.3f} {len(df) / new_time:>12.0f}   {legacy_time / new_time:.1f}x")
+    print(f"{'possessions':>22} {possessions_time:>10.3f} {len(df) / possessions_time:>12.0f}")
+    print(f"{'assign':>22} {assign_time:>10.3f} {len(df) / assign_time:>12.0f}")
+    print(f"{'sequences, ' + str(len(chunks)) + ' chunks':>22} {chunks_time:>10.3f} {len(df) / chunks_time:>12.0f}   {args.workers} workers")
+
+if __name__ == '__main__':
+    main()
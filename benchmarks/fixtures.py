@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic PFF FC API responses for the benchmarks.
+
+The generators return the decoded 'data' member of a response, shaped like the
+answers of the live API. They are seeded, so every run produces the same
+payloads. A response recorded from the live API can be used instead through
+load_fixture().
+"""
+import gzip
+import json
+import random
+
+PERIOD_KICKOFFS = ['FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF']
+POSSESSION_TYPES = ['PA', 'PA', 'PA', 'PA', 'BC', 'BC', 'CH', 'CR', 'SH', 'CL', 'RE', 'IT', 'TC']
+SUB_EVENT_FIELDS = {'PA': 'passingEvent', 'BC': 'ballCarryEvent', 'CH': 'challengeEvent', 'CR': 'crossEvent',
+                    'SH': 'shootingEvent', 'CL': 'clearanceEvent', 'RE': 'reboundEvent'}
+
+def load_fixture(path):
+    '''
+    Loads a recorded response, i.e. the body returned by the API saved as (gzipped) JSON.
+    '''
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding = 'utf-8') as f:
+        payload = json.load(f)
+    return payload.get('data', payload)
+
+def _ref(player_id):
+    return {'id': str(player_id), 'nickname': 'Player ' + str(player_id)}
+
+def _team_players(team_id):
+    return [team_id * 100 + i for i in range(1, 19)]
+
+def _locations(rng, players):
+    return [{'eventModule': 'OTB', 'name': 'Player ' + str(p), 'x': round(rng.uniform(-52.5, 52.5), 2), 'y': round(rng.uniform(-34, 34), 2)}
+            for p in players]
+
+def _sub_event(rng, possession_type, actor, opponents):
+    sub = {'advantageType': rng.choice([None, 'N', 'A']), 'insertedAt': '2022-11-20T16:00:00Z', 'updatedAt': '2022-11-21T10:00:00Z',
+           'pressurePlayer': _ref(rng.choice(opponents)) if rng.random() < 0.3 else None,
+           'betterOptionPlayer': None, 'blockerPlayer': None, 'missedTouchPlayer': None}
+    if possession_type == 'PA':
+        sub.update({'passerPlayer': _ref(actor), 'receiverPlayer': _ref(actor + 1), 'targetPlayer': _ref(actor + 1),
+                    'passType': rng.choice(['S', 'C', 'H']), 'passOutcomeType': rng.choice(['C', 'C', 'C', 'D', 'B']),
+                    'passBodyType': rng.choice(['R', 'L', 'HE']), 'ballHeightType': rng.choice(['G', 'L', 'A'])})
+    elif possession_type == 'SH':
+        sub.update({'shooterPlayer': _ref(actor), 'saverPlayer': _ref(opponents[0]), 'shotType': rng.choice(['S', 'B']),
+                    'shotOutcomeType': rng.choice(['G', 'O', 'S', 'B']), 'shotBodyType': rng.choice(['R', 'L', 'HE'])})
+    elif possession_type == 'CR':
+        sub.update({'crosserPlayer': _ref(actor), 'crossOutcomeType': rng.choice(['C', 'D', 'B']), 'crossType': 'D', 'crossZoneType': 'A'})
+    elif possession_type == 'CH':
+        sub.update({'challengerPlayer': _ref(actor), 'challengeWinnerPlayer': _ref(rng.choice([actor] + opponents[:2])),
+                    'ballCarrierPlayer': _ref(actor), 'challengeType': rng.choice(['D', 'G', 'A']), 'challengeOutcomeType': rng.choice(['B', 'C', 'D'])})
+    elif possession_type == 'CL':
+        sub.update({'clearancePlayer': _ref(actor), 'clearanceOutcomeType': rng.choice(['B', 'D', 'P']), 'clearanceBodyType': 'HE'})
+    elif possession_type == 'RE':
+        sub.update({'rebounderPlayer': _ref(actor), 'reboundOutcomeType': rng.choice(['D', 'P']), 'reboundBodyType': 'R'})
+    elif possession_type == 'BC':
+        sub.update({'ballCarrierPlayer': _ref(actor), 'defenderPlayer': _ref(opponents[0]), 'carryType': rng.choice(['C', 'D', 'T']),
+                    'ballCarryOutcome': rng.choice(['R', 'L'])})
+    return sub
+
+def game_events(game_id, n_events = 1800, seed = 0):
+    '''
+    Returns the 'data' member of a gameEvents response for one game, i.e.
+    {'game': {'id': ..., 'gameEvents': [...]}}, with about n_events events over two periods.
+    '''
+    rng = random.Random(seed * 100003 + game_id)
+    home, away = 2 * game_id % 40 + 1, (2 * game_id + 1) % 40 + 1
+    teams = {home: _team_players(home), away: _team_players(away)}
+    on_pitch = {team: players[:11] for team, players in teams.items()}
+    bench = {team: players[11:] for team, players in teams.items()}
+
+    events = []
+    next_id = game_id * 100000
+    next_possession_id = game_id * 1000000
+    per_period = n_events // 2
+
+    def base(event_type, start, team_id, player_id):
+        nonlocal next_id
+        next_id += 1
+        return {'id': str(next_id), 'advantageType': None, 'bodyType': rng.choice([None, 'R', 'L', 'HE']), 'duration': round(rng.uniform(0, 3), 3),
+                'earlyDistribution': False, 'endTime': round(start + rng.uniform(0.1, 3), 3), 'endType': None,
+                'formattedGameClock': '%02d:%02d' % divmod(int(start) % 6000, 60), 'gameClock': round(start - 10, 3), 'gameEventType': event_type,
+                'heightType': None, 'initialTouchType': rng.choice([None, 'S', 'P']), 'insertedAt': '2022-11-20T16:00:00Z',
+                'otherPlayer': None, 'outType': None, 'player': _ref(player_id) if player_id else None, 'playerOff': None, 'playerOffType': None,
+                'playerOn': None, 'pressurePlayer': None, 'pressureType': None, 'scoreValue': None, 'setpieceType': rng.choice(['O', 'O', 'O', 'C', 'F', 'T']),
+                'startTime': round(start, 3), 'subType': None, 'team': {'id': str(team_id), 'name': 'Team ' + str(team_id)} if team_id else None,
+                'touches': rng.randint(0, 3), 'touchesInBox': 0, 'updatedAt': '2022-11-21T10:00:00Z', 'videoAngleType': 'B', 'video': {'id': str(game_id)},
+                'videoMissing': False, 'videoUrl': None, 'defenderLocations': [], 'offenderLocations': [], 'possessionEvents': []}
+
+    for period in range(2):
+        clock = 10.0 + period * 3600.0
+        team = home if period == 0 else away
+        kickoff = base(PERIOD_KICKOFFS[period], clock, team, on_pitch[team][9])
+        events.append(kickoff)
+        for _ in range(per_period):
+            clock += rng.uniform(0.5, 5.0)
+            if rng.random() < 0.25:
+                team = away if team == home else home
+            opponent = away if team == home else home
+            draw = rng.random()
+            if draw < 0.004 and bench[team]:
+                # Substitution, without possession events
+                player_off, player_on = rng.choice(on_pitch[team]), bench[team].pop()
+                on_pitch[team][on_pitch[team].index(player_off)] = player_on
+                event = base('SUB', clock, team, None)
+                event.update({'playerOn': _ref(player_on), 'playerOff': _ref(player_off), 'playerOffType': rng.choice([None, 'R', 'I'])})
+                events.append(event)
+                continue
+            actor = rng.choice(on_pitch[team])
+            if draw < 0.05:
+                event = base('OUT', clock, team, actor)
+                event.update({'outType': rng.choice(['H', 'A', 'T', 'G', 'C']), 'endType': rng.choice(['T', 'G', 'C'])})
+                events.append(event)
+                continue
+            event = base('OTB' if draw > 0.06 else 'VID', clock, team, actor)
+            event['offenderLocations'] = _locations(rng, on_pitch[team])
+            event['defenderLocations'] = _locations(rng, on_pitch[opponent])
+            for slot in range(rng.choice([1, 1, 1, 2, 2, 3])):
+                next_possession_id += 1
+                possession_type = rng.choice(POSSESSION_TYPES)
+                possession_event = {'duration': round(rng.uniform(0, 2), 3), 'endTime': round(clock + 1, 3),
+                                    'formattedGameClock': event['formattedGameClock'], 'gameClock': event['gameClock'],
+                                    'id': str(next_possession_id), 'insertedAt': '2022-11-20T16:00:00Z', 'possessionEventType': possession_type,
+                                    'startTime': round(clock + slot * 0.01, 3), 'updatedAt': '2022-11-21T10:00:00Z', 'videoUrl': None,
+                                    'ballCarryEvent': None, 'challengeEvent': None, 'clearanceEvent': None, 'crossEvent': None,
+                                    'passingEvent': None, 'reboundEvent': None, 'shootingEvent': None, 'fouls': [], 'grades': []}
+                if possession_type in SUB_EVENT_FIELDS:
+                    possession_event[SUB_EVENT_FIELDS[possession_type]] = _sub_event(rng, possession_type, actor, on_pitch[opponent])
+                if rng.random() < 0.03:
+                    possession_event['fouls'].append({'badCall': False, 'correctDecision': True, 'culpritPlayer': _ref(rng.choice(on_pitch[opponent])),
+                                                      'foulOutcomeType': rng.choice(['F', 'Y', 'R']), 'foulType': 'S', 'insertedAt': '2022-11-20T16:00:00Z',
+                                                      'potentialOffenseType': None, 'sequence': 1, 'updatedAt': '2022-11-21T10:00:00Z', 'var': False,
+                                                      'varCulpritPlayer': None, 'varOutcomeType': None, 'varPotentialOffenseType': None,
+                                                      'varReasonType': None, 'victimPlayer': _ref(actor)})
+                if rng.random() < 0.1:
+                    possession_event['grades'].append({'gradeLabel': 'Pass', 'gradeStyle': 'S', 'gradeType': 'PA', 'insertedAt': '2022-11-20T16:00:00Z',
+                                                       'playerGrade': round(rng.uniform(-2, 2), 1), 'player': _ref(actor), 'updatedAt': '2022-11-21T10:00:00Z'})
+                event['possessionEvents'].append(possession_event)
+            events.append(event)
+        events.append(base('END', clock + 1.0, None, None))
+
+    # The API does not return the events in chronological order
+    rng.shuffle(events)
+    return {'game': {'id': str(game_id), 'gameEvents': events}}
+
+def _stadium(rng, stadium_id, first_season, last_season):
+    # A stadium whose pitch was resized every few seasons, the current pitch has no end date
+    pitches, season = [], first_season
+    while season <= last_season:
+        until = season + rng.randint(1, 4)
+        pitches.append({'id': str(stadium_id * 100 + len(pitches)), 'length': rng.choice([100, 102, 105, 105, 110]),
+                        'width': rng.choice([64, 65, 68, 68, 70]), 'startDate': '%d-07-01' % season,
+                        'endDate': '%d-06-30' % until if until <= last_season else rng.choice([None, ''])})
+        season = until
+    rng.shuffle(pitches)
+    return {'id': str(stadium_id), 'name': 'Stadium ' + str(stadium_id), 'pitches': pitches}
+
+def _game(rng, game_id, season, stadium, home, away):
+    kit = {'name': 'Home', 'primaryColor': '#ffffff', 'primaryTextColor': '#000000', 'secondaryColor': '#000000', 'secondaryTextColor': '#ffffff'}
+    # Seasons run from August to May
+    month = rng.choice([8, 9, 10, 11, 12, 1, 2, 3, 4, 5])
+    date = '%d-%02d-%02dT%02d:00:00' % (season if month >= 8 else season + 1, month, rng.randint(1, 28), rng.choice([12, 15, 18, 20]))
+    return {'id': str(game_id), 'date': date, 'season': str(season), 'week': rng.randint(1, 38),
+            'homeTeam': {'id': str(home), 'name': 'Team ' + str(home), 'shortName': 'T' + str(home)},
+            'awayTeam': {'id': str(away), 'name': 'Team ' + str(away), 'shortName': 'T' + str(away)},
+            'startPeriod1': 10.0, 'endPeriod1': 2800.0, 'startPeriod2': 3600.0, 'endPeriod2': 6500.0, 'period1': 1, 'period2': 2,
+            'halfPeriod': 1, 'homeTeamStartLeft': rng.random() < 0.5, 'homeTeamKit': dict(kit), 'awayTeamKit': dict(kit, name = 'Away'),
+            'stadium': stadium, 'videos': [{'id': str(game_id), 'fps': 29.97, 'videoUrl': None}]}
+
+def games(competition_id, n_seasons = 10, games_per_season = 380, n_teams = 20, seed = 0):
+    '''
+    Returns the 'data' member of a games response for one competition, i.e.
+    {'competition': {'id': ..., 'name': ..., 'games': [...]}}, over n_seasons seasons
+    starting in 2010, with stadiums whose pitch dimensions change between seasons.
+    '''
+    rng = random.Random(seed * 100003 + competition_id)
+    first, last = 2010, 2010 + n_seasons - 1
+    stadiums = {team: _stadium(rng, team, first, last) for team in range(1, n_teams + 1)}
+    games = []
+    for season in range(first, last + 1):
+        for number in range(games_per_season):
+            home, away = rng.sample(range(1, n_teams + 1), 2)
+            games.append(_game(rng, competition_id * 1000000 + season * 1000 + number, season, stadiums[home], home, away))
+    return {'competition': {'id': str(competition_id), 'name': 'Competition ' + str(competition_id), 'games': games}}
+
+def game(competition_id, game_id, n_seasons = 10, seed = 0):
+    '''
+    Returns the 'data' member of a game response, i.e. {'game': {...}}, for one of the
+    games of games(competition_id, n_seasons).
+    '''
+    data = games(competition_id, n_seasons, seed = seed)['competition']
+    for item in data['games']:
+        if item['id'] == str(game_id):
+            return {'game': dict(item, competition = {'id': data['id'], 'name': data['name']})}
+    raise KeyError(game_id)
+
+def _player(rng, player_id):
+    country = lambda: {'id': str(rng.randint(1, 60)), 'country': 'Country ' + str(rng.randint(1, 60))}
+    return {'id': str(player_id), 'firstName': 'First' + str(player_id), 'lastName': 'Last' + str(player_id), 'nickname': 'Player ' + str(player_id),
+            'positionGroupType': rng.choice(['GK', 'D', 'M', 'F']), 'nationality': country(), 'secondNationality': country() if rng.random() < 0.2 else None,
+            'weight': rng.choice([None, round(rng.uniform(60, 95), 1)]), 'height': round(rng.uniform(165, 200), 1), 'dob': '19%02d-%02d-%02d' % (rng.randint(80, 99), rng.randint(1, 12), rng.randint(1, 28)),
+            'gender': 'M', 'countryOfBirth': country(), 'euMember': rng.random() < 0.5, 'transfermarktPlayerId': rng.choice([None, rng.randint(1000, 999999)])}
+
+def players_competition(competition_id, n_games = 380, n_teams = 20, squad_size = 30, seed = 0):
+    '''
+    Returns the 'data' member of a players-of-competition response, i.e.
+    {'competition': {'games': [{'rosters': [{'player': {...}}, ...]}, ...]}}. Rosters differ
+    in length, players transfer between teams, and some games have no roster yet.
+    '''
+    rng = random.Random(seed * 100003 + competition_id)
+    squads = {team: [team * 1000 + i for i in range(squad_size)] for team in range(1, n_teams + 1)}
+    players = {}
+    games = []
+    for number in range(n_games):
+        if rng.random() < 0.03:
+            games.append({'rosters': []})
+            continue
+        if rng.random() < 0.05:
+            # A transfer, the player shows up in the squad of another team from now on
+            team_from, team_to = rng.sample(range(1, n_teams + 1), 2)
+            squads[team_to].append(squads[team_from].pop(rng.randrange(len(squads[team_from]))))
+        rosters = []
+        for team in rng.sample(range(1, n_teams + 1), 2):
+            for player_id in rng.sample(squads[team], rng.randint(16, 20)):
+                if player_id not in players:
+                    players[player_id] = _player(rng, player_id)
+                rosters.append({'player': players[player_id]})
+        games.append({'rosters': rosters})
+    return {'competition': {'games': games}}
+
+def competitions(n_competitions = 5, n_seasons = 3):
+    '''
+    Returns the 'data' member of a competitions response, i.e. {'competitions': [...]}.
+    '''
+    return {'competitions': [{'id': str(competition_id), 'name': 'Competition ' + str(competition_id),
+                              'games': [{'id': str(competition_id * 1000000 + season * 1000 + number), 'season': str(season)}
+                                        for season in range(2010, 2010 + n_seasons) for number in range(10)]}
+                             for competition_id in range(1, n_competitions + 1)]}
+
+def team(team_id, seed = 0):
+    '''
+    Returns one team as it appears in a teams response.
+    '''
+    rng = random.Random(seed * 100003 + team_id)
+    kit = {'id': str(team_id * 10), 'name': 'Home', 'primaryColor': '#ffffff', 'secondaryColor': '#000000',
+           'primaryTextColor': '#000000', 'secondaryTextColor': '#ffffff'}
+    return {'id': str(team_id), 'name': 'Team ' + str(team_id), 'shortName': 'T' + str(team_id), 'country': 'Country',
+            'homeGames': [{'id': str(team_id * 1000 + i)} for i in range(19)], 'awayGames': [{'id': str(team_id * 1000 + 19 + i)} for i in range(19)],
+            'kits': [kit, dict(kit, id = str(team_id * 10 + 1), name = 'Away')], 'homeStadium': _stadium(rng, team_id, 2010, 2020)}
+
+def teams(n_teams = 20):
+    '''
+    Returns the 'data' member of a teams response, i.e. {'teams': [...]}.
+    '''
+    return {'teams': [team(team_id) for team_id in range(1, n_teams + 1)]}
+
+def player(player_id, n_games = 30, seed = 0):
+    '''
+    Returns one player with the games of its rosters, as in a player response.
+    '''
+    rng = random.Random(seed * 100003 + player_id)
+    return dict(_player(rng, player_id), rosters = [{'game': {'id': str(player_id * 100 + i)}, 'started': rng.random() < 0.7} for i in range(n_games)])
+
+def roster(game_id, seed = 0):
+    '''
+    Returns the rosters of one game, as in a roster response, with the players in full.
+    '''
+    rng = random.Random(seed * 100003 + game_id)
+    home, away = 2 * game_id % 40 + 1, (2 * game_id + 1) % 40 + 1
+    return [{'player': _player(rng, player_id), 'positionGroupType': rng.choice(['GK', 'D', 'M', 'F']), 'shirtNumber': number + 1,
+             'team': {'id': str(team_id), 'name': 'Team ' + str(team_id)}, 'started': number < 11}
+            for team_id in (home, away) for number, player_id in enumerate(_team_players(team_id))]
+
+def scoring_events(competition_id, season, n_games = 380, seed = 0):
+    '''
+    Returns the 'data' member of a scoring events response, i.e. {'scoringEvents': [...]}.
+    '''
+    rng = random.Random(seed * 100003 + competition_id)
+    events = []
+    for number in range(n_games):
+        game_id = competition_id * 1000000 + int(season) * 1000 + number
+        for goal in range(rng.choice([0, 1, 1, 2, 2, 3, 4, 5])):
+            start = rng.uniform(10, 6500)
+            events.append({'id': str(game_id * 100 + goal), 'gameEventType': rng.choice(['OUT', 'OUT', 'OUT', 'OTB']), 'gameId': str(game_id),
+                           'period': 1 if start < 3600 else 2, 'startTime': round(start, 3), 'formattedGameClock': '%02d:%02d' % divmod(int(start) % 6000, 60),
+                           'outType': rng.choice(['H', 'A'])})
+    return {'scoringEvents': events}
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The transformations of pypff before they were vectorized, kept as a reference
+for the benchmarks. Each function takes the decoded 'data' member of a response.
+"""
+import pandas as pd
+import numpy as np
+
+def otb_data(game_id, data):
+    '''
+    The row-wise flattening of get_otb_data.
+    '''
+    df = pd.DataFrame(data['game']['gameEvents'])
+    df = df.rename(columns = {'id':'gameEventId','playerOffType':'offType'})
+    df.insert(0, 'gameId', [game_id] * len(df))
+    df = df.sort_values('startTime', ascending = True).reset_index(drop = True)
+
+    df = df[df['gameEventType'].isin(['FIRSTKICKOFF','SECONDKICKOFF','THIRDKICKOFF','FOURTHKICKOFF','OTB','OUT','ON','OFF','SUB','END'])]
+
+    df['teamId'] = df['team'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
+    df['teamName'] = df['team'].apply(lambda x: x.get('name', None) if isinstance(x, dict) else None)
+    df['playerId'] = df['player'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
+    df['playerName'] = df['player'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)
+    df['playerOnId'] = df['playerOn'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
+    df['playerOnName'] = df['playerOn'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)
+    df['playerOffId'] = df['playerOff'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
+    df['playerOffName'] = df['playerOff'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)
+
+    possessionEvents = df['possessionEvents'].apply(pd.Series)
+    possessionEvents.index = df['gameEventId']
+
+    # Since there can be multiple possession events per game event, we need to loop over them
+    temp_list1 = []
+    for i in range(possessionEvents.shape[-1]):
+        temp1 = possessionEvents[i].apply(pd.Series)
+        temp1 = temp1.reset_index(drop = False)
+        temp1 = temp1.rename(columns = {'id':'possessionEventId'})
+        temp1 = temp1.drop(columns = [0])
+        temp1 = temp1.dropna(how = 'all', axis = 0)
+        temp_list1.append(temp1)
+    possessionEvents = pd.concat(temp_list1, ignore_index = True)
+    possessionEvents = possessionEvents[~possessionEvents['possessionEventId'].isnull()]
+
+    challengeEvents = possessionEvents[possessionEvents['possessionEventType'] == 'CH'].copy()
+    possessionEvents = possessionEvents[possessionEvents['possessionEventType'] != 'CH'].copy()
+
+    ballCarryEvents = possessionEvents[possessionEvents['possessionEventType'] == 'BC'].copy()
+    possessionEvents = possessionEvents[possessionEvents['possessionEventType'] != 'BC'].copy()
+
+    possessionEvents['challengeEvent'] = possessionEvents['gameEventId'].isin(challengeEvents['gameEventId'])
+    possessionEvents['ballCarryEvent'] = possessionEvents['gameEventId'].isin(ballCarryEvents['gameEventId'])
+
+    df = df.merge(possessionEvents[['gameEventId','possessionEventId','possessionEventType','challengeEvent','ballCarryEvent']], how = 'left', on = 'gameEventId')
+
+    df['playerOnId'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnId'], np.nan)
+    df['playerOnName'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnName'], np.nan)
+    df['playerOffId'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffId'], np.nan)
+    df['playerOffName'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffName'], np.nan)
+
+    df['offType'] = np.where(df['offType'].isin(['R']), df['offType'], np.nan)
+
+    df = df.drop(columns = ['team','player','playerOn','playerOff','possessionEvents'])
+
+    df = df[['gameId','gameEventId','gameEventType','possessionEventId','possessionEventType','gameClock','formattedGameClock','startTime','endTime','duration','teamId','teamName','playerId','playerName','endType','offType','outType','playerOnId','playerOnName','playerOffId','playerOffName','challengeEvent','ballCarryEvent']]
+
+    ints = ['gameId','gameEventId','possessionEventId','teamId','playerId','playerOnId','playerOffId']
+    for col in ints:
+        try:
+            df[col] = df[col].astype(int)
+        except:
+            df[col] = df[col].astype('Int64')
+
+    return df
+
+def games(data):
+    '''
+    The row-wise pitch resolution of get_games.
+    '''
+    df = pd.DataFrame.from_dict(data['competition']['games'])
+
+    competition = pd.DataFrame(index = df.index)
+    competition.loc[:,'id'] = data['competition']['id']
+    competition.loc[:,'name'] = data['competition']['name']
+    competition['competition'] = competition[['id','name']].to_dict(orient = 'records')
+
+    df[['stadiumId','stadiumName','pitches']] = df['stadium'].apply(pd.Series)
+    df['date'] = pd.to_datetime(df['date'])
+    df_pitches = df['pitches'].apply(pd.Series)
+
+    for i in df_pitches.columns:
+        df_pitches[f'startDate_{i}'] = df_pitches[i].apply(lambda x: x.get('startDate', None) if isinstance(x, dict) else None)
+        df_pitches[f'startDate_{i}'] = pd.to_datetime(df_pitches[f'startDate_{i}'])
+        df_pitches[f'endDate_{i}'] = df_pitches[i].apply(lambda x: x.get('endDate', None) if isinstance(x, dict) else None)
+        df_pitches[f'endDate_{i}'] = pd.to_datetime(df_pitches[f'endDate_{i}'])
+
+    df_pitches['id'] = df['id']
+    df_pitches['date'] = df['date']
+
+    # Find the correct pitch index and store it in df_pitches
+    df_pitches["pitch_index"] = df.apply(lambda row: next(
+        (i for i in range(len(df_pitches.columns) // 2)  # Iterate over pitch indices
+         if row["date"] >= df_pitches.at[row.name, f"startDate_{i}"] and
+            (pd.isna(df_pitches.at[row.name, f"endDate_{i}"]) or row["date"] <= df_pitches.at[row.name, f"endDate_{i}"])),
+        None  # Default to None if no match is found
+    ), axis=1)
+
+    df_pitches['pitch'] = df_pitches.apply(
+        lambda row: row.get(row["pitch_index"], None) if pd.notna(row["pitch_index"]) else None,
+        axis=1
+    )
+
+    df_pitches['pitchLength'] = df_pitches['pitch'].apply(lambda x: x.get('length', None) if isinstance(x, dict) else None)
+    df_pitches['pitchWidth'] = df_pitches['pitch'].apply(lambda x: x.get('width', None) if isinstance(x, dict) else None)
+
+    df = df.merge(competition[['competition']], how = 'left', left_index = True, right_index = True)
+    df = df.merge(df_pitches[['id','pitchLength','pitchWidth']], how = 'left', on = 'id')
+
+    df['stadium'] = df.apply(lambda row: {col: row[col] for col in ['stadiumId','stadiumName','pitchLength','pitchWidth']}, axis=1)
+    df = df.drop(columns = ['stadiumId','stadiumName','pitches','pitchLength','pitchWidth'])
+
+    df = df.reindex(sorted(df.columns), axis = 1).infer_objects()
+    return df.infer_objects()
+
+def game(data):
+    '''
+    The row-wise pitch resolution of get_game.
+    '''
+    df = pd.DataFrame(data['game'].items()).T
+    df.columns = df.loc[0]
+    df = df[df['awayTeam'] != 'awayTeam'].reset_index(drop = True)
+
+    # Unpack stadium column to retrieve pitch dimensions
+    df[['stadiumId','stadiumName','pitches']] = df['stadium'].apply(pd.Series)
+    df['date'] = pd.to_datetime(df['date'])
+    df_pitches = df['pitches'].apply(pd.Series).T[0].apply(pd.Series)
+    df_pitches['startDate'] = pd.to_datetime(df_pitches['startDate'])
+    df_pitches['endDate'] = pd.to_datetime(df_pitches['endDate'], errors='coerce')  # Convert empty strings to NaT
+
+    # One-liner to find the pitchLength
+    df['pitchLength'] = df['date'].apply(lambda d: df_pitches.loc[
+        (df_pitches['startDate'] <= d) & ((df_pitches['endDate'].isna()) | (df_pitches['endDate'] >= d)), 'length'
+    ].values[0])
+
+    # One-liner to find the pitchWidth
+    df['pitchWidth'] = df['date'].apply(lambda d: df_pitches.loc[
+        (df_pitches['startDate'] <= d) & ((df_pitches['endDate'].isna()) | (df_pitches['endDate'] >= d)), 'width'
+    ].values[0])
+
+    df['stadium'] = df.apply(lambda row: {col: row[col] for col in ['stadiumId','stadiumName','pitchLength','pitchWidth']}, axis=1)
+    df = df.drop(columns = ['stadiumId','stadiumName','pitches','pitchLength','pitchWidth'])
+
+    return df.infer_objects()
+
+def players_competition(data):
+    '''
+    The expansion and deduplication of get_players_competition.
+    '''
+    df = pd.DataFrame(data['competition']['games'])
+    df = df['rosters'].apply(pd.Series)
+    df = df.dropna(how = 'all', axis = 0)
+
+    oneCol = []
+    colLength = len(list(df.columns))
+    for k in range(colLength):
+        oneCol.append(df[k])
+
+    df = pd.concat(oneCol, ignore_index = True)
+    df = df.apply(pd.Series)['player'].apply(pd.Series)
+
+    df = df.reset_index(drop = False)
+    df['rank'] = df.groupby('id')['index'].rank('dense', ascending = False)
+    df = df[df['rank'] == 1]
+    # df = df.drop_duplicates()
+    for col in [0,'index','rank']:
+        try:
+            df = df.drop(columns = [col])
+        except:
+            continue
+    df = df.dropna(how = 'all', axis = 0)
+
+    df['id'] = df['id'].astype(int)
+
+    return df.infer_objects()
+
+def minutes_played(df):
+    '''
+    The per-game loops over the On-The-Ball rows that minutes played were counted with,
+    starters inferred as players whose first record is not coming on.
+    '''
+    results = []
+    for game_id, game in df.groupby('gameId'):
+        game = game.sort_values('startTime', kind = 'stable')
+
+        # First pass: who started
+        first = {}
+        for row in game.itertuples(index = False):
+            records = []
+            if row.gameEventType in ('SUB', 'ON') and pd.notna(row.playerOnId) and pd.notna(row.teamId):
+                records.append((int(row.teamId), int(row.playerOnId), 'ON'))
+            if row.gameEventType in ('SUB', 'OFF') and pd.notna(row.playerOffId) and pd.notna(row.teamId):
+                records.append((int(row.teamId), int(row.playerOffId), 'OFF'))
+            if pd.notna(row.playerId) and pd.notna(row.teamId):
+                records.append((int(row.teamId), int(row.playerId), 'TOUCH'))
+            for team_id, player_id, kind in records:
+                if (team_id, player_id) not in first:
+                    first[(team_id, player_id)] = kind
+        on_pitch = {key for key, kind in first.items() if kind != 'ON'}
+        seconds = {key: 0.0 for key in first}
+
+        # Second pass: add the time between events to the players on the pitch while the ball is in play
+        in_play, last = False, None
+        for row in game.itertuples(index = False):
+            if in_play and last is not None:
+                for key in on_pitch:
+                    seconds[key] += row.startTime - last
+            last = row.startTime
+            if row.gameEventType in ('FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF'):
+                in_play = True
+            elif row.gameEventType == 'END':
+                in_play = False
+            if row.gameEventType in ('SUB', 'OFF') and pd.notna(row.playerOffId) and pd.notna(row.teamId):
+                on_pitch.discard((int(row.teamId), int(row.playerOffId)))
+            if row.gameEventType in ('SUB', 'ON') and pd.notna(row.playerOnId) and pd.notna(row.teamId):
+                on_pitch.add((int(row.teamId), int(row.playerOnId)))
+
+        for (team_id, player_id), total in seconds.items():
+            results.append({'gameId': game_id, 'teamId': team_id, 'playerId': player_id, 'minutes': total / 60})
+    return pd.DataFrame(results).sort_values(['gameId', 'teamId', 'playerId']).reset_index(drop = True)
+
+def sequences(df):
+    '''
+    The row-by-row loop over the On-The-Ball rows that sequences of play were found with:
+    a sequence ends when the other team is on the ball or play stops, a possession only
+    when the other team is on the ball or the period ends.
+    '''
+    results = []
+
+    def close(current, stopped_by):
+        if stopped_by is None:
+            current['endReason'], current['outType'] = 'END', None
+        elif stopped_by.gameEventType == 'OUT':
+            current['endReason'], current['outType'] = 'STOPPAGE', stopped_by.outType
+        else:
+            current['endReason'], current['outType'] = 'END', None
+        results.append(current)
+
+    for game_id, game in df.groupby('gameId'):
+        game = game.sort_values('startTime', kind = 'stable')
+        period, sequence, possession = 0, 0, 0
+        current, restart, stopped_by, last_event = None, None, None, None
+        for row in game.itertuples(index = False):
+            if row.gameEventType in ('FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF', 'OUT', 'END'):
+                if stopped_by is None:
+                    stopped_by = row
+                if row.gameEventType.endswith('KICKOFF'):
+                    period += 1
+                restart = row.gameEventType
+                continue
+            if row.gameEventType != 'OTB' or pd.isna(row.teamId) or pd.isna(row.startTime):
+                continue
+            team_id = int(row.teamId)
+            if current is None or restart is not None or team_id != current['teamId']:
+                if restart is None and current is None:
+                    reason = 'START'
+                elif restart is not None:
+                    reason = 'KICKOFF' if restart.endswith('KICKOFF') else 'STOPPAGE'
+                else:
+                    reason = 'CHALLENGE' if row.challengeEvent == True else 'TURNOVER'
+                if current is not None and restart is None:
+                    current['endReason'], current['outType'] = 'TURNOVER', None
+                    results.append(current)
+                elif current is not None:
+                    close(current, stopped_by)
+                if current is None or team_id != current['teamId'] or max(period, 1) != current['period']:
+                    possession += 1
+                sequence += 1
+                current = {'gameId': game_id, 'period': max(period, 1), 'sequence': sequence, 'possession': possession, 'teamId': team_id,
+                           'start': row.startTime, 'end': row.startTime, 'gameEvents': 0, 'possessionEvents': 0, 'challenges': 0,
+                           'ballCarries': 0, 'startReason': reason, 'startType': row.possessionEventType}
+                last_event = None
+            restart, stopped_by = None, None
+            if row.gameEventId != last_event:
+                current['gameEvents'] += 1
+                current['challenges'] += int(row.challengeEvent == True)
+                current['ballCarries'] += int(row.ballCarryEvent == True)
+                last_event = row.gameEventId
+            current['possessionEvents'] += int(pd.notna(row.possessionEventType))
+            current['end'] = max(current['end'], row.startTime, row.endTime if pd.notna(row.endTime) else row.startTime)
+            current['endType'] = row.possessionEventType
+        if current is not None:
+            close(current, stopped_by)
+    return pd.DataFrame(results)
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A local stand-in for the PFF FC GraphQL API, to benchmark pypff without a network.
+
+    python benchmarks/mock_server.py --port 8765 --latency 50 --events 1800
+    python benchmarks/mock_server.py --fixtures recorded/ --strict
+    python benchmarks/mock_server.py --upstream https://faraday.pff.com/api --record recorded/
+
+Queries are parsed, including aliased root fields, and answered with exactly the
+fields they select, as the API does, so a smaller selection gives a smaller
+response. Answers come from recorded responses when a fixture directory holds one
+for the exact request, and from the seeded generators of fixtures.py otherwise.
+With --upstream the server is a proxy to the live API instead, which records every
+successful response to the fixture directory for later replay.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+
+_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|\$?[A-Za-z_][A-Za-z0-9_]*|-?\d+(?:\.\d+)?|[{}():,!\[\]]')
+
+def parse_document(query):
+    '''
+    Returns the root fields of a query as a list of (alias, name, arguments, selection)
+    tuples, where selection is a list of such tuples, or None for a scalar.
+    '''
+    tokens = [token for token in _TOKENS.findall(re.sub(r'#[^\n]*', '', query)) if token != ',']
+    # The variable definitions before the first brace hold no selections
+    fields, _ = _selection_set(tokens, tokens.index('{'))
+    return fields
+
+def _selection_set(tokens, position):
+    fields = []
+    position += 1
+    while tokens[position] != '}':
+        alias = name = tokens[position]
+        position += 1
+        if tokens[position] == ':':
+            name = tokens[position + 1]
+            position += 2
+        arguments = {}
+        if tokens[position] == '(':
+            position += 1
+            while tokens[position] != ')':
+                arguments[tokens[position]] = tokens[position + 2]
+                position += 3
+            position += 1
+        selection = None
+        if tokens[position] == '{':
+            selection, position = _selection_set(tokens, position)
+        fields.append((alias, name, arguments, selection))
+    return fields, position + 1
+
+def _argument(value, variables):
+    if value.startswith('$'):
+        return variables[value[1:]]
+    if value.startswith('"'):
+        return json.loads(value)
+    return value
+
+def _selected(selection, *path):
+    # The selection below a path of field names, or None when it is not selected
+    for name in path:
+        if selection is None:
+            return None
+        selection = next((sub for _, field, _, sub in selection if field == name), None)
+    return selection
+
+def prune(value, selection):
+    '''
+    Keeps the fields of a value that a selection asks for, under their aliases.
+    Fields the value does not have are answered with null.
+    '''
+    if selection is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [prune(item, selection) for item in value]
+    return {alias: prune(value.get(name), sub) for alias, name, _, sub in selection}
+
+def request_key(body):
+    '''
+    Returns the name of the fixture of a request body, the same for every
+    formatting of the same query and variables.
+    '''
+    payload = json.loads(body)
+    return hashlib.sha256(json.dumps(payload, sort_keys = True, separators = (',', ':')).encode('utf-8')).hexdigest()
+
+class Backend:
+    '''
+    Answers GraphQL requests from recorded responses or from the generators of fixtures.py.
+
+    Parameters
+    -----------
+
+    seasons: an integer with the number of seasons of every synthetic competition, defaults to 1
+    games_per_season: an integer with the number of games of a synthetic season, defaults to 380
+    events: an integer with the number of events of a synthetic game, which sets the size of
+    game event responses, defaults to 1800
+    fixtures_dir: a string with a directory of recorded responses, defaults to None
+    strict: a boolean to answer requests without a recorded response with HTTP 404 instead of
+    synthetic data, defaults to False
+    fail_ids: a list of game ids that are answered with a GraphQL error, defaults to None
+    competition_ids: the synthetic competitions whose games can be retrieved by id, defaults to [1]
+
+    '''
+    def __init__(self, seasons = 1, games_per_season = 380, events = 1800, fixtures_dir = None, strict = False, fail_ids = None,
+                 competition_ids = (1,)):
+        self.seasons = seasons
+        self.games_per_season = games_per_season
+        self.events = events
+        self.fixtures_dir = fixtures_dir
+        self.strict = strict
+        self.fail_ids = set(str(i) for i in fail_ids or [])
+        self.competition_ids = list(competition_ids)
+        self.resolvers = {'competitions': self.competitions, 'competition': self.competition, 'teams': self.teams, 'team': self.team,
+                          'game': self.game, 'player': self.player, 'gameEvent': self.game_event, 'scoringEvents': self.scoring_events}
+        self._lock = threading.RLock()
+        self._memo = {}
+        self._bodies = OrderedDict()
+
+    def _cached(self, key, func, *args, limit = None):
+        # Generated data is kept, so repeated requests measure the client and not the generators
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+            value = self._memo[key] = func(*args)
+            if limit is not None:
+                kept = [name for name in self._memo if name[0] == key[0]]
+                for name in kept[:-limit]:
+                    del self._memo[name]
+            return value
+
+    def _competition(self, competition_id):
+        def build():
+            data = fixtures.games(competition_id, self.seasons, self.games_per_season)['competition']
+            data['index'] = {game['id']: game for game in data['games']}
+            return data
+        return self._cached(('competition', competition_id), build)
+
+    def _rosters(self, competition_id):
+        # The rosters of the players fixture, attached to the games of the competition in order
+        def build():
+            games = self._competition(competition_id)['games']
+            rosters = fixtures.players_competition(competition_id, len(games))['competition']['games']
+            return {game['id']: item['rosters'] for game, item in zip(games, rosters)}
+        return self._cached(('rosters', competition_id), build)
+
+    def _find_game(self, game_id):
+        for competition_id in self.competition_ids:
+            data = self._competition(competition_id)
+            if str(game_id) in data['index']:
+                return competition_id, data
+        return None, None
+
+    def _events(self, game_id):
+        return self._cached(('events', game_id), lambda: fixtures.game_events(game_id, self.events)['game']['gameEvents'], limit = 16)
+
+    def competitions(self, arguments, selection):
+        return fixtures.competitions()['competitions']
+
+    def competition(self, arguments, selection):
+        competition_id = int(arguments['id'])
+        data = self._competition(competition_id)
+        games = data['games']
+        if _selected(selection, 'games', 'rosters') is not None:
+            rosters = self._rosters(competition_id)
+            games = [dict(game, rosters = rosters[game['id']]) for game in games]
+        return {'id': data['id'], 'name': data['name'], 'games': games}
+
+    def teams(self, arguments, selection):
+        return fixtures.teams()['teams']
+
+    def team(self, arguments, selection):
+        return fixtures.team(int(arguments['id']))
+
+    def game(self, arguments, selection):
+        game_id = str(arguments['id'])
+        if game_id in self.fail_ids:
+            raise LookupError('game ' + game_id + ' is not available')
+        competition_id, data = self._find_game(game_id)
+        if data is not None:
+            value = dict(data['index'][game_id], competition = {'id': data['id'], 'name': data['name']})
+        else:
+            rng = random.Random(int(game_id))
+            value = fixtures._game(rng, int(game_id), 2022, fixtures._stadium(rng, 1, 2020, 2022), 1, 2)
+            value['competition'] = {'id': '0', 'name': 'Competition 0'}
+        if _selected(selection, 'rosters') is not None:
+            value['rosters'] = self._rosters(competition_id)[game_id] if data is not None else fixtures.roster(int(game_id))
+        if _selected(selection, 'gameEvents') is not None:
+            value['gameEvents'] = self._events(int(game_id))
+        return value
+
+    def player(self, arguments, selection):
+        return fixtures.player(int(arguments['id']))
+
+    def game_event(self, arguments, selection):
+        # Synthetic event ids are the game id times 100000 plus the number of the event
+        game_event_id = str(arguments['id'])
+        game_id = (int(game_event_id) - 1) // 100000
+        for event in self._events(game_id):
+            if event['id'] == game_event_id:
+                return event
+        raise LookupError('game event ' + game_event_id + ' does not exist')
+
+    def scoring_events(self, arguments, selection):
+        return fixtures.scoring_events(int(arguments['competitionId']), arguments['season'], self.games_per_season)['scoringEvents']
+
+    def recorded(self, key):
+        if self.fixtures_dir is None:
+            return None
+        path = os.path.join(self.fixtures_dir, key + '.json.gz')
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    def execute(self, body):
+        '''
+        Returns the HTTP status and the body of the answer to a request body.
+        '''
+        key = request_key(body)
+        content = self.recorded(key)
+        if content is not None:
+            return 200, content
+        if self.strict:
+            return 404, json.dumps({'errors': [{'message': 'no recorded response for request ' + key}]}).encode('utf-8')
+
+        with self._lock:
+            if key in self._bodies:
+                self._bodies.move_to_end(key)
+                return 200, self._bodies[key]
+
+        payload = json.loads(body)
+        variables = payload.get('variables') or {}
+        data, errors = {}, []
+        for alias, name, arguments, selection in parse_document(payload['query']):
+            try:
+                arguments = {field: _argument(value, variables) for field, value in arguments.items()}
+                data[alias] = prune(self.resolvers[name](arguments, selection), selection)
+            except (LookupError, ValueError) as e:
+                data[alias] = None
+                errors.append({'message': str(e), 'path': [alias]})
+        answer = {'data': data}
+        if errors:
+            answer['errors'] = errors
+        content = json.dumps(answer, separators = (',', ':')).encode('utf-8')
+
+        with self._lock:
+            self._bodies[key] = content
+            while len(self._bodies) > 32:
+                self._bodies.popitem(last = False)
+        return 200, content
+
+class Recorder:
+    '''
+    Forwards requests to the live API and stores every successful response as a fixture.
+    '''
+    def __init__(self, upstream, directory):
+        import requests
+        self.upstream = upstream
+        self.directory = directory
+        self.session = requests.Session()
+        os.makedirs(directory, exist_ok = True)
+
+    def execute(self, body, api_key):
+        response = self.session.post(self.upstream, data = body, headers = {'x-api-key': api_key, 'Content-Type': 'application/json'})
+        if response.status_code == 200 and b'"errors"' not in response.content:
+            key = request_key(body)
+            path = os.path.join(self.directory, key + '.json.gz')
+            recorded = os.path.exists(path)
+            with gzip.open(path, 'wb') as f:
+                f.write(response.content)
+            if recorded:
+                return response.status_code, response.content
+            # An index of what was recorded, the fixtures themselves are named by the hash of the request
+            query = json.loads(body)
+            with open(os.path.join(self.directory, 'index.jsonl'), 'a', encoding = 'utf-8') as f:
+                f.write(json.dumps({'key': key, 'query': query['query'][:80], 'variables': query.get('variables'), 'bytes': len(response.content)}) + '\n')
+        return response.status_code, response.content
+
+class _RateLimit:
+    # A token bucket per API key, as a rate limit of the live API
+    def __init__(self, rate):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def retry_after(self, key):
+        # Takes a token of the key, or returns the whole seconds until one is available
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return max(1, math.ceil((1 - tokens) / self.rate))
+            self.buckets[key] = (tokens - 1, now)
+        return None
+
+def make_server(backend, host = '127.0.0.1', port = 8765, latency = 0.0, bandwidth = None, error_rate = 0.0, seed = 0, rate_limit = None):
+    '''
+    Returns a ThreadingHTTPServer that answers POST requests with the backend, a
+    Backend or a Recorder.
+
+    Parameters
+    -----------
+
+    latency: a float with the seconds to wait before answering, defaults to 0
+    bandwidth: a float with the bytes per second the answer is sent with, defaults to None (unlimited)
+    error_rate: a float with the share of requests answered with HTTP 503, to exercise retries, defaults to 0
+    seed: an integer that makes the failed requests the same on every run, defaults to 0
+    rate_limit: a float with the requests per second allowed per API key, others are answered
+    with HTTP 429 and a Retry-After, defaults to None (no limit)
+
+    '''
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    limit = _RateLimit(rate_limit) if rate_limit else None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes, with Nagle's algorithm the body waits for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            retry_after = limit.retry_after(self.headers.get('x-api-key', '')) if limit is not None else None
+            if latency:
+                time.sleep(latency)
+            with rng_lock:
+                failed = error_rate and rng.random() < error_rate
+            if retry_after is not None:
+                self._answer(429, b'{"errors":[{"message":"Too Many Requests"}]}', {'Retry-After': str(retry_after)})
+            elif failed:
+                self._answer(503, b'{"errors":[{"message":"Service Unavailable"}]}', {'Retry-After': '0'})
+            elif isinstance(backend, Recorder):
+                self._answer(*backend.execute(body, self.headers.get('x-api-key', '')))
+            else:
+                self._answer(*backend.execute(body))
+
+        def _answer(self, status, content, headers = None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if not bandwidth:
+                self.wfile.write(content)
+                return
+            chunk = 65536
+            for start in range(0, len(content), chunk):
+                self.wfile.write(content[start:start + chunk])
+                time.sleep(min(chunk, len(content) - start) / bandwidth)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765, help = '0 picks a free port, which is printed on startup')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'milliseconds before every answer')
+    parser.add_argument('--bandwidth', type = float, default = None, help = 'MB per second the answers are sent with')
+    parser.add_argument('--error-rate', type = float, default = 0.0, help = 'share of requests answered with HTTP 503')
+    parser.add_argument('--rate-limit', type = float, default = None, help = 'requests per second per API key, others are answered with HTTP 429')
+    parser.add_argument('--fail-ids', type = int, nargs = '*', default = [], help = 'game ids answered with a GraphQL error')
+    parser.add_argument('--seasons', type = int, default = 1, help = 'seasons of a synthetic competition')
+    parser.add_argument('--games-per-season', type = int, default = 380)
+    parser.add_argument('--events', type = int, default = 1800, help = 'events of a synthetic game')
+    parser.add_argument('--fixtures', help = 'directory of recorded responses to replay')
+    parser.add_argument('--strict', action = 'store_true', help = 'answer requests that were not recorded with HTTP 404')
+    parser.add_argument('--upstream', help = 'url of the live API to forward requests to, see --record')
+    parser.add_argument('--record', help = 'directory to record the responses of the upstream API to')
+    args = parser.parse_args()
+
+    if args.upstream:
+        if not args.record:
+            parser.error('--upstream requires --record')
+        backend = Recorder(args.upstream, args.record)
+    else:
+        backend = Backend(args.seasons, args.games_per_season, args.events, args.fixtures, args.strict, args.fail_ids)
+    server = make_server(backend, args.host, args.port, args.latency / 1000, args.bandwidth * 1024 ** 2 if args.bandwidth else None, args.error_rate,
+                         rate_limit = args.rate_limit)
+    print('listening on http://%s:%d' % server.server_address, flush = True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
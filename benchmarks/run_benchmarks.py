@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs every get_* function of pypff.pff against the local stand-in API of
+mock_server.py and reports wall time, throughput, peak memory and where the time goes.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --latency 80 --events 3000 --only game_events game_events_stream
+    python benchmarks/run_benchmarks.py --save before.json
+    python benchmarks/run_benchmarks.py --compare before.json
+
+Every scenario runs in a fresh process, so its peak RSS is its own. The time of a
+run is split in network, parse and transform time as reported by pypff.instrument;
+with several workers these times add up over the threads and can
+exceed the wall time.
+
+To benchmark recorded responses, record them once through the stand-in as a proxy of
+the live API, then replay them:
+
+    python benchmarks/mock_server.py --upstream https://faraday.pff.com/api --record recorded/
+    python benchmarks/run_benchmarks.py --url http://127.0.0.1:8765 --key <key> --competition-id 1 --season 2022 --game-ids ...
+    python benchmarks/run_benchmarks.py --fixtures recorded/ --competition-id 1 --season 2022 --game-ids ...
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypff import instrument
+from pypff import pff
+from pypff import queries
+from pypff.cache import MemoryCache
+from pypff.store import EventStore
+
+def _game_events_games(client, ids, **kwargs):
+    return client.get_game_events_games(ids['game_ids'], **kwargs)
+
+_stores = {}
+
+def _store_team_shots(client, ids):
+    # The store is filled on the first, unmeasured run, so the measured runs only query it
+    if client not in _stores:
+        _stores[client] = EventStore(os.path.join(tempfile.mkdtemp(), 'events.sqlite'))
+        _stores[client].add_game_events(client.get_game_events_games(ids['game_ids']), ids['competition_id'], ids['season'])
+    return _stores[client].game_events(team_id = ids['team_id'], possession_event_type = 'SH', season = ids['season'])
+
+_player_ids = {}
+
+def _event_player_ids(client, ids):
+    # The players of every on-the-ball event of the games, as a column that is enriched with player information
+    if client not in _player_ids:
+        _player_ids[client] = pff.pd.concat([client.get_otb_data(game_id) for game_id in ids['game_ids']])['playerId']
+    return _player_ids[client]
+
+def _players_one_by_one(client, ids):
+    return pff.pd.concat([client.get_player(player_id) for player_id in pff._unique_ids(_event_player_ids(client, ids))], ignore_index = True)
+
+def _players_memoized(client, ids):
+    # The memory cache is filled on the first, unmeasured run
+    if client.memory_cache is None:
+        client.memory_cache = MemoryCache()
+    return client.get_players(_event_player_ids(client, ids))
+
+# Every scenario is a call of the client, given the ids to use
+SCENARIOS = {
+    'competitions': lambda client, ids: client.get_competitions(),
+    'competition': lambda client, ids: client.get_competition(ids['competition_id']),
+    'teams': lambda client, ids: client.get_teams(),
+    'team': lambda client, ids: client.get_team(ids['team_id']),
+    'games': lambda client, ids: client.get_games(ids['competition_id']),
+    'game': lambda client, ids: client.get_game(ids['game_ids'][0]),
+    'game_records': lambda client, ids: client.get_game(ids['game_ids'][0], return_type = 'records'),
+    'games_by_id': lambda client, ids: client.get_games_by_id(ids['game_ids']),
+    'players_competition': lambda client, ids: client.get_players_competition(ids['competition_id']),
+    'players_competition_chunked': lambda client, ids: client.get_players_competition(ids['competition_id'], chunk_size = 50),
+    'player': lambda client, ids: client.get_player(ids['player_id']),
+    'players_one_by_one': _players_one_by_one,
+    'players': lambda client, ids: client.get_players(_event_player_ids(client, ids)),
+    'players_memoized': _players_memoized,
+    'roster': lambda client, ids: client.get_roster(ids['game_ids'][0]),
+    'roster_records': lambda client, ids: client.get_roster(ids['game_ids'][0], return_type = 'records'),
+    'rosters': lambda client, ids: client.get_rosters(ids['game_ids']),
+    'game_events': lambda client, ids: client.get_game_events(ids['game_ids'][0]),
+    'game_events_stream': lambda client, ids: client.get_game_events(ids['game_ids'][0], stream = True),
+    'game_events_normalize': lambda client, ids: client.get_game_events(ids['game_ids'][0], normalize = True),
+    'game_events_records': lambda client, ids: client.get_game_events(ids['game_ids'][0], return_type = 'records'),
+    'game_events_exclude': lambda client, ids: client.get_game_events(ids['game_ids'][0], exclude = queries.NO_FREEZE_FRAMES + queries.NO_GRADES),
+    'iter_game_events': lambda client, ids: [event for batch in client.iter_game_events(ids['game_ids'][0]) for event in batch],
+    'game_event': lambda client, ids: client.get_game_event(ids['game_event_id']),
+    'game_events_games': lambda client, ids: _game_events_games(client, ids),
+    'game_events_games_workers': lambda client, ids: _game_events_games(client, ids, max_workers = 8),
+    'game_events_games_batched': lambda client, ids: _game_events_games(client, ids, max_workers = 4, batch_size = 4),
+    'game_events_games_packed': lambda client, ids: _game_events_games(client, ids, pack_freeze_frames = True),
+    'game_events_games_compact': lambda client, ids: _game_events_games(client, ids, normalize = True, compact = True),
+    'scoring_events': lambda client, ids: client.get_scoring_events(ids['competition_id'], ids['season']),
+    'otb_data': lambda client, ids: client.get_otb_data(ids['game_ids'][0]),
+    'otb_data_compact': lambda client, ids: client.get_otb_data(ids['game_ids'][0], compact = True),
+    'events': lambda client, ids: client.get_events(ids['game_ids'][0]),
+    'store_team_shots': _store_team_shots,
+}
+
+def _peak_rss():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_scenario(name, url, key, ids, repeat):
+    '''
+    Runs a scenario repeat times in this process and returns the measures of the fastest run.
+    A first run that is not measured lets the stand-in generate its answers.
+    '''
+    baseline = _peak_rss()
+    client = pff.PFFClient(url, key, max_retries = 5, backoff_factor = 0)
+    SCENARIOS[name](client, ids)
+    runs = []
+    for _ in range(repeat):
+        with instrument.Summary(keep_requests = False) as summary:
+            start = time.perf_counter()
+            SCENARIOS[name](client, ids)
+            wall = time.perf_counter() - start
+        run = {field: sum(call[field] for call in summary.calls) for field in ['requests', 'retries', 'bytes', 'rows', 'network', 'parse', 'transform']}
+        runs.append(dict(run, wall = wall))
+    client.close()
+    best = min(runs, key = lambda run: run['wall'])
+    best['peak_rss'] = _peak_rss()
+    best['rss_increase'] = best['peak_rss'] - baseline
+    return best
+
+def start_server(args):
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_server.py'), '--port', '0',
+               '--latency', str(args.latency), '--events', str(args.events), '--seasons', str(args.seasons),
+               '--games-per-season', str(args.games_per_season)]
+    if args.bandwidth:
+        command += ['--bandwidth', str(args.bandwidth)]
+    if args.error_rate:
+        command += ['--error-rate', str(args.error_rate)]
+    if args.fixtures:
+        command += ['--fixtures', args.fixtures]
+    server = subprocess.Popen(command, stdout = subprocess.PIPE, text = True)
+    url = server.stdout.readline().split()[-1]
+    return server, url
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs = '*', choices = sorted(SCENARIOS), help = 'scenarios to run, defaults to all')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'runs per scenario, the fastest is reported')
+    parser.add_argument('--latency', type = float, default = 20.0, help = 'milliseconds the stand-in waits before every answer')
+    parser.add_argument('--bandwidth', type = float, default = None, help = 'MB per second the stand-in answers with')
+    parser.add_argument('--error-rate', type = float, default = 0.0, help = 'share of requests the stand-in answers with HTTP 503')
+    parser.add_argument('--events', type = int, default = 1800, help = 'events of a synthetic game')
+    parser.add_argument('--seasons', type = int, default = 1)
+    parser.add_argument('--games-per-season', type = int, default = 380)
+    parser.add_argument('--fixtures', help = 'directory of recorded responses for the stand-in to replay')
+    parser.add_argument('--url', help = 'an API to benchmark instead of starting the stand-in, i.e. a recording proxy')
+    parser.add_argument('--key', default = 'benchmark')
+    parser.add_argument('--competition-id', type = int, default = 1)
+    parser.add_argument('--season', default = '2010')
+    parser.add_argument('--game-ids', type = int, nargs = '*', help = 'games to use, defaults to the first 8 synthetic games of the season')
+    parser.add_argument('--team-id', type = int, default = 1)
+    parser.add_argument('--player-id', type = int, default = 1000)
+    parser.add_argument('--game-event-id', type = int, help = 'defaults to the first event of the first game')
+    parser.add_argument('--save', help = 'file to write the results to as JSON')
+    parser.add_argument('--compare', help = 'results saved earlier to compare the wall times with')
+    args = parser.parse_args()
+
+    # Synthetic game ids are the competition id times 1000000 plus the season times 1000 plus the number of the game
+    game_ids = args.game_ids or [args.competition_id * 1000000 + int(args.season) * 1000 + number for number in range(8)]
+    ids = {'competition_id': args.competition_id, 'season': args.season, 'game_ids': game_ids, 'team_id': args.team_id,
+           'player_id': args.player_id, 'game_event_id': args.game_event_id or game_ids[0] * 100000 + 1}
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args)
+    baseline = json.load(open(args.compare)) if args.compare else {}
+    # Progress bars of get_game_events_games would interleave with the table
+    os.environ['TQDM_DISABLE'] = '1'
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    header = f"{'scenario':<28} {'requests':>8} {'retries':>7} {'MB':>8} {'rows':>8} {'wall (s)':>9} {'req/s':>7} {'MB/s':>7} {'rows/s':>9} {'network':>8} {'parse':>7} {'transform':>9} {'peak RSS':>9}"
+    print(header + (f" {'vs saved':>9}" if baseline else ''))
+    try:
+        for name in args.only or SCENARIOS:
+            with ProcessPoolExecutor(1, mp_context = context) as executor:
+                result = results[name] = executor.submit(run_scenario, name, url, args.key, ids, args.repeat).result()
+            wall = result['wall']
+            line = (f"{name:<28} {result['requests']:>8} {result['retries']:>7} {result['bytes'] / 1024 ** 2:>8.2f} {result['rows']:>8} {wall:>9.3f} {result['requests'] / wall:>7.1f} "
+                    f"{result['bytes'] / 1024 ** 2 / wall:>7.1f} {result['rows'] / wall:>9.0f} {result['network']:>8.3f} {result['parse']:>7.3f} "
+                    f"{result['transform']:>9.3f} {result['peak_rss'] / 1024 ** 2:>7.0f}MB")
+            if name in baseline:
+                line += f" {baseline[name]['wall'] / wall:>8.2f}x"
+            print(line, flush = True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.save:
+        with open(args.save, 'w', encoding = 'utf-8') as f:
+            json.dump(results, f, indent = 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Awaitable counterparts of the functions of pypff.pff, for asyncio services.
+
+AsyncPFFClient has the methods of PFFClient as coroutines, built on aiohttp
+instead of requests, so that waiting for the API never blocks the event loop.
+They send the same queries and return the same results; decoding and building
+the dataframes of large answers, i.e. game events, runs on a thread.
+
+    from pypff import aio
+
+    async with aio.AsyncPFFClient(url, key, pool_size = 20) as client:
+        games = await asyncio.gather(*[client.get_game(game_id, return_type = 'records') for game_id in game_ids])
+
+The module-level functions, i.e. await aio.get_game_events_async(url, key, game_id),
+share one client per url and key within an event loop; close them with
+await aio.close_clients() before the loop ends. Calls can be cancelled and given
+a deadline with asyncio.wait_for. Streaming (stream = True and iter_game_events)
+is only available in pypff.pff. Requires aiohttp (pip install aiohttp).
+"""
+import asyncio
+import time
+import weakref
+
+from . import instrument
+from . import pff
+from . import queries
+from .cache import scope as cache_scope
+from .queries import build_query
+from . import scheduler as scheduling
+from .scheduler import RETRY_STATUS, backoff_delay
+from .stream import loads
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError('pypff.aio requires aiohttp, install it with pip install aiohttp')
+
+class _Response:
+    # The answer to a request, with the attributes of a requests.Response that the transforms use
+    __slots__ = ('status_code', 'content')
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+class AsyncPFFClient:
+    '''
+    An asyncio client for the PFF FC API, with the methods of pff.PFFClient as coroutines.
+
+    All requests go through one aiohttp.ClientSession, which keeps up to pool_size
+    connections open and shares them between all concurrent calls. Requests that fail
+    with HTTP 429, a 5xx status or a connection error are retried with exponential
+    backoff, honouring the Retry-After header sent by the API. With a scheduler, every
+    request waits for its turn first, and the wait before a retry holds back all
+    requests of the API key, as in pff.PFFClient.
+
+    Parameters
+    -----------
+
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    pool_size: an integer with the number of connections kept open, defaults to 10
+    max_retries: an integer with the number of retries of a failed request, defaults to 3
+    backoff_factor: a float that scales the wait between retries in seconds, defaults to 0.5
+    timeout: a float with the number of seconds to wait for a request, defaults to 60
+    cache: a cache.ResponseCache to reuse earlier responses, which can be shared with clients
+    of other urls and API keys, defaults to None (no caching)
+    session: an aiohttp.ClientSession to share with the rest of the service, which the
+    client does not close, defaults to None (a session of its own)
+    memory_cache: a cache.MemoryCache that is looked up before cache, defaults to None (no memoization)
+    scheduler: a scheduler.Scheduler that paces the requests, which can be shared with other
+    clients, synchronous ones included, defaults to None (requests are sent at once)
+
+    '''
+    def __init__(self, url, key, pool_size = 10, max_retries = 3, backoff_factor = 0.5, timeout = 60, cache = None, session = None,
+                 memory_cache = None, scheduler = None):
+        _require_aiohttp()
+        self.url = url
+        self.key = key
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.scheduler = scheduler
+        self.headers = {'x-api-key': key, 'Content-Type': 'application/json'}
+        self._session = session
+        self._own_session = session is None
+
+    @property
+    def session(self):
+        # Made on first use, so that the client can be created outside of a running event loop
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector = aiohttp.TCPConnector(limit = self.pool_size))
+        return self._session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _backoff(self, retries, retry_after = None):
+        return backoff_delay(retries, self.backoff_factor, retry_after)
+
+    @property
+    def _scope(self):
+        # See PFFClient._scope
+        return cache_scope(self.url, self.key)
+
+    def _memory(self, entity):
+        return self.memory_cache if self.memory_cache is not None and self.memory_cache.keeps(entity) else None
+
+    async def _cached(self, payload, entity):
+        # See PFFClient._cached, only the cache on disk is looked up on a thread
+        memory, scope = self._memory(entity), self._scope
+        content = memory.get(payload, scope) if memory is not None else None
+        if content is None and self.cache is not None:
+            content = await asyncio.to_thread(self.cache.get, payload, scope)
+            if content is not None and memory is not None:
+                memory.set(payload, content, entity, scope)
+        return content
+
+    async def _post(self, payload, entity = None, **kwargs):
+        # Requests without an entity are not cached, i.e. batched requests that the caller caches per id
+        start = time.perf_counter()
+        if entity is not None:
+            content = await self._cached(payload, entity)
+            if content is not None:
+                instrument.request(payload, 200, len(content), time.perf_counter() - start, cached = True)
+                return _Response(200, content)
+
+        scheduler = self.scheduler
+        retries, queued = 0, 0.0
+        timeout = aiohttp.ClientTimeout(total = self.timeout)
+        while True:
+            if scheduler is not None:
+                queued += await scheduler.acquire_async(self.key)
+            try:
+                async with self.session.post(self.url, data = payload, headers = self.headers, timeout = timeout, **kwargs) as response:
+                    status, content = response.status, await response.read()
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                await asyncio.sleep(self._backoff(retries))
+                continue
+            if status not in RETRY_STATUS or retries >= self.max_retries:
+                break
+            retries += 1
+            if scheduler is not None:
+                # Holds back all requests of the key, not only this one
+                scheduler.backoff(self.key, self._backoff(retries, retry_after))
+            else:
+                await asyncio.sleep(self._backoff(retries, retry_after))
+        if scheduler is not None:
+            instrument.record(queue = queued)
+        instrument.request(payload, status, len(content), time.perf_counter() - start - queued, retries)
+
+        # Only successful answers are cached, GraphQL reports failures with an 'errors' member
+        if entity is not None and status == 200 and b'"errors"' not in content:
+            game = await self._game(payload, entity, content)
+            if self.memory_cache is not None:
+                self.memory_cache.set(payload, content, entity, self._scope, game)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.set, payload, content, entity, self._scope, game)
+        return _Response(status, content)
+
+    def _caches(self, entity):
+        return self.cache is not None or self._memory(entity) is not None
+
+    async def _games(self, entity, game_ids):
+        # See PFFClient._games
+        if entity not in pff.GAME_ENTITIES or not self._caches(entity):
+            return {}
+        results, _ = await self._fetch_batch('game', queries.GAME, game_ids, 'game', fields = pff._COMPLETE_FIELDS)
+        return results
+
+    async def _game(self, payload, entity, content):
+        # See PFFClient._game
+        if entity == 'game':
+            try:
+                return pff._complete_fields(loads(content)['data']['game'])
+            except (ValueError, KeyError, TypeError):
+                return None
+        game_id = pff._payload_id(payload)
+        return (await self._games(entity, [game_id])).get(game_id) if game_id is not None else None
+
+    async def _fetch_batch(self, root, selection, ids, entity, limiter = None, fields = None, exclude = None, prefix = None):
+        # See PFFClient._fetch_batch
+        singles = {i: build_query(root, selection, {'id': ('ID!', i)}, fields, exclude, prefix) for i in ids}
+        memory, scope = self._memory(entity), self._scope
+
+        def lookup(cache, singles):
+            found = {}
+            for i, single in singles.items():
+                content = cache.get(single, scope)
+                if content is not None:
+                    instrument.request(single, 200, len(content), 0.0, cached = True)
+                    if cache is not memory and memory is not None:
+                        memory.set(single, content, entity, scope)
+                    found[i] = loads(content)['data'][root]
+            return found
+        results = lookup(memory, singles) if memory is not None else {}
+        if self.cache is not None and len(results) < len(singles):
+            results.update(await asyncio.to_thread(lookup, self.cache, {i: single for i, single in singles.items() if i not in results}))
+        failures = {}
+        missing = {i: single for i, single in singles.items() if i not in results}
+        if not missing:
+            return results, failures
+
+        ids = list(missing)
+        payload = queries.build_batch_query(root, selection, ids, fields, exclude, prefix)
+        try:
+            if limiter is not None:
+                await asyncio.sleep(limiter.delay())
+            response = await self._post(payload)
+            body = await asyncio.to_thread(loads, response.content)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return results, {i: repr(e) for i in ids}
+
+        batch_results, failures = pff._split_batch(body, ids, response.text)
+        results.update(batch_results)
+        if not self._caches(entity):
+            return results, failures
+        if entity == 'game':
+            games = {i: pff._complete_fields(value) for i, value in batch_results.items()}
+        else:
+            games = await self._games(entity, list(batch_results))
+        if self.memory_cache is not None:
+            for i, value in batch_results.items():
+                self.memory_cache.set(missing[i], pff._cache_content(root, value), entity, scope, games.get(i))
+        if self.cache is not None:
+            await asyncio.to_thread(lambda: [self.cache.set(missing[i], pff._cache_content(root, value), entity, scope, games.get(i))
+                                             for i, value in batch_results.items()])
+        return results, failures
+
+    async def _batch_frames(self, root, selection, ids, entity, transform, batch_size = None, return_failures = False, return_type = 'frame',
+                            label = 'game'):
+        ids = list(dict.fromkeys(ids))
+        chunks = pff._batch_chunks(root, selection, ids, batch_size)
+        # The requests of the batches take their turns with the scheduler as one caller
+        with scheduling.caller():
+            answers = await asyncio.gather(*[self._fetch_batch(root, selection, chunk, entity) for chunk in chunks])
+        results, failures = {}, {}
+        for chunk_results, chunk_failures in answers:
+            results.update(chunk_results)
+            failures.update(chunk_failures)
+        return pff._batch_result(ids, results, failures, transform, return_failures, return_type, label)
+
+    async def _get(self, payload, entity, transform, *path):
+        # Posts a query and transforms the data at path of its answer; failures are printed, as by PFFClient
+        response = await self._post(payload, entity)
+        try:
+            data = loads(response.content)
+            for name in path:
+                data = data[name]
+            return transform(data)
+        except Exception:
+            # Not a bare except, which would also swallow the cancellation of the task
+            print(response.text)
+
+    async def _get_on_thread(self, payload, entity, transform, *path, **kwargs):
+        # As _get, decoding and transforming on a thread, for answers that take long to process
+        response = await self._post(payload, entity, **kwargs)
+
+        def process():
+            data = loads(response.content)
+            for name in path:
+                data = data[name]
+            return transform(data)
+        try:
+            return await asyncio.to_thread(process)
+        except Exception:
+            print(response.text)
+
+    @instrument.instrumented
+    async def get_competitions(self, return_type = 'frame'):
+        ''' See pff.PFFClient.get_competitions. '''
+        pff._check_return_type(return_type)
+        payload = build_query('competitions', queries.COMPETITION)
+        return await self._get(payload, 'competitions', lambda data: pff._competitions_frame(data, return_type), 'data', 'competitions')
+
+    @instrument.instrumented
+    async def get_competition(self, competition_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_competition. '''
+        pff._check_return_type(return_type)
+        payload = build_query('competition', queries.COMPETITION, {'id': ('ID!', competition_id)})
+        return await self._get(payload, 'competition', lambda data: pff._competition_frame(data, return_type), 'data', 'competition')
+
+    @instrument.instrumented
+    async def get_teams(self, return_type = 'frame'):
+        ''' See pff.PFFClient.get_teams. '''
+        pff._check_return_type(return_type)
+        payload = build_query('teams', queries.TEAM)
+        return await self._get(payload, 'teams', lambda data: pff._teams_frame(data, return_type), 'data', 'teams')
+
+    @instrument.instrumented
+    async def get_team(self, team_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_team. '''
+        pff._check_return_type(return_type)
+        payload = build_query('team', queries.TEAM, {'id': ('ID!', team_id)})
+        return await self._get(payload, 'team', lambda data: pff._team_frame(data, return_type), 'data', 'team')
+
+    @instrument.instrumented
+    async def get_teams_by_id(self, team_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' See pff.PFFClient.get_teams_by_id, the batches are requested concurrently. '''
+        pff._check_return_type(return_type)
+        return await self._batch_frames('team', queries.TEAM, pff._unique_ids(team_ids), 'team', pff._team_frame, batch_size, return_failures,
+                                        return_type, 'team')
+
+    @instrument.instrumented
+    async def get_games(self, competition_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_games. '''
+        pff._check_return_type(return_type)
+        payload = build_query('competition', queries.GAMES, {'id': ('ID!', competition_id)})
+        return await self._get(payload, 'games', lambda data: pff._games_frame(data, return_type), 'data', 'competition')
+
+    @instrument.instrumented
+    async def get_game(self, game_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_game. '''
+        pff._check_return_type(return_type)
+        payload = build_query('game', queries.GAME_WITH_COMPETITION, {'id': ('ID!', game_id)})
+        return await self._get(payload, 'game', lambda data: pff._game_frame(data, return_type), 'data', 'game')
+
+    @instrument.instrumented
+    async def get_games_by_id(self, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' See pff.PFFClient.get_games_by_id, the batches are requested concurrently. '''
+        pff._check_return_type(return_type)
+        return await self._batch_frames('game', queries.GAME_WITH_COMPETITION, game_ids, 'game', pff._game_frame, batch_size, return_failures,
+                                        return_type)
+
+    @instrument.instrumented
+    async def get_players_competition(self, competition_id, chunk_size = None, return_type = 'frame'):
+        ''' See pff.PFFClient.get_players_competition. '''
+        pff._check_return_type(return_type)
+        if chunk_size is not None:
+            return await self._players_competition_chunked(competition_id, chunk_size, return_type)
+        payload = build_query('competition', queries.PLAYERS_COMPETITION, {'id': ('ID!', competition_id)})
+        return await self._get_on_thread(payload, 'players_competition', lambda data: pff._players_frame(data, return_type),
+                                         'data', 'competition', 'games')
+
+    async def _players_competition_chunked(self, competition_id, chunk_size, return_type = 'frame'):
+        payload = build_query('competition', queries.GAMES, {'id': ('ID!', competition_id)}, ['games.id'])
+        game_ids = await self._get(payload, 'games', lambda games: [game['id'] for game in games], 'data', 'competition', 'games')
+        if game_ids is None:
+            return
+
+        # One chunk of rosters at a time, as by PFFClient, to keep memory small
+        players, games = pff._PlayerCollector(), []
+        for chunk in pff._batch_chunks('game', queries.GAME_PLAYERS, game_ids, chunk_size):
+            results, failures = await self._fetch_batch('game', queries.GAME_PLAYERS, chunk, 'game_players')
+            for game_id, error in failures.items():
+                print('Error in game: ' + str(game_id))
+                print(error)
+            for game_id in chunk:
+                if game_id in results and return_type == 'raw':
+                    games.append(results[game_id])
+                elif game_id in results:
+                    players.add(results[game_id].get('rosters'))
+        if return_type == 'raw':
+            return games
+        if return_type == 'records':
+            return players.records()
+        try:
+            return await asyncio.to_thread(players.frame)
+        except KeyError:
+            return pff.pd.DataFrame()
+
+    @instrument.instrumented
+    async def get_player(self, player_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_player. '''
+        pff._check_return_type(return_type)
+        payload = build_query('player', queries.PLAYER, {'id': ('ID!', player_id)})
+        return await self._get(payload, 'player', lambda data: pff._player_frame(data, return_type), 'data', 'player')
+
+    @instrument.instrumented
+    async def get_players(self, player_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' See pff.PFFClient.get_players, the batches are requested concurrently. '''
+        pff._check_return_type(return_type)
+        result = await self._batch_frames('player', queries.PLAYER, pff._unique_ids(player_ids), 'player', pff._player_frame, batch_size,
+                                          return_failures, 'records' if return_type == 'frame' else return_type, 'player')
+        return pff._records_frame(result, return_failures) if return_type == 'frame' else result
+
+    @instrument.instrumented
+    async def get_roster(self, game_id, return_type = 'frame'):
+        ''' See pff.PFFClient.get_roster. '''
+        pff._check_return_type(return_type)
+        payload = build_query('game', queries.ROSTER, {'id': ('ID!', game_id)})
+        return await self._get(payload, 'roster', lambda data: pff._roster_frame(data, return_type), 'data', 'game')
+
+    @instrument.instrumented
+    async def get_rosters(self, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' See pff.PFFClient.get_rosters, the batches are requested concurrently. '''
+        pff._check_return_type(return_type)
+        return await self._batch_frames('game', queries.ROSTER, game_ids, 'roster', pff._roster_frame, batch_size, return_failures, return_type)
+
+    @instrument.instrumented
+    async def get_game_events(self, game_id, normalize = False, fields = None, exclude = None, pack_freeze_frames = False, return_type = 'frame',
+                              compact = False):
+        ''' See pff.PFFClient.get_game_events, without stream. '''
+        pff._check_pack_freeze_frames(normalize, pack_freeze_frames)
+        pff._check_return_type(return_type, normalize, pack_freeze_frames, compact)
+        payload = pff._game_events_payload(game_id, fields, exclude)
+        return await self._get_on_thread(payload, 'game_events',
+                                         lambda data: pff._game_events_frame(game_id, data, normalize, pack_freeze_frames, return_type, compact),
+                                         'data', 'game', 'gameEvents')
+
+    @instrument.instrumented
+    async def get_game_event(self, game_event_id, fields = None, exclude = None, return_type = 'frame'):
+        ''' See pff.PFFClient.get_game_event. '''
+        pff._check_return_type(return_type)
+        payload = build_query('gameEvent', queries.GAME_EVENT, {'id': ('ID!', game_event_id)}, fields, exclude)
+        return await self._get(payload, 'game_event', lambda data: pff._game_event_frame(data, return_type), 'data')
+
+    async def _fetch_game_events(self, game_ids, limiter, slots, normalize, fields, exclude, pack_freeze_frames, return_type, compact):
+        # Returns a dictionary of game_id to a (df, error) tuple, as PFFClient._fetch_game_events_batch
+        async with slots:
+            if len(game_ids) == 1:
+                await asyncio.sleep(limiter.delay())
+                try:
+                    response = await self._post(pff._game_events_payload(game_ids[0], fields, exclude), 'game_events')
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    return {game_ids[0]: (None, repr(e))}
+                results, failures = {}, {}
+                try:
+                    results[game_ids[0]] = {'gameEvents': await asyncio.to_thread(lambda: loads(response.content)['data']['game']['gameEvents'])}
+                except Exception:
+                    failures[game_ids[0]] = response.text
+            else:
+                results, failures = await self._fetch_batch('game', queries.GAME_EVENTS, game_ids, 'game_events', limiter, fields, exclude, 'gameEvents')
+
+        def transform():
+            out = {game_id: (None, error) for game_id, error in failures.items()}
+            for game_id, data in results.items():
+                try:
+                    out[game_id] = (pff._game_events_frame(game_id, data['gameEvents'], normalize, pack_freeze_frames, return_type, compact), None)
+                except Exception as e:
+                    out[game_id] = (None, repr(e))
+            return out
+        return await asyncio.to_thread(transform)
+
+    @instrument.instrumented
+    async def get_game_events_games(self, games, max_workers = 1, requests_per_second = None, return_failures = False, normalize = False,
+                                    fields = None, exclude = None, batch_size = 1, pack_freeze_frames = False, return_type = 'frame', compact = False):
+        '''
+        See pff.PFFClient.get_game_events_games, without stream. max_workers is the number of
+        requests in flight, which all share the connections of the client.
+        '''
+        pff._check_pack_freeze_frames(normalize, pack_freeze_frames)
+        pff._check_return_type(return_type, normalize, pack_freeze_frames, compact)
+        games = list(games)
+        limiter = pff._RateLimiter(requests_per_second)
+        slots = asyncio.Semaphore(max(1, max_workers))
+
+        # Fail on an unknown field at once, instead of once for every game
+        pff._game_events_payload(None, fields, exclude)
+        chunks = pff._batch_chunks('game', queries.GAME_EVENTS, games, batch_size, pff._EVENTS_BATCH_LIMIT, fields, exclude, 'gameEvents')
+        results, failures = {}, {}
+        # Cancelling the call cancels the requests of all games, which take their turns with the scheduler as one caller
+        with scheduling.caller():
+            answers = await asyncio.gather(*[self._fetch_game_events(chunk, limiter, slots, normalize, fields, exclude, pack_freeze_frames,
+                                                                     return_type, compact) for chunk in chunks])
+        for answer in answers:
+            for game_id, (df, error) in answer.items():
+                if error is None:
+                    results[game_id] = df
+                else:
+                    failures[game_id] = error
+                    if not return_failures:
+                        print('\nError in game: ' + str(game_id))
+                        print(error)
+        return await asyncio.to_thread(pff._game_events_games_result, games, results, failures, normalize, pack_freeze_frames, return_type, compact,
+                                       return_failures)
+
+    @instrument.instrumented
+    async def get_scoring_events(self, competition_id, season):
+        ''' See pff.PFFClient.get_scoring_events. '''
+        payload = build_query('scoringEvents', queries.SCORING_EVENT, {'competitionId': ('ID!', competition_id), 'season': ('String!', season)})
+        return await self._get_on_thread(payload, 'scoring_events', pff._scoring_events_frame, 'data', 'scoringEvents')
+
+    @instrument.instrumented
+    async def get_otb_data(self, game_id, compact = False):
+        ''' See pff.PFFClient.get_otb_data. '''
+        payload = build_query('game', queries.OTB_EVENTS, {'id': ('ID!', game_id)})
+
+        def transform(game_events):
+            df = pff._otb_frame(game_id, game_events)
+            return pff._compact(df) if compact else df
+        return await self._get_on_thread(payload, 'otb_data', transform, 'data', 'game', 'gameEvents')
+
+    @instrument.instrumented
+    async def get_events(self, game_id, normalize = False, fields = None, exclude = None, compact = False):
+        ''' See pff.PFFClient.get_events, without stream. As there, the certificate of the API is not verified. '''
+        payload = pff._game_events_payload(game_id, fields, exclude)
+        return await self._get_on_thread(payload, 'events', lambda data: pff._game_events_frame(game_id, data, normalize, compact = compact),
+                                         'data', 'game', 'gameEvents', ssl = False)
+
+# Sessions belong to an event loop, so every loop has its own clients
+_clients = weakref.WeakKeyDictionary()
+
+def _get_client(url, key):
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    if (url, key) not in clients:
+        clients[(url, key)] = AsyncPFFClient(url, key)
+    # The module-level functions use the caches and the scheduler set with pff.set_cache, pff.set_memory_cache and pff.set_scheduler
+    clients[(url, key)].cache = pff._cache
+    clients[(url, key)].memory_cache = pff._memory_cache
+    clients[(url, key)].scheduler = pff._scheduler
+    return clients[(url, key)]
+
+async def close_clients():
+    '''
+    Closes the connections of the clients of the module-level functions in the running event loop.
+    '''
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+async def get_competitions_async(url, key, return_type = 'frame'):
+    ''' Awaitable pff.get_competitions, see its documentation. '''
+    return await _get_client(url, key).get_competitions(return_type = return_type)
+
+async def get_competition_async(url, key, competition_id, return_type = 'frame'):
+    ''' Awaitable pff.get_competition, see its documentation. '''
+    return await _get_client(url, key).get_competition(competition_id, return_type = return_type)
+
+async def get_teams_async(url, key, return_type = 'frame'):
+    ''' Awaitable pff.get_teams, see its documentation. '''
+    return await _get_client(url, key).get_teams(return_type = return_type)
+
+async def get_team_async(url, key, team_id, return_type = 'frame'):
+    ''' Awaitable pff.get_team, see its documentation. '''
+    return await _get_client(url, key).get_team(team_id, return_type = return_type)
+
+async def get_teams_by_id_async(url, key, team_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' Awaitable pff.get_teams_by_id, see its documentation. '''
+    return await _get_client(url, key).get_teams_by_id(team_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+async def get_games_async(url, key, competition_id, return_type = 'frame'):
+    ''' Awaitable pff.get_games, see its documentation. '''
+    return await _get_client(url, key).get_games(competition_id, return_type = return_type)
+
+async def get_game_async(url, key, game_id, return_type = 'frame'):
+    ''' Awaitable pff.get_game, see its documentation. '''
+    return await _get_client(url, key).get_game(game_id, return_type = return_type)
+
+async def get_games_by_id_async(url, key, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' Awaitable pff.get_games_by_id, see its documentation. '''
+    return await _get_client(url, key).get_games_by_id(game_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+async def get_players_competition_async(url, key, competition_id, chunk_size = None, return_type = 'frame'):
+    ''' Awaitable pff.get_players_competition, see its documentation. '''
+    return await _get_client(url, key).get_players_competition(competition_id, chunk_size = chunk_size, return_type = return_type)
+
+async def get_player_async(url, key, player_id, return_type = 'frame'):
+    ''' Awaitable pff.get_player, see its documentation. '''
+    return await _get_client(url, key).get_player(player_id, return_type = return_type)
+
+async def get_players_async(url, key, player_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' Awaitable pff.get_players, see its documentation. '''
+    return await _get_client(url, key).get_players(player_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+async def get_roster_async(url, key, game_id, return_type = 'frame'):
+    ''' Awaitable pff.get_roster, see its documentation. '''
+    return await _get_client(url, key).get_roster(game_id, return_type = return_type)
+
+async def get_rosters_async(url, key, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' Awaitable pff.get_rosters, see its documentation. '''
+    return await _get_client(url, key).get_rosters(game_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+async def get_game_events_async(url, key, game_id, normalize = False, fields = None, exclude = None, pack_freeze_frames = False, return_type = 'frame',
+                                compact = False):
+    ''' Awaitable pff.get_game_events, without stream, see its documentation. '''
+    return await _get_client(url, key).get_game_events(game_id, normalize = normalize, fields = fields, exclude = exclude,
+                                                       pack_freeze_frames = pack_freeze_frames, return_type = return_type, compact = compact)
+
+async def get_game_event_async(url, key, game_event_id, fields = None, exclude = None, return_type = 'frame'):
+    ''' Awaitable pff.get_game_event, see its documentation. '''
+    return await _get_client(url, key).get_game_event(game_event_id, fields = fields, exclude = exclude, return_type = return_type)
+
+async def get_game_events_games_async(url, key, games, max_workers = 1, requests_per_second = None, return_failures = False, normalize = False,
+                                      fields = None, exclude = None, batch_size = 1, pack_freeze_frames = False, return_type = 'frame', compact = False):
+    ''' Awaitable pff.get_game_events_games, without stream, see its documentation. '''
+    return await _get_client(url, key).get_game_events_games(games, max_workers = max_workers, requests_per_second = requests_per_second,
+                                                             return_failures = return_failures, normalize = normalize, fields = fields, exclude = exclude,
+                                                             batch_size = batch_size, pack_freeze_frames = pack_freeze_frames, return_type = return_type,
+                                                             compact = compact)
+
+async def get_scoring_events_async(url, key, competition_id, season):
+    ''' Awaitable pff.get_scoring_events, see its documentation. '''
+    return await _get_client(url, key).get_scoring_events(competition_id, season)
+
+async def get_otb_data_async(url, key, game_id, compact = False):
+    ''' Awaitable pff.get_otb_data, see its documentation. '''
+    return await _get_client(url, key).get_otb_data(game_id, compact = compact)
+
+async def get_events_async(url, key, game_id, normalize = False, fields = None, exclude = None, compact = False):
+    ''' Awaitable pff.get_events, without stream, see its documentation. '''
+    return await _get_client(url, key).get_events(game_id, normalize = normalize, fields = fields, exclude = exclude, compact = compact)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caches of raw API responses, for use with pff.PFFClient.
+
+A ResponseCache stores responses zlib-compressed in a single SQLite file, keyed on
+the query and variables of the request, a MemoryCache keeps them in the process.
+Clients pass their scope(), the API url and a hash of the API key, with every
+lookup, so that one cache can be shared between environments and API keys
+without answers of one being returned to another.
+"""
+import collections
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Time to live in seconds per entity, None means the entry never expires. Lists of
+# games and competitions change whenever a new matchday is added. The data of a game
+# changes while it is played and reviewed, so it only lives as long as given here
+# once the game is complete, see ResponseCache.ttl, and live_ttl before.
+DEFAULT_TTLS = {
+    'competitions': 3600,
+    'competition': 3600,
+    'teams': 3600,
+    'team': 3600,
+    'games': 3600,
+    'players_competition': 3600,
+    'scoring_events': 3600,
+    'game': 86400,
+    'player': 86400,
+    'roster': None,
+    'game_players': None,
+    'game_events': None,
+    'game_event': 600,
+    'events': None,
+    'otb_data': None,
+}
+
+# The entities of the data of a game, requested with the id of the game
+GAME_ENTITIES = ['roster', 'game_players', 'game_events', 'events', 'otb_data']
+
+def is_complete(game, settle_days = 2):
+    '''
+    Returns True if a game has ended more than settle_days after its date, so that its
+    data is no longer reviewed. game is a dictionary with at least its date and endPeriod2,
+    as returned by get_game with return_type = 'raw'.
+    '''
+    if not game:
+        return False
+    end, date = game.get('endPeriod2'), game.get('date')
+    # Null, or NaN once the game has been in a dataframe
+    if end is None or end != end or not isinstance(date, str):
+        return False
+    try:
+        date = datetime.datetime.fromisoformat(date.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    if date.tzinfo is None:
+        date = date.replace(tzinfo = datetime.timezone.utc)
+    return datetime.datetime.now(datetime.timezone.utc) - date > datetime.timedelta(days = settle_days)
+
+def _ttl(ttls, entity, game, settle_days, live_ttl):
+    # The data of a game that is not known to be complete lives for live_ttl at most
+    ttl = ttls.get(entity, 3600)
+    if (entity in GAME_ENTITIES or (entity == 'game' and game is not None)) and not is_complete(game, settle_days):
+        return live_ttl if ttl is None else min(ttl, live_ttl)
+    return ttl
+
+# Access times of hits are written in batches of this many, or before the next write
+_ACCESS_BATCH = 256
+
+def scope(url, key):
+    '''
+    Returns the scope of the entries of a client: its API url and a hash of its API
+    key, so that the key itself is never stored.
+    '''
+    return url + ' ' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def _matches(entity, variables, stored_entity, stored):
+    # Whether an entry has the entity and query variables given to invalidate or keep
+    if entity is not None and stored_entity != entity:
+        return False
+    stored = json.loads(stored) if stored else {}
+    return all(str(stored.get(name)) == str(value) for name, value in variables.items())
+
+class ResponseCache:
+    '''
+    An on-disk cache of raw API responses with a time to live per entity and
+    least-recently-used eviction once the cache grows beyond max_bytes.
+
+    Parameters
+    -----------
+
+    path: a string with the location of the cache file, defaults to '~/.cache/pypff/responses.sqlite'
+    max_bytes: an integer with the maximum compressed size of the cache, defaults to 2 GB
+    ttls: a dictionary of entity to time to live in seconds that overrides DEFAULT_TTLS
+    compression_level: an integer between 1 and 9 passed to zlib, defaults to 6
+    settle_days: a float with the number of days after its date during which a game that has
+    ended is still reviewed, and its data lives for live_ttl only, defaults to 2
+    live_ttl: an integer with the time to live in seconds of the data of games that are not
+    complete, or not known to be, defaults to 600
+
+    '''
+    def __init__(self, path = None, max_bytes = 2 * 1024 ** 3, ttls = None, compression_level = 6, settle_days = 2, live_ttl = 600):
+        if path is None:
+            path = os.path.join('~', '.cache', 'pypff', 'responses.sqlite')
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok = True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.compression_level = compression_level
+        self.settle_days = settle_days
+        self.live_ttl = live_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout = 30, check_same_thread = False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                  key TEXT PRIMARY KEY,
+                                  entity TEXT,
+                                  variables TEXT,
+                                  created REAL,
+                                  expires REAL,
+                                  accessed REAL,
+                                  size INTEGER,
+                                  data BLOB)''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._conn.commit()
+        # The size of the cache is kept up to date by every write, and only counted again before evicting
+        self._size = self._total()
+        self._accessed = {}
+
+    def _total(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl(self, entity, game = None):
+        '''
+        Returns the time to live in seconds of a response of an entity, None if it never
+        expires. The data of a game lives as long as its entity's time to live only if the
+        game is complete, see is_complete, and for live_ttl at most otherwise.
+
+        Parameters
+        -----------
+
+        entity: a string with the entity of the response, i.e. 'game_events'
+        game: a dictionary with the date and endPeriod2 of the game of the response,
+        defaults to None (not known)
+
+        '''
+        return _ttl(self.ttls, entity, game, self.settle_days, self.live_ttl)
+
+    @staticmethod
+    def _key(payload, scope = None):
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        if scope is not None:
+            payload = scope.encode('utf-8') + b'\n' + payload
+        return hashlib.sha256(payload).hexdigest()
+
+    @staticmethod
+    def _variables(payload):
+        try:
+            return json.dumps(json.loads(payload).get('variables', {}), sort_keys = True)
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def get(self, payload, scope = None):
+        '''
+        Returns the raw response for a payload, or None if it is not cached or expired.
+        The scope is the one the response was stored with, see scope().
+        '''
+        key = self._key(payload, scope)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT expires, data, size FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or (row[0] is not None and row[0] < now):
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._conn.commit()
+                    self._size -= row[2]
+                    self._accessed.pop(key, None)
+                self.misses += 1
+                return None
+            # A hit only changes the access time, which is written with the next batch
+            self._accessed[key] = now
+            if len(self._accessed) >= _ACCESS_BATCH:
+                self._write_accessed()
+                self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[1])
+
+    def _write_accessed(self):
+        self._conn.executemany('UPDATE responses SET accessed = ? WHERE key = ?', [(accessed, key) for key, accessed in self._accessed.items()])
+        self._accessed = {}
+
+    def set(self, payload, content, entity = None, scope = None, game = None):
+        '''
+        Stores the raw response of a payload, using the time to live of its entity and
+        game, see ttl.
+        '''
+        self.set_compressed(payload, zlib.compress(content, self.compression_level), entity, scope, game)
+
+    def compressor(self):
+        '''
+        Returns a zlib compressor for responses that are stored while they are streamed,
+        see set_compressed.
+        '''
+        return zlib.compressobj(self.compression_level)
+
+    def set_compressed(self, payload, data, entity = None, scope = None, game = None):
+        '''
+        Stores a response that has already been compressed with compressor().
+        '''
+        ttl = self.ttl(entity, game)
+        key = self._key(payload, scope)
+        now = time.time()
+        with self._lock:
+            self._write_accessed()
+            replaced = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               (key, entity, self._variables(payload), now, None if ttl is None else now + ttl, now, len(data), sqlite3.Binary(data)))
+            self._size += len(data) - (replaced[0] if replaced else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop the least recently used entries until the cache fits in max_bytes again
+        if self._size <= self.max_bytes:
+            return
+        # Other processes may share the file, so the size is counted again before anything is dropped
+        total = self._size = self._total()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed ASC').fetchall():
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._size = total
+
+    def invalidate(self, entity = None, **variables):
+        '''
+        Removes entries from the cache, i.e. invalidate('game_events', id = 1234)
+        removes the events of one game and invalidate('games') all lists of games.
+
+        Parameters
+        -----------
+
+        entity: a string to select the entity, defaults to None (all entities)
+        variables: the query variables that the entries must have, i.e. id = 1234
+
+        Returns
+        ---------
+
+        removed: an integer with the number of entries removed
+
+        '''
+        with self._lock:
+            rows = self._matching(entity, variables)
+            self._conn.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key, _ in rows])
+            self._conn.commit()
+            self._size -= sum(size for _, size in rows)
+            for key, _ in rows:
+                self._accessed.pop(key, None)
+        return len(rows)
+
+    def _matching(self, entity, variables):
+        # The keys and sizes of the entries with an entity and query variables
+        rows = self._conn.execute('SELECT key, entity, variables, size FROM responses' + (' WHERE entity = ?' if entity is not None else ''),
+                                  (entity,) if entity is not None else ()).fetchall()
+        return [(key, size) for key, stored_entity, stored, size in rows if _matches(entity, variables, stored_entity, stored)]
+
+    def keep(self, game_id):
+        '''
+        Keeps the cached data of a game without expiry, once the game is complete
+        and its data will not change anymore.
+
+        Parameters
+        -----------
+
+        game_id: an integer to select the game
+
+        Returns
+        ---------
+
+        kept: an integer with the number of entries kept
+
+        '''
+        with self._lock:
+            keys = [(key,) for entity in GAME_ENTITIES for key, _ in self._matching(entity, {'id': game_id})]
+            self._conn.executemany('UPDATE responses SET expires = NULL WHERE key = ?', keys)
+            self._conn.commit()
+        return len(keys)
+
+    def clear(self):
+        '''
+        Removes all entries from the cache and resets the counters.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._size, self._accessed = 0, {}
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of hits, misses, evictions, entries and the compressed size in bytes.
+        '''
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': entries, 'bytes': size}
+
+    def close(self):
+        with self._lock:
+            self._write_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+class MemoryCache:
+    '''
+    An in-process cache of raw API responses with a time to live per entity and
+    least-recently-used eviction once it holds more than max_entries responses or
+    more than max_bytes. It can be used wherever a ResponseCache can, and as the
+    memory_cache of pff.PFFClient in front of a ResponseCache. Streamed responses
+    are not kept.
+
+    Parameters
+    -----------
+
+    max_entries: an integer with the maximum number of responses kept, defaults to 4096
+    max_bytes: an integer with the maximum size of the responses kept, defaults to 64 MB
+    ttls: a dictionary of entity to time to live in seconds that overrides DEFAULT_TTLS
+    entities: a list of the entities to keep, i.e. ['player', 'team'], defaults to None (all entities)
+    settle_days, live_ttl: when the data of a game is complete and how long it lives before,
+    see ResponseCache, default to 2 and 600
+
+    '''
+    def __init__(self, max_entries = 4096, max_bytes = 64 * 1024 ** 2, ttls = None, entities = None, settle_days = 2, live_ttl = 600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.settle_days = settle_days
+        self.live_ttl = live_ttl
+        self.entities = frozenset(entities) if entities is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        # (scope, payload) to [expires, entity, variables, content], least recently used first
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+
+    def keeps(self, entity):
+        '''
+        Returns True if responses of an entity are kept.
+        '''
+        return entity is not None and (self.entities is None or entity in self.entities)
+
+    def get(self, payload, scope = None):
+        '''
+        Returns the raw response for a payload, or None if it is not cached or expired.
+        '''
+        key = (scope, payload)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] < time.time()):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[3]
+
+    def ttl(self, entity, game = None):
+        '''
+        Returns the time to live in seconds of a response of an entity, see ResponseCache.ttl.
+        '''
+        return _ttl(self.ttls, entity, game, self.settle_days, self.live_ttl)
+
+    def set(self, payload, content, entity = None, scope = None, game = None):
+        '''
+        Stores the raw response of a payload, using the time to live of its entity and
+        game, see ttl.
+        '''
+        if not self.keeps(entity):
+            return
+        ttl = self.ttl(entity, game)
+        key = (scope, payload)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = [None if ttl is None else time.time() + ttl, entity, ResponseCache._variables(payload), content]
+            self._bytes += len(content)
+            self._evict()
+
+    def compressor(self):
+        '''
+        Returns a zlib compressor for responses that are stored while they are streamed,
+        see set_compressed.
+        '''
+        return zlib.compressobj(1)
+
+    def set_compressed(self, payload, data, entity = None, scope = None, game = None):
+        '''
+        Stores a response that has already been compressed with compressor().
+        '''
+        if self.keeps(entity):
+            self.set(payload, zlib.decompress(data), entity, scope, game)
+
+    def _remove(self, key):
+        self._bytes -= len(self._entries.pop(key)[3])
+
+    def _evict(self):
+        # Drop the least recently used entries until the cache fits in its bounds again
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, entity = None, **variables):
+        '''
+        Removes entries from the cache, see ResponseCache.invalidate.
+
+        Returns
+        ---------
+
+        removed: an integer with the number of entries removed
+
+        '''
+        with self._lock:
+            keys = self._matching(entity, variables)
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def _matching(self, entity, variables):
+        return [key for key, (_, stored_entity, stored, _) in self._entries.items() if _matches(entity, variables, stored_entity, stored)]
+
+    def keep(self, game_id):
+        '''
+        Keeps the cached data of a game without expiry, see ResponseCache.keep.
+
+        Returns
+        ---------
+
+        kept: an integer with the number of entries kept
+
+        '''
+        with self._lock:
+            keys = [key for entity in GAME_ENTITIES for key in self._matching(entity, {'id': game_id})]
+            for key in keys:
+                self._entries[key][0] = None
+        return len(keys)
+
+    def clear(self):
+        '''
+        Removes all entries from the cache and resets the counters.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of hits, misses, evictions, entries and the size in bytes.
+        '''
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self._bytes}
+
+    def close(self):
+        pass
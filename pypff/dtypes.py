@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact dtypes for the dataframes of events, to keep a season in memory.
+
+By default enumerations and names are Python strings, and ids are floats or
+objects as soon as one value is missing. compact() converts
+
+- enumerations (gameEventType, possessionEventType, ...Type) to categoricals,
+  with the codes of the data specification as fixed categories, so the
+  categoricals of separate games share their categories,
+- ids (id and ...Id) to nullable Int32, or to 64 bit integers when they do not fit,
+- floats (clocks, durations, coordinates) to float32, other integers to the
+  smallest integer type, and booleans with missing values to nullable booleans,
+- other strings, i.e. names, to Arrow-backed strings when pyarrow is installed
+  (with pandas 3 they already are).
+
+Nested objects and lists are left as they are. float32 keeps 7 significant
+digits, which is about 0.5 ms for a startTime at the end of a game.
+
+    df, report = dtypes.compact(pff.get_otb_data(url, key, game_id), report = True)
+"""
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+# The codes of the data specification, values that are not listed are added after them
+CATEGORIES = {
+    'gameEventType': ['FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF', 'OTB', 'OUT', 'SUB', 'ON', 'OFF', 'END',
+                      'G', 'PAU', 'CLK', 'VID'],
+    'possessionEventType': ['PA', 'CR', 'SH', 'CL', 'BC', 'CH', 'RE', 'IT', 'TC'],
+    'setpieceType': ['O', 'C', 'F', 'G', 'K', 'P', 'T'],
+    'outType': ['A', 'H', 'T', 'G', 'C'],
+    'endType': ['T', 'G', 'C'],
+    'offType': ['R', 'I'],
+    'playerOffType': ['R', 'I'],
+    'bodyType': ['R', 'L', 'HE', 'O'],
+    'positionGroupType': ['GK', 'D', 'M', 'F'],
+    'side': ['offense', 'defense'],
+}
+
+# Enumerations that are not named ...Type
+ENUM_COLUMNS = frozenset(['gameEventType', 'possessionEventType', 'outType', 'setpieceType', 'positionGroupType',
+                          'ballCarryOutcome', 'eventModule', 'side', 'gender'])
+
+def is_enum(name):
+    return name in ENUM_COLUMNS or name.endswith('Type')
+
+def is_id(name):
+    return name == 'id' or name.endswith('Id')
+
+def _string_dtype():
+    # Strings stored as Python objects take as much memory as an object column, so they are left as they are
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype('pyarrow')
+    except ImportError:
+        return None
+
+def _categorical(series, name):
+    values = series.dropna().unique().tolist()
+    known = CATEGORIES.get(name, [])
+    categories = known + sorted(set(values) - set(known), key = str)
+    return pd.Categorical(series, categories = categories)
+
+def _integer_id(series):
+    values = pd.to_numeric(series)
+    if values.notna().any() and (values.dropna() % 1 != 0).any():
+        raise ValueError('not an integer id')
+    low, high = values.min(), values.max()
+    if values.isna().all() or (low >= np.iinfo(np.int32).min and high <= np.iinfo(np.int32).max):
+        return values.astype('Int32')
+    # Without missing values the mask of Int64 would only add memory
+    return values.astype('Int64' if values.isna().any() else 'int64')
+
+def compact_column(series, name = None):
+    '''
+    Converts a column to its compact dtype, see the module documentation.
+    Columns that cannot be converted are returned as they are.
+
+    Parameters
+    -----------
+
+    series: a series, i.e. a column of a dataframe of events
+    name: a string with the name of the column, defaults to the name of the series
+
+    '''
+    name = str(series.name if name is None else name)
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if is_id(name) and not pd.api.types.is_bool_dtype(dtype):
+        try:
+            return _integer_id(series)
+        except (ValueError, TypeError):
+            return series
+    if pd.api.types.is_float_dtype(dtype):
+        return series.astype('float32') if dtype == np.float64 else series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast = 'integer') if isinstance(dtype, np.dtype) else series
+    if dtype != object and not pd.api.types.is_string_dtype(dtype):
+        return series
+
+    # The kind of the values that are not missing, 'empty' if there are none
+    kind = 'string' if dtype != object else pd.api.types.infer_dtype(series, skipna = True)
+    if kind == 'string':
+        if is_enum(name):
+            return pd.Series(_categorical(series, name), index = series.index, name = series.name)
+        string_dtype = _string_dtype()
+        return series if dtype != object or string_dtype is None else series.astype(string_dtype)
+    if kind == 'boolean':
+        return series.astype('boolean')
+    return series
+
+def compact(df, report = False):
+    '''
+    Converts the columns of a dataframe to compact dtypes, see the module documentation.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_game_events, get_game_events_games, get_events or
+    get_otb_data, or a dictionary of normalized tables
+    report: a boolean to also return the memory used before and after, defaults to False
+
+
+    Returns
+    ---------
+
+    df: a dataframe with compact dtypes, or a dictionary of them
+    report: a dataframe as returned by memory_report, only if report is True
+
+    '''
+    if isinstance(df, dict):
+        tables = {name: compact(table) for name, table in df.items()}
+        if report:
+            return tables, pd.concat({name: memory_report(df[name], tables[name]) for name in df}, names = ['table', 'column'])
+        return tables
+
+    compacted = pd.DataFrame({col: compact_column(df[col], col) for col in df.columns}, index = df.index)
+    compacted.columns = df.columns
+    if report:
+        return compacted, memory_report(df, compacted)
+    return compacted
+
+def memory_report(before, after):
+    '''
+    Compares the memory of a dataframe before and after compact().
+
+    Returns
+    ---------
+
+    report: a dataframe with per column the dtype and MB before and after, and a
+    last row 'total'. Nested objects are counted by their outer dictionary or list only
+
+    '''
+    mb_before = before.memory_usage(index = False, deep = True) / 1024 ** 2
+    mb_after = after.memory_usage(index = False, deep = True) / 1024 ** 2
+    report = pd.DataFrame({'dtype_before': before.dtypes.astype(str), 'dtype_after': after.dtypes.astype(str),
+                           'MB_before': mb_before, 'MB_after': mb_after})
+    report.loc['total'] = ['', '', mb_before.sum(), mb_after.sum()]
+    report['saved'] = 1 - report['MB_after'] / report['MB_before']
+    return report
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Freeze frames packed into contiguous NumPy arrays, and vectorized spatial queries on them.
+
+The API returns the freeze frame of an event as the lists offenderLocations and
+defenderLocations of {eventModule, name, x, y} objects. FreezeFrames keeps the
+locations of many events in a CSR layout: the locations of event i are the rows
+offsets[i]:offsets[i + 1] of the arrays x, y, side and player, offenders first.
+Players are identified by name, as in the API, and stored as codes into players.
+
+A location costs 14 bytes instead of the 500 or so of a nested dictionary, and the
+queries below run over all events of a season at once, i.e.
+
+    df, frames = pff.get_game_events_games(url, key, games, pack_freeze_frames = True)
+    nearest = frames.nearest_defender(*frames.locate(df['player'].str['nickname']))
+    df['pressure'] = frames.pressure(df['player'].str['nickname'], radius = 3)
+"""
+import numpy as np
+import pandas as pd
+
+OFFENSE = 0
+DEFENSE = 1
+SIDES = np.array(['offense', 'defense'], dtype = object)
+
+LOCATION_COLUMNS = ['offenderLocations', 'defenderLocations']
+
+def _side_code(side):
+    if side is None:
+        return None
+    if side not in ('offense', 'defense'):
+        raise ValueError("side must be 'offense', 'defense' or None, not " + repr(side))
+    return OFFENSE if side == 'offense' else DEFENSE
+
+def _ids(values):
+    return pd.to_numeric(pd.Series(values, dtype = object), errors = 'coerce').fillna(-1).to_numpy(np.int64)
+
+class FreezeFrames:
+    '''
+    The freeze frames of a sequence of events, i.e. of the rows of a game events dataframe.
+
+    Parameters
+    -----------
+
+    event_ids: an array of integers with the id of every event
+    offsets: an array of n_events + 1 integers, the locations of event i are the rows offsets[i]:offsets[i + 1]
+    x, y: arrays of floats with the coordinates of every location
+    side: an array of integers, OFFENSE or DEFENSE, for every location
+    player: an array of integers with the code of the player of every location in players, -1 if unknown
+    players: an array of the names of the players
+    game_ids: an array of integers with the game of every event, defaults to None (-1)
+
+    '''
+    def __init__(self, event_ids, offsets, x, y, side, player, players, game_ids = None):
+        self.event_ids = np.asarray(event_ids, dtype = np.int64)
+        self.game_ids = np.full(len(self.event_ids), -1, dtype = np.int64) if game_ids is None else np.asarray(game_ids, dtype = np.int64)
+        self.offsets = np.asarray(offsets, dtype = np.int64)
+        self.x = np.asarray(x, dtype = np.float32)
+        self.y = np.asarray(y, dtype = np.float32)
+        self.side = np.asarray(side, dtype = np.int8)
+        self.player = np.asarray(player, dtype = np.int32)
+        self.players = np.asarray(players, dtype = object)
+        self._event_index = None
+
+    @classmethod
+    def from_frame(cls, df):
+        '''
+        Packs the offenderLocations and defenderLocations columns of a game events dataframe,
+        as returned by get_game_events, keeping the order of its rows.
+        '''
+        n = len(df)
+        parts = []
+        for side, column in ((OFFENSE, 'offenderLocations'), (DEFENSE, 'defenderLocations')):
+            values = df[column].tolist() if column in df.columns else [None] * n
+            values = [value if isinstance(value, list) else [] for value in values]
+            locations = [location for value in values for location in value]
+            counts = np.fromiter(map(len, values), dtype = np.int64, count = n)
+            # None coordinates become NaN
+            parts.append((np.repeat(np.arange(n), counts), np.full(len(locations), side), counts,
+                          np.array([location.get('x') for location in locations], dtype = float),
+                          np.array([location.get('y') for location in locations], dtype = float),
+                          [location.get('name') for location in locations]))
+
+        # Offenders first within every event
+        event = np.concatenate([part[0] for part in parts])
+        order = np.argsort(event, kind = 'stable')
+        counts = parts[0][2] + parts[1][2]
+        codes, players = pd.factorize(pd.Series(parts[0][5] + parts[1][5], dtype = object))
+        game_ids = _ids(df['gameId']) if 'gameId' in df.columns else None
+        return cls(_ids(df['id']) if 'id' in df.columns else np.arange(n), np.concatenate([[0], np.cumsum(counts)]),
+                   np.concatenate([part[3] for part in parts])[order], np.concatenate([part[4] for part in parts])[order],
+                   np.concatenate([part[1] for part in parts])[order], codes[order], np.asarray(players, dtype = object), game_ids)
+
+    @classmethod
+    def from_locations(cls, locations, event_ids = None):
+        '''
+        Packs the 'locations' table of normalized game events.
+
+        Parameters
+        -----------
+
+        locations: a dataframe with the columns gameEventId, side, name, x and y
+        event_ids: the ids of the events to pack, in order, i.e. tables['game_events']['id'],
+        defaults to None (the events that have locations, in order of their ids)
+
+        '''
+        event = _ids(locations['gameEventId'])
+        if event_ids is None:
+            event_ids = np.unique(event)
+        event_ids = np.asarray(event_ids, dtype = np.int64)
+        positions = pd.Index(event_ids).get_indexer(event)
+        side = np.where(locations['side'].to_numpy(object) == 'defense', DEFENSE, OFFENSE)
+        kept = np.flatnonzero(positions >= 0)
+        order = kept[np.lexsort((side[kept], positions[kept]))]
+
+        codes, players = pd.factorize(locations['name'].to_numpy(object)[order])
+        counts = np.bincount(positions[order], minlength = len(event_ids))
+        return cls(event_ids, np.concatenate([[0], np.cumsum(counts)]), pd.to_numeric(locations['x']).to_numpy(float)[order],
+                   pd.to_numeric(locations['y']).to_numpy(float)[order], side[order], codes, np.asarray(players, dtype = object))
+
+    @classmethod
+    def concat(cls, frames_list):
+        '''
+        Concatenates freeze frames, i.e. of separate games, into one.
+        '''
+        frames_list = list(frames_list)
+        if not frames_list:
+            return cls([], [0], [], [], [], [], [])
+        players = pd.Index(np.concatenate([frames.players for frames in frames_list])).unique()
+        player_codes = []
+        for frames in frames_list:
+            mapping = players.get_indexer(frames.players)
+            player_codes.append(np.where(frames.player >= 0, mapping[frames.player], -1))
+        starts = np.cumsum([0] + [len(frames.x) for frames in frames_list[:-1]])
+        offsets = np.concatenate([[0]] + [frames.offsets[1:] + start for frames, start in zip(frames_list, starts)])
+        return cls(np.concatenate([frames.event_ids for frames in frames_list]), offsets, np.concatenate([frames.x for frames in frames_list]),
+                   np.concatenate([frames.y for frames in frames_list]), np.concatenate([frames.side for frames in frames_list]),
+                   np.concatenate(player_codes), np.asarray(players, dtype = object), np.concatenate([frames.game_ids for frames in frames_list]))
+
+    def __len__(self):
+        return len(self.event_ids)
+
+    def __repr__(self):
+        return 'FreezeFrames(%d events, %d locations, %.1f MB)' % (len(self), len(self.x), self.nbytes / 1024 ** 2)
+
+    @property
+    def counts(self):
+        ''' The number of locations of every event. '''
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        ''' The memory used by the arrays, and roughly by the names of the players. '''
+        arrays = [self.event_ids, self.game_ids, self.offsets, self.x, self.y, self.side, self.player, self.players]
+        return sum(array.nbytes for array in arrays) + sum(len(name) + 49 for name in self.players if isinstance(name, str))
+
+    @property
+    def event_index(self):
+        ''' The position of the event of every location. '''
+        if self._event_index is None:
+            self._event_index = np.repeat(np.arange(len(self), dtype = np.int64), self.counts)
+        return self._event_index
+
+    def take(self, positions):
+        '''
+        Returns the freeze frames of a subset of the events, given as positions or a boolean mask,
+        i.e. frames.take(df['gameEventType'] == 'OTB').
+        '''
+        positions = np.asarray(positions)
+        if positions.dtype == bool:
+            positions = np.flatnonzero(positions)
+        counts = self.counts[positions]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        rows = np.repeat(self.offsets[positions] - offsets[:-1], counts) + np.arange(offsets[-1])
+        return FreezeFrames(self.event_ids[positions], offsets, self.x[rows], self.y[rows], self.side[rows], self.player[rows], self.players,
+                            self.game_ids[positions])
+
+    def to_frame(self):
+        '''
+        Returns the locations as a dataframe with the columns gameId, gameEventId, side, name, x and y.
+        '''
+        names = np.append(self.players, None)[self.player]
+        return pd.DataFrame({'gameId': self.game_ids[self.event_index], 'gameEventId': self.event_ids[self.event_index],
+                             'side': SIDES[self.side], 'name': names, 'x': self.x, 'y': self.y})
+
+    def distances(self, x, y, side = None):
+        '''
+        Returns the distance of every location to a point of its event.
+
+        Parameters
+        -----------
+
+        x, y: arrays with a coordinate of every event, i.e. of the ball or of the player on the ball
+        side: a string, 'offense' or 'defense', to only measure the players of one side; the
+        other locations get NaN. Defaults to None (all players)
+
+        '''
+        counts = self.counts
+        distance = np.hypot(self.x - np.repeat(np.asarray(x, dtype = float), counts), self.y - np.repeat(np.asarray(y, dtype = float), counts))
+        code = _side_code(side)
+        if code is not None:
+            distance[self.side != code] = np.nan
+        return distance
+
+    def nearest(self, x, y, side = 'defense'):
+        '''
+        Finds the player of a side nearest to a point of every event.
+
+        Returns
+        ---------
+
+        df: a dataframe with a row per event and the columns gameEventId, name, x, y and
+        distance of the nearest player, NaN when the event has no player of that side
+
+        '''
+        distance = self.distances(x, y, side)
+        # Sort the locations by event and then by distance, the first of every event is the nearest
+        order = np.lexsort((np.where(np.isnan(distance), np.inf, distance), self.event_index))
+        found = np.flatnonzero(self.counts > 0)
+        first = order[self.offsets[found]]
+        first = first[~np.isnan(distance[first])]
+        events = self.event_index[first]
+
+        df = pd.DataFrame({'gameEventId': self.event_ids, 'name': None, 'x': np.nan, 'y': np.nan, 'distance': np.nan})
+        df.loc[events, 'name'] = np.append(self.players, None)[self.player[first]]
+        df.loc[events, 'x'] = self.x[first]
+        df.loc[events, 'y'] = self.y[first]
+        df.loc[events, 'distance'] = distance[first]
+        return df
+
+    def nearest_defender(self, x, y):
+        ''' Finds the defender nearest to a point of every event, see nearest(). '''
+        return self.nearest(x, y, 'defense')
+
+    def within(self, x, y, radius, side = 'defense'):
+        '''
+        Counts the players of a side within radius of a point of every event.
+
+        Returns
+        ---------
+
+        counts: an array of integers with a count per event
+
+        '''
+        inside = self.distances(x, y, side) <= radius
+        return np.bincount(self.event_index[inside], minlength = len(self))
+
+    def players_within(self, x, y, radius, side = 'defense'):
+        '''
+        Finds the players of a side within radius of a point of every event.
+
+        Returns
+        ---------
+
+        df: a dataframe with a row per player found and the columns gameEventId, side, name, x, y and distance
+
+        '''
+        distance = self.distances(x, y, side)
+        rows = np.flatnonzero(distance <= radius)
+        return pd.DataFrame({'gameEventId': self.event_ids[self.event_index[rows]], 'side': SIDES[self.side[rows]],
+                             'name': np.append(self.players, None)[self.player[rows]], 'x': self.x[rows], 'y': self.y[rows],
+                             'distance': distance[rows]})
+
+    def locate(self, names):
+        '''
+        Returns the x and y of a named player in the freeze frame of every event, i.e.
+        of the player on the ball with frames.locate(df['player'].str['nickname']).
+        Events without that player get NaN.
+        '''
+        codes = np.repeat(pd.Index(self.players).get_indexer(pd.Index(list(names), dtype = object)), self.counts)
+        rows = np.flatnonzero((self.player == codes) & (codes >= 0))
+        events, first = np.unique(self.event_index[rows], return_index = True)
+        x = np.full(len(self), np.nan)
+        y = np.full(len(self), np.nan)
+        x[events] = self.x[rows[first]]
+        y[events] = self.y[rows[first]]
+        return x, y
+
+    def pressure(self, names, radius = 3.0):
+        '''
+        Counts the defenders within radius of a named player of every event, i.e. the
+        player on the ball. Events without that player count 0.
+        '''
+        x, y = self.locate(names)
+        return self.within(x, y, radius, 'defense')
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Timing and size events of the API calls, to find out where the time of a job goes.
+
+Hooks are callables that receive every event as a dictionary. Every request that
+is sent, or answered from the cache, gives a 'request' event:
+
+    {'event': 'request', 'function': 'get_games', 'query': 'competition', 'variables': {'id': 1},
+     'status': 200, 'bytes': 301234, 'retries': 0, 'cached': False, 'network': 0.41}
+
+and every call of a method of PFFClient, and so of every module-level function,
+gives a 'call' event when it returns, that adds up the requests of the call:
+
+    {'event': 'call', 'function': 'get_games', 'arguments': {'competition_id': 1}, 'requests': 1,
+     'cached': 0, 'retries': 0, 'bytes': 301234, 'rows': 380, 'wall': 0.52, 'queue': 0.0,
+     'network': 0.41, 'parse': 0.03, 'transform': 0.08, 'error': None}
+
+queue is the time spent waiting for the scheduler of the client, if any, network
+the time from sending a request until its body has been received, parse the time
+spent decoding JSON and transform the time spent building dataframes, records or
+tables from the decoded data. Calls that run requests on several threads, i.e.
+get_game_events_games with max_workers, add up these times over the threads, so
+that they can exceed the wall time. Functions that return a generator, i.e. iter_game_events,
+report their call when the generator is exhausted, coroutines of pypff.aio when
+they have been awaited.
+
+    from pypff import instrument
+
+    with instrument.Summary() as summary:
+        df = pff.get_game_events_games(url, key, games)
+    summary.print()
+
+Without hooks, the calls of the library are not measured.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import re
+import threading
+import time
+
+_hooks = []
+_hooks_lock = threading.Lock()
+
+# The call that requests and decoding are counted towards, shared with the threads of that call
+_current = contextvars.ContextVar('pypff_call', default = None)
+
+# The transform that runs on a thread, if any, and the waiting and decoding time it should leave out
+_transforming = threading.local()
+
+_QUERY_NAME = re.compile(r'\s*(?:query|mutation)?\s*(\w+)')
+
+def add_hook(hook):
+    '''
+    Registers a callable that receives every event as a dictionary.
+    '''
+    with _hooks_lock:
+        _hooks.append(hook)
+
+def remove_hook(hook):
+    '''
+    Unregisters a callable that was registered with add_hook.
+    '''
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+@contextlib.contextmanager
+def hooked(hook):
+    '''
+    Registers a hook for the duration of a with block, i.e. with hooked(print): ...
+    '''
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+def enabled():
+    return bool(_hooks)
+
+def _emit(event):
+    for hook in list(_hooks):
+        hook(event)
+
+class _Call:
+    def __init__(self, function, arguments):
+        self.function = function
+        self.arguments = arguments
+        self.lock = threading.Lock()
+        self.totals = {'requests': 0, 'cached': 0, 'retries': 0, 'bytes': 0, 'rows': 0, 'wall': 0.0, 'queue': 0.0, 'network': 0.0, 'parse': 0.0,
+                       'transform': 0.0}
+
+    def add(self, **amounts):
+        if getattr(_transforming, 'active', False):
+            # A transform that consumes a streamed response waits for and decodes it on the way
+            _transforming.excluded += sum(amounts.get(name, 0.0) for name in ('queue', 'network', 'parse'))
+        with self.lock:
+            for name, amount in amounts.items():
+                self.totals[name] += amount
+
+    def emit(self, error = None):
+        _emit(dict({'event': 'call', 'function': self.function, 'arguments': self.arguments}, error = error, **self.totals))
+
+def record(**amounts):
+    '''
+    Adds amounts, i.e. parse = 0.2, to the call that is being measured, if any.
+    '''
+    call = _current.get()
+    if call is not None:
+        call.add(**amounts)
+
+def transform(function):
+    '''
+    Decorates a function that builds the result of a call from decoded data, i.e. a
+    dataframe, so that its time counts as transform time of the call being measured.
+    Transforms called by a transform count towards the outer one.
+    '''
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        call = _current.get()
+        if call is None or getattr(_transforming, 'active', False):
+            return function(*args, **kwargs)
+        _transforming.active, _transforming.excluded = True, 0.0
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _transforming.active = False
+            call.add(transform = max(0.0, time.perf_counter() - start - _transforming.excluded))
+    return wrapper
+
+def _rows(result):
+    # Tuples hold the dataframe first, i.e. (df, failures), dictionaries hold normalized tables,
+    # raw answers per id, or a single raw object
+    if isinstance(result, tuple):
+        result = result[0] if result else None
+    if isinstance(result, dict):
+        values = list(result.values())
+        if all(isinstance(value, list) or hasattr(value, 'columns') for value in values):
+            return sum(len(value) for value in values)
+        return len(values) if all(isinstance(value, dict) for value in values) else 1
+    try:
+        return len(result) if result is not None else 0
+    except TypeError:
+        return 0
+
+def request(payload, status, size, seconds, retries = 0, cached = False):
+    '''
+    Reports a request that was answered, see the module documentation.
+
+    Parameters
+    -----------
+
+    payload: a string with the JSON body of the request
+    status: an integer with the HTTP status of the answer
+    size: an integer with the number of bytes of the answer
+    seconds: a float with the time from sending the request until the answer was received
+    retries: an integer with the number of times the request was sent again
+    cached: a boolean, True if the answer came from the cache
+
+    '''
+    call = _current.get()
+    if call is not None:
+        call.add(requests = 1, cached = int(cached), retries = retries, bytes = size, network = seconds)
+    if not _hooks:
+        return
+    try:
+        body = json.loads(payload)
+        query, variables = _QUERY_NAME.match(body['query']).group(1), body.get('variables')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        query, variables = None, None
+    _emit({'event': 'request', 'function': call.function if call is not None else None, 'query': query, 'variables': variables,
+           'status': status, 'bytes': size, 'retries': retries, 'cached': cached, 'network': seconds})
+
+def retries(response):
+    '''
+    Returns the number of retries it took to get a response of requests.
+    '''
+    history = getattr(getattr(response.raw, 'retries', None), 'history', None)
+    return len(history) if history else 0
+
+def _arguments(signature, args, kwargs):
+    try:
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        return {}
+    arguments.pop('self', None)
+    return dict(arguments)
+
+def _iterate(call, generator):
+    # Measures a generator while it is consumed, and reports the call once it is exhausted
+    error = None
+    try:
+        while True:
+            token = _current.set(call)
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                call.add(wall = time.perf_counter() - start)
+                _current.reset(token)
+            call.add(rows = _rows(item))
+            yield item
+    except GeneratorExit:
+        # The consumer stopped early, which is not an error
+        raise
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        generator.close()
+        call.emit(error)
+
+def instrumented(method):
+    '''
+    Decorates a method of the client so that each call reports a 'call' event.
+    Calls made by a call that is already measured count towards that call.
+    '''
+    signature = inspect.signature(method)
+    if inspect.iscoroutinefunction(method):
+        return _instrumented_coroutine(method, signature)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not _hooks or _current.get() is not None:
+            return method(*args, **kwargs)
+        call = _Call(method.__name__, _arguments(signature, args, kwargs))
+        token = _current.set(call)
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException as e:
+            call.add(wall = time.perf_counter() - start)
+            call.emit(repr(e))
+            raise
+        finally:
+            _current.reset(token)
+        call.add(wall = time.perf_counter() - start)
+        if inspect.isgenerator(result):
+            return _iterate(call, result)
+        call.add(rows = _rows(result))
+        call.emit()
+        return result
+    return wrapper
+
+def _instrumented_coroutine(method, signature):
+    # The call of a coroutine lasts until it is awaited to the end, every task has its own context
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if not _hooks or _current.get() is not None:
+            return await method(*args, **kwargs)
+        call = _Call(method.__name__, _arguments(signature, args, kwargs))
+        token = _current.set(call)
+        start = time.perf_counter()
+        try:
+            result = await method(*args, **kwargs)
+        except BaseException as e:
+            call.add(wall = time.perf_counter() - start)
+            call.emit(repr(e))
+            raise
+        finally:
+            _current.reset(token)
+        call.add(wall = time.perf_counter() - start, rows = _rows(result))
+        call.emit()
+        return result
+    return wrapper
+
+def timed_chunks(chunks, payload, status, seconds = 0.0, retries = 0):
+    '''
+    Yields the chunks of a streamed body and reports the request once the body has
+    been received, counting the time spent waiting for chunks as network time.
+
+    Parameters
+    -----------
+
+    chunks: an iterable of bytes, i.e. response.iter_content()
+    payload, status, retries: see request()
+    seconds: a float with the time it took to receive the headers
+
+    '''
+    chunks = iter(chunks)
+    size = 0
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        seconds += time.perf_counter() - start
+        if chunk is None:
+            break
+        size += len(chunk)
+        yield chunk
+    request(payload, status, size, seconds, retries)
+
+class Summary:
+    '''
+    A hook that collects events and summarizes them per function. Use it as a
+    context manager to register it for the duration of a with block.
+
+    Parameters
+    -----------
+
+    keep_requests: a boolean to also keep every request event in summary.requests, defaults to True
+
+    '''
+    def __init__(self, keep_requests = True):
+        self.keep_requests = keep_requests
+        self.calls = []
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        with self.lock:
+            if event['event'] == 'call':
+                self.calls.append(event)
+            elif self.keep_requests:
+                self.requests.append(event)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        remove_hook(self)
+
+    def table(self):
+        '''
+        Returns a dataframe with per function the number of calls, errors, requests,
+        cached answers and retries, the MB received, the rows returned, and the total
+        wall, queue, network, parse and transform seconds, slowest function first.
+        '''
+        import pandas as pd
+        columns = ['calls', 'errors', 'requests', 'cached', 'retries', 'MB', 'rows', 'wall', 'queue', 'network', 'parse', 'transform']
+        if not self.calls:
+            return pd.DataFrame(columns = columns)
+        df = pd.DataFrame(self.calls)
+        df['calls'] = 1
+        df['errors'] = df['error'].notna().astype(int)
+        df['MB'] = df['bytes'] / 1024 ** 2
+        df = df.groupby('function')[columns].sum().sort_values('wall', ascending = False)
+        df['wall/call'] = df['wall'] / df['calls']
+        return df
+
+    def print(self):
+        print(self.table().to_string(float_format = lambda value: '%.3f' % value))
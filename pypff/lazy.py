@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defers importing heavy modules until they are used.
+
+Importing pandas, numpy and tqdm takes most of the time of importing pypff. A
+service that only asks for records, see the return_type of the functions in
+pypff.pff, never needs them, so they are imported on the first attribute access:
+
+    pd = LazyModule('pandas')
+    pd.DataFrame(...)    # imports pandas here
+"""
+import importlib
+import threading
+
+class LazyModule:
+    '''
+    Stands in for a module and imports it on the first attribute access.
+
+    Parameters
+    -----------
+
+    name: a string with the name of the module, i.e. 'pandas'
+
+    '''
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        # Only called for attributes that are not set in __init__, i.e. those of the module
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = 'imported' if self._module is not None else 'not imported'
+        return '<lazy module %r (%s)>' % (self._name, state)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Who was on the pitch, and for how long, derived from the On-The-Ball data.
+
+get_otb_data returns the kickoff of every period, the SUB, ON, OFF and END events
+with playerOnId and playerOffId, and the player on the ball of every other event.
+From one or many games of those rows, concatenated in any order, this module builds
+
+- periods(): the start and end of every period,
+- intervals(): a row per spell of a player on the pitch, from kick-off or coming on
+  until going off or the end of the game,
+- minutes_played(): the minutes of every player per game, or summed over games,
+- lineups(): the players of both teams on the pitch at every event,
+
+with grouped pandas and NumPy operations over all games at once. Time on the pitch
+is counted in startTime, within periods, so half-time does not count and stoppage
+time does.
+
+    df = pd.concat([pff.get_otb_data(url, key, game_id) for game_id in game_ids], ignore_index = True)
+    minutes = lineups.minutes_played(df)
+
+The starting line-ups are not part of the On-The-Ball data. By default a player
+started when they were on the ball, or went off, before being brought on; a
+starter who does neither is missed. Pass the starters, i.e. the rows of
+get_rosters with started True, to use them instead.
+"""
+import numpy as np
+import pandas as pd
+
+KICKOFFS = ['FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF']
+
+_ON_TYPES = ['SUB', 'ON']
+_OFF_TYPES = ['SUB', 'OFF']
+
+_INTERVAL_COLUMNS = ['gameId', 'teamId', 'playerId', 'playerName', 'started', 'start', 'end', 'startGameClock', 'endGameClock',
+                     'onReason', 'offReason', 'offType', 'seconds', 'minutes']
+
+def _events(df):
+    # The columns that are used, ordered by game and time; the order of the rows of a game is kept for ties
+    columns = ['gameId', 'gameEventType', 'startTime', 'gameClock', 'teamId', 'playerId', 'playerName', 'playerOnId', 'playerOnName',
+               'playerOffId', 'playerOffName', 'offType']
+    events = df[[col for col in columns if col in df.columns]].reset_index(drop = True)
+    for col in columns:
+        if col not in events.columns:
+            events[col] = np.nan
+    # Concatenated results of get_otb_data are in order already, which is cheaper to check than to sort
+    game_ids = pd.to_numeric(events['gameId']).to_numpy()
+    times = events['startTime'].to_numpy(float)
+    order = np.lexsort((np.where(np.isnan(times), np.inf, times), game_ids))
+    return events if (order == np.arange(len(order))).all() else events.take(order)
+
+def periods(df):
+    '''
+    Finds the periods of every game, from their kickoff to their END event.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data, or several of them concatenated
+
+
+    Returns
+    ---------
+
+    df: a dataframe with a row per game and period and the columns gameId, period, start and
+    end (startTime), and startGameClock and endGameClock. A period without an END event ends
+    at its last event, a game without kickoffs is one period from its first to its last event
+
+    '''
+    return _periods(_events(df))
+
+def _periods(events):
+    kickoff = events['gameEventType'].isin(KICKOFFS)
+    period = kickoff.astype(int).groupby(events['gameId']).cumsum()
+    has_kickoff = kickoff.groupby(events['gameId']).transform('any')
+    events = events.assign(period = period.where(has_kickoff, 1))
+    events = events[(events['period'] > 0) & events['startTime'].notna()]
+
+    end = events['gameEventType'] == 'END'
+    events = events.assign(endTime = events['startTime'].where(end), endClock = events['gameClock'].where(end))
+    grouped = events.groupby(['gameId', 'period'], sort = True)
+    result = grouped.agg(start = ('startTime', 'first'), startGameClock = ('gameClock', 'first'), last = ('startTime', 'last'),
+                         lastGameClock = ('gameClock', 'last'), end = ('endTime', 'max'), endGameClock = ('endClock', 'max')).reset_index()
+    result['end'] = result['end'].fillna(result['last'])
+    result['endGameClock'] = result['endGameClock'].fillna(result['lastGameClock'])
+    return result[['gameId', 'period', 'start', 'end', 'startGameClock', 'endGameClock']]
+
+def _players(events, id_column, name_column, kind, types = None):
+    rows = events if types is None else events[events['gameEventType'].isin(types)]
+    rows = rows[rows[id_column].notna() & rows['teamId'].notna()]
+    if kind == 'TOUCH':
+        # Only the first time a player is on the ball tells whether they started
+        rows = rows.drop_duplicates(['gameId', 'teamId', id_column])
+    return pd.DataFrame({'gameId': rows['gameId'].to_numpy(), 'teamId': rows['teamId'].to_numpy(), 'playerId': rows[id_column].to_numpy(),
+                         'playerName': rows[name_column].to_numpy(object), 'time': rows['startTime'].to_numpy(float),
+                         'gameClock': rows['gameClock'].to_numpy(float), 'kind': kind, 'reason': rows['gameEventType'].to_numpy(object),
+                         'offType': rows['offType'].to_numpy(object)})
+
+def _starters(starters):
+    # A dataframe with gameId, teamId and playerId, or the rows of get_rosters
+    if 'started' in starters.columns:
+        starters = starters[starters['started'].fillna(False).astype(bool)]
+    if 'playerId' not in starters.columns:
+        ref = lambda value, field: value.get(field) if isinstance(value, dict) else None
+        starters = pd.DataFrame({'gameId': starters['game_id'] if 'game_id' in starters.columns else starters['gameId'],
+                                 'teamId': starters['team'].map(lambda value: ref(value, 'id')),
+                                 'playerId': starters['player'].map(lambda value: ref(value, 'id')),
+                                 'playerName': starters['player'].map(lambda value: ref(value, 'nickname'))})
+    starters = starters.dropna(subset = ['gameId', 'teamId', 'playerId'])
+    result = pd.DataFrame({col: pd.to_numeric(starters[col]).astype('int64').to_numpy() for col in ['gameId', 'teamId', 'playerId']})
+    result['playerName'] = starters['playerName'].to_numpy(object) if 'playerName' in starters.columns else None
+    return result
+
+# The order of records at the same time: coming on first, so a player who comes on and touches the ball at once is not a starter
+_KIND_ORDER = {'ON': 0, 'OFF': 1, 'TOUCH': 2}
+
+def intervals(df, starters = None):
+    '''
+    Finds every spell of a player on the pitch.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data, or several of them concatenated
+    starters: a dataframe with the columns gameId, teamId and playerId of the players that started,
+    or the result of get_rosters, of which the rows with started True are used. Games that are not
+    in it get their starters inferred, see the module documentation. Defaults to None (all inferred)
+
+
+    Returns
+    ---------
+
+    df: a dataframe with a row per spell and the columns gameId, teamId, playerId, playerName,
+    started, start and end (startTime), startGameClock and endGameClock, onReason ('START', 'SUB'
+    or 'ON'), offReason ('SUB', 'OFF' or 'END'), offType of the event that ended it ('R' for a red
+    card), and the seconds and minutes on the pitch within the periods
+
+    '''
+    events = _events(df)
+    game_periods = _periods(events)
+    if events.empty or game_periods.empty:
+        return pd.DataFrame(columns = _INTERVAL_COLUMNS)
+    games = game_periods.groupby('gameId').agg(gameStart = ('start', 'first'), gameStartClock = ('startGameClock', 'first'),
+                                               gameEnd = ('end', 'last'), gameEndClock = ('endGameClock', 'last'))
+
+    records = pd.concat([_players(events, 'playerId', 'playerName', 'TOUCH'),
+                         _players(events, 'playerOnId', 'playerOnName', 'ON', _ON_TYPES),
+                         _players(events, 'playerOffId', 'playerOffName', 'OFF', _OFF_TYPES)], ignore_index = True)
+    for col in ['gameId', 'teamId', 'playerId']:
+        records[col] = pd.to_numeric(records[col]).astype('int64')
+    records['order'] = records['kind'].map(_KIND_ORDER)
+    records = records.sort_values(['gameId', 'teamId', 'playerId', 'time', 'order'], kind = 'stable')
+    keys = ['gameId', 'teamId', 'playerId']
+
+    # A player started when their first record is not coming on
+    first = records.drop_duplicates(keys)
+    inferred = first.loc[first['kind'] != 'ON', keys + ['playerName']]
+    if starters is not None:
+        given = _starters(starters)
+        inferred = pd.concat([inferred[~inferred['gameId'].isin(given['gameId'])], given], ignore_index = True)
+    names = records.dropna(subset = ['playerName']).drop_duplicates(keys)[keys + ['playerName']]
+    start_rows = inferred[keys].merge(games[['gameStart', 'gameStartClock']], left_on = 'gameId', right_index = True)
+    start_rows = pd.DataFrame({'gameId': start_rows['gameId'], 'teamId': start_rows['teamId'], 'playerId': start_rows['playerId'],
+                               'time': start_rows['gameStart'], 'gameClock': start_rows['gameStartClock'], 'kind': 'START', 'reason': 'START',
+                               'order': -1})
+
+    changes = pd.concat([start_rows, records[records['kind'] != 'TOUCH'].drop(columns = ['playerName'])], ignore_index = True)
+    changes['on'] = changes['kind'].isin(['START', 'ON'])
+    changes = changes.sort_values(keys + ['time', 'order'], kind = 'stable').reset_index(drop = True)
+
+    # A spell starts when a player who is off comes on, and ends at the next change of that player if it takes them off
+    same = (changes[keys].shift() == changes[keys]).all(axis = 1)
+    was_on = changes['on'].shift(fill_value = False) & same
+    starts = changes[changes['on'] & ~was_on]
+    next_off = pd.Series(np.where(changes['on'], np.nan, changes.index), index = changes.index).groupby([changes[col] for col in keys]).bfill()
+    closed = next_off.loc[starts.index].notna().to_numpy()
+    ends = changes.reindex(next_off.loc[starts.index].fillna(-1).astype(int).to_numpy())
+
+    result = starts[keys].reset_index(drop = True)
+    result = result.merge(games, left_on = 'gameId', right_index = True, how = 'left')
+    result['started'] = (starts['kind'] == 'START').to_numpy()
+    result['start'] = starts['time'].to_numpy(float)
+    result['end'] = np.where(closed, ends['time'].to_numpy(float), result['gameEnd'].to_numpy(float))
+    result['startGameClock'] = starts['gameClock'].to_numpy(float)
+    result['endGameClock'] = np.where(closed, ends['gameClock'].to_numpy(float), result['gameEndClock'].to_numpy(float))
+    result['onReason'] = starts['reason'].to_numpy(object)
+    result['offReason'] = np.where(closed, ends['reason'].to_numpy(object), 'END').astype(object)
+    result['offType'] = np.where(closed, ends['offType'].to_numpy(object), None)
+
+    result = result.merge(names, on = keys, how = 'left')
+    result['seconds'] = _seconds_on_pitch(result, game_periods)
+    result['minutes'] = result['seconds'] / 60
+    return result.sort_values(['gameId', 'teamId', 'start', 'playerId'], kind = 'stable')[_INTERVAL_COLUMNS].reset_index(drop = True)
+
+def _seconds_on_pitch(spells, game_periods):
+    # The overlap of every spell with the periods of its game
+    overlap = spells[['gameId', 'start', 'end']].reset_index().merge(game_periods[['gameId', 'start', 'end']], on = 'gameId', suffixes = ('', 'Period'))
+    seconds = (np.minimum(overlap['end'], overlap['endPeriod']) - np.maximum(overlap['start'], overlap['startPeriod'])).clip(lower = 0)
+    return seconds.groupby(overlap['index']).sum().reindex(spells.index, fill_value = 0.0).to_numpy()
+
+def minutes_played(df, starters = None, per_game = True):
+    '''
+    Counts the minutes every player was on the pitch.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data, or several of them concatenated
+    starters: see intervals()
+    per_game: a boolean, True for a row per player and game, False for a row per player and
+    team summed over the games. Defaults to True
+
+
+    Returns
+    ---------
+
+    df: a dataframe with the columns gameId (per game only), teamId, playerId, playerName, started,
+    subbedOn, subbedOff, sentOff and minutes; summed over games, games counts the games played
+    and started, subbedOn, subbedOff and sentOff count games
+
+    '''
+    spells = intervals(df, starters)
+    spells = spells.assign(subbedOn = spells['onReason'] != 'START', subbedOff = spells['offReason'] != 'END', sentOff = (spells['offReason'] == 'OFF') & (spells['offType'] == 'R'))
+    result = spells.groupby(['gameId', 'teamId', 'playerId'], sort = True).agg(
+        playerName = ('playerName', 'first'), started = ('started', 'any'), subbedOn = ('subbedOn', 'any'), subbedOff = ('subbedOff', 'any'),
+        sentOff = ('sentOff', 'any'), minutes = ('minutes', 'sum')).reset_index()
+    # Coming on again after going off injured is not a substitution of a starter
+    result['subbedOn'] = result['subbedOn'] & ~result['started']
+    if per_game:
+        return result
+    result['games'] = 1
+    return result.groupby(['teamId', 'playerId'], sort = True).agg(
+        playerName = ('playerName', 'first'), games = ('games', 'sum'), started = ('started', 'sum'), subbedOn = ('subbedOn', 'sum'),
+        subbedOff = ('subbedOff', 'sum'), sentOff = ('sentOff', 'sum'), minutes = ('minutes', 'sum')).reset_index()
+
+def _states(spells):
+    # The players on the pitch of every team from every time its line-up changed, as sorted tuples of ids, one state per row
+    times = pd.concat([spells[['gameId', 'teamId', 'start']].rename(columns = {'start': 'time'}),
+                       spells[['gameId', 'teamId', 'end']].rename(columns = {'end': 'time'})]).drop_duplicates()
+    # The line-ups at the end of a game stay as they were for its last events
+    times = times[times['time'] < times['gameId'].map(spells.groupby('gameId')['end'].max())]
+    on = times.merge(spells[['gameId', 'teamId', 'playerId', 'start', 'end']], on = ['gameId', 'teamId'])
+    on = on[(on['start'] <= on['time']) & (on['time'] < on['end'])].sort_values('playerId')
+    players = on.groupby(['gameId', 'teamId', 'time'])['playerId'].agg(tuple)
+    states = times.sort_values('time', kind = 'stable').reset_index(drop = True)
+    states['players'] = players.reindex(pd.MultiIndex.from_frame(states[['gameId', 'teamId', 'time']])).to_numpy(object)
+    states['players'] = [value if isinstance(value, tuple) else () for value in states['players']]
+    states['state'] = np.arange(len(states))
+    return states
+
+def lineups(df, starters = None, spells = None):
+    '''
+    Finds the players of both teams on the pitch at every event.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data, or several of them concatenated
+    starters: see intervals()
+    spells: the result of intervals(df, starters) if it has been computed already, defaults to None
+
+
+    Returns
+    ---------
+
+    df: a dataframe with the index of df and the columns teamPlayers and opponentPlayers, the sorted
+    tuples of the ids of the players on the pitch of the team of the event and of its opponent,
+    and teamPlayerCount and opponentPlayerCount. A substitution counts from its own event on.
+    Events without a team get None
+
+    '''
+    if spells is None:
+        spells = intervals(df, starters)
+    result = pd.DataFrame({'teamPlayers': None, 'opponentPlayers': None, 'teamPlayerCount': pd.array([pd.NA] * len(df), dtype = 'Int64'),
+                           'opponentPlayerCount': pd.array([pd.NA] * len(df), dtype = 'Int64')}, index = df.index)
+    if spells.empty or df.empty:
+        return result
+    states = _states(spells)
+    players = states['players'].to_numpy(object)
+    counts = np.fromiter(map(len, players), dtype = np.int64, count = len(players))
+
+    # The opponent of a team is the other team that has players in the game
+    teams = spells.groupby('gameId')['teamId'].agg(['min', 'max'])
+    events = pd.DataFrame({'gameId': pd.to_numeric(df['gameId']).to_numpy(), 'teamId': pd.to_numeric(df['teamId']).to_numpy(float),
+                           'time': df['startTime'].to_numpy(float), 'position': np.arange(len(df))})
+    events = events[events['teamId'].notna() & events['time'].notna()]
+    events['teamId'] = events['teamId'].astype('int64')
+    low = teams['min'].reindex(events['gameId']).to_numpy()
+    high = teams['max'].reindex(events['gameId']).to_numpy()
+    events['opponentId'] = np.where(events['teamId'].to_numpy() == low, high, low)
+    events = events.sort_values('time', kind = 'stable')
+
+    # Every event gets the last state of its team and of its opponent at or before its time
+    columns = ['gameId', 'teamId', 'time', 'state']
+    found = pd.merge_asof(events, states[columns], on = 'time', by = ['gameId', 'teamId'])
+    found = pd.merge_asof(found, states[columns].rename(columns = {'teamId': 'opponentId', 'state': 'opponentState'}), on = 'time',
+                          by = ['gameId', 'opponentId'])
+    positions = found['position'].to_numpy()
+    for state, players_column, count_column in (('state', 'teamPlayers', 'teamPlayerCount'),
+                                                 ('opponentState', 'opponentPlayers', 'opponentPlayerCount')):
+        codes = found[state].to_numpy(float)
+        valid = ~np.isnan(codes)
+        codes = np.where(valid, codes, 0).astype(np.int64)
+        column = np.full(len(df), None, dtype = object)
+        column[positions[valid]] = players[codes[valid]]
+        result[players_column] = column
+        count = np.zeros(len(df), dtype = np.int64)
+        count[positions[valid]] = counts[codes[valid]]
+        mask = np.ones(len(df), dtype = bool)
+        mask[positions[valid]] = False
+        result[count_column] = pd.arrays.IntegerArray(count, mask)
+    return result
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Turns the nested gameEvents payload into normalized, typed tables.
+
+Every game event, possession event, sub-event (passing, shooting, cross,
+clearance, rebound, challenge, ball carry), foul, grade and freeze-frame
+location becomes a row in its own table. Nested player and team objects are
+replaced by integer ids that point into the players and teams tables.
+"""
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+# Nested lists that become child tables, and the column that links them to their parent
+CHILD_TABLES = {
+    'possessionEvents': ('possession_events', 'gameEventId'),
+    'defenderLocations': ('locations', 'gameEventId'),
+    'offenderLocations': ('locations', 'gameEventId'),
+    'fouls': ('fouls', 'possessionEventId'),
+    'grades': ('grades', 'possessionEventId'),
+}
+
+# Nested objects of a possession event that become one-to-one child tables
+SUB_EVENT_TABLES = {
+    'passingEvent': 'passing_events',
+    'shootingEvent': 'shooting_events',
+    'crossEvent': 'cross_events',
+    'clearanceEvent': 'clearance_events',
+    'reboundEvent': 'rebound_events',
+    'challengeEvent': 'challenge_events',
+    'ballCarryEvent': 'ball_carry_events',
+}
+
+# Nested objects that refer to a player, team or video and are replaced by their id
+REFERENCE_FIELDS = frozenset(['player', 'otherPlayer', 'playerOn', 'playerOff', 'team', 'video'])
+
+TABLES = ['game_events', 'possession_events'] + list(SUB_EVENT_TABLES.values()) + ['fouls', 'grades', 'locations', 'players', 'teams']
+
+class _TableBuilder:
+    '''
+    Collects rows column by column. Columns that show up later are backfilled
+    with None, columns missing from a row are padded with None.
+    '''
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
+
+    def add(self, row):
+        for name, value in row.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [None] * self.rows
+            column.append(value)
+        self.rows += 1
+        for column in self.columns.values():
+            if len(column) < self.rows:
+                column.append(None)
+
+    def frame(self):
+        df = pd.DataFrame(self.columns)
+        for col in df.columns:
+            if col == 'id' or col.endswith('Id'):
+                try:
+                    df[col] = pd.to_numeric(df[col]).astype('Int64')
+                except (ValueError, TypeError):
+                    continue
+        return df.infer_objects()
+
+def _is_reference(key):
+    return key in REFERENCE_FIELDS or key.endswith('Player') or key.startswith('additionalChallenger') or key.startswith('failedInterventionPlayer')
+
+class _Normalizer:
+    def __init__(self):
+        self.tables = {name: _TableBuilder() for name in TABLES}
+        self.players = {}
+        self.teams = {}
+
+    def _flatten(self, record, row, parent_id, game_id):
+        # Splits a record in its scalar columns, which are added to row, and its nested members
+        for key, value in record.items():
+            if isinstance(value, dict):
+                if key in SUB_EVENT_TABLES:
+                    sub_row = {'possessionEventId': parent_id}
+                    self._flatten(value, sub_row, parent_id, game_id)
+                    self.tables[SUB_EVENT_TABLES[key]].add(sub_row)
+                    continue
+                # References to other entities are replaced by their id
+                row[key + 'Id'] = value.get('id')
+                if 'nickname' in value and value.get('id') is not None:
+                    self.players.setdefault(value['id'], value.get('nickname'))
+                elif key == 'team' and value.get('id') is not None:
+                    self.teams.setdefault(value['id'], value.get('name'))
+            elif isinstance(value, list) and key in CHILD_TABLES:
+                table, link = CHILD_TABLES[key]
+                for position, item in enumerate(value):
+                    if not isinstance(item, dict):
+                        continue
+                    child = {link: parent_id}
+                    if table == 'possession_events':
+                        child = {'gameId': game_id, link: parent_id}
+                    elif table == 'locations':
+                        child['side'] = 'defense' if key == 'defenderLocations' else 'offense'
+                    else:
+                        child['position'] = position
+                    self._flatten(item, child, item.get('id', parent_id), game_id)
+                    self.tables[table].add(child)
+            elif value is None and (key in SUB_EVENT_TABLES or key in CHILD_TABLES):
+                continue
+            elif value is None and _is_reference(key):
+                row[key + 'Id'] = None
+            else:
+                row[key] = value
+
+    def add_game(self, game_id, game_events):
+        for event in game_events:
+            row = {'gameId': game_id}
+            self._flatten(event, row, event.get('id'), game_id)
+            self.tables['game_events'].add(row)
+
+    def frames(self):
+        for player_id, nickname in self.players.items():
+            self.tables['players'].add({'id': player_id, 'nickname': nickname})
+        for team_id, name in self.teams.items():
+            self.tables['teams'].add({'id': team_id, 'name': name})
+        self.players, self.teams = {}, {}
+        return {name: builder.frame() for name, builder in self.tables.items()}
+
+def normalize_game_events(games):
+    '''
+    Normalizes the gameEvents of one or more games into linked tables.
+
+    Parameters
+    -----------
+
+    games: a list of (game_id, game_events) tuples, game_events as returned by the API
+
+
+    Returns
+    ---------
+
+    tables: a dictionary of table name to dataframe with the tables 'game_events',
+    'possession_events', 'passing_events', 'shooting_events', 'cross_events',
+    'clearance_events', 'rebound_events', 'challenge_events', 'ball_carry_events',
+    'fouls', 'grades', 'locations', 'players' and 'teams'
+
+    '''
+    normalizer = _Normalizer()
+    for game_id, game_events in games:
+        normalizer.add_game(game_id, game_events)
+    return normalizer.frames()
+
+def concat_tables(tables_list):
+    '''
+    Concatenates normalized tables of separate calls into one set of tables,
+    dropping duplicate players and teams.
+    '''
+    tables = {}
+    for name in TABLES:
+        frames = [part[name] for part in tables_list if name in part]
+        df = pd.concat(frames, ignore_index = True) if frames else pd.DataFrame()
+        if name in ('players', 'teams') and len(df):
+            df = df.drop_duplicates('id').reset_index(drop = True)
+        tables[name] = df
+    return tables
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stores the results of the API as a partitioned Parquet dataset and reads them back.
+
+Every kind of result (game events, On-The-Ball events, players, normalized
+tables) goes to its own directory, partitioned as
+
+    <root>/<kind>/competitionId=<id>/season=<season>/gameId=<id>/part-0.parquet
+
+so that a season can be queried with only the columns and partitions that are
+needed. Enumerations such as gameEventType are stored dictionary encoded, nested
+objects and lists as JSON strings. Requires pyarrow (pip install pyarrow).
+"""
+import json
+import os
+
+import pandas as pd
+
+from .dtypes import is_enum as _is_enum
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+PARTITIONS = ['competitionId', 'season', 'gameId']
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError('pypff.parquet requires pyarrow, install it with pip install pyarrow')
+
+def _nested(series):
+    return series.map(lambda value: isinstance(value, (dict, list))).any()
+
+def _to_json(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators = (',', ':'))
+    return None if pd.isna(value) else value
+
+def _is_json(value):
+    return isinstance(value, str) and value.startswith(('{', '['))
+
+def _table(df):
+    # Converts a result to an arrow table with stable types, so the files of a dataset share one schema
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object and _nested(df[col]):
+            df[col] = df[col].map(_to_json)
+    fields = []
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if _is_enum(col) and (series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype)):
+            array = pa.array(series.astype(object).where(series.notna(), None), type = pa.string()).dictionary_encode()
+            array = array.cast(pa.dictionary(pa.int32(), pa.string()))
+        elif series.dtype == object and series.isna().all():
+            array = pa.nulls(len(series), type = pa.string())
+        else:
+            array = pa.Array.from_pandas(series)
+            if pa.types.is_null(array.type):
+                array = array.cast(pa.string())
+        fields.append(pa.field(str(col), array.type))
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema = pa.schema(fields))
+
+def _partition_path(root, kind, competition_id, season, game_id = None):
+    path = os.path.join(os.path.expanduser(root), kind, 'competitionId=' + str(competition_id), 'season=' + str(season))
+    if game_id is not None:
+        path = os.path.join(path, 'gameId=' + str(game_id))
+    return path
+
+def write_dataset(df, root, kind, competition_id, season, compression = 'zstd'):
+    '''
+    Writes a result to the Parquet dataset, one file per game. The partitions that
+    are written replace what was stored for them before.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by the API functions, or a dictionary of dataframes as
+    returned by get_game_events_games with normalize = True, which writes every table to '<kind>/<table name>'
+    root: a string with the directory of the dataset
+    kind: a string with the name of the result, i.e. 'game_events'
+    competition_id: an integer with the competition of the result
+    season: a string with the season of the result
+    compression: a string with the Parquet compression codec, defaults to 'zstd'
+
+
+    Returns
+    ---------
+
+    paths: a list of strings with the files that were written
+
+    '''
+    _require_pyarrow()
+    if isinstance(df, dict):
+        return [path for name, table in df.items() for path in write_dataset(table, root, kind + '/' + name, competition_id, season, compression)]
+
+    if 'gameId' in df.columns and len(df):
+        parts = [(game_id, part.drop(columns = ['gameId'])) for game_id, part in df.groupby('gameId', sort = False)]
+    else:
+        parts = [(None, df.drop(columns = [col for col in PARTITIONS if col in df.columns]))]
+
+    paths = []
+    for game_id, part in parts:
+        directory = _partition_path(root, kind, competition_id, season, game_id)
+        os.makedirs(directory, exist_ok = True)
+        path = os.path.join(directory, 'part-0.parquet')
+        pq.write_table(_table(part.reset_index(drop = True)), path, compression = compression)
+        paths.append(path)
+    return paths
+
+def write_game_events(df, root, competition_id, season):
+    '''
+    Writes the result of get_game_events or get_game_events_games, see write_dataset.
+    Normalized tables are written to 'normalized/<table name>', i.e. 'normalized/possession_events'.
+    '''
+    return write_dataset(df, root, 'normalized' if isinstance(df, dict) else 'game_events', competition_id, season)
+
+def write_otb_data(df, root, competition_id, season):
+    '''
+    Writes the result of get_otb_data, see write_dataset.
+    '''
+    return write_dataset(df, root, 'otb_data', competition_id, season)
+
+def write_players(df, root, competition_id, season):
+    '''
+    Writes the result of get_players_competition, partitioned by competition and season only.
+    '''
+    return write_dataset(df, root, 'players', competition_id, season)
+
+def open_dataset(root, kind = 'game_events'):
+    '''
+    Opens a kind of result of the dataset without reading it, i.e. to scan it in
+    batches with dataset.to_batches().
+
+    Parameters
+    -----------
+
+    root: a string with the directory of the dataset
+    kind: a string with the name of the result, i.e. 'game_events' or 'normalized/passing_events'
+
+
+    Returns
+    ---------
+
+    dataset: a pyarrow.dataset.Dataset with the partition columns competitionId, season and gameId
+
+    '''
+    _require_pyarrow()
+    path = os.path.join(os.path.expanduser(root), kind)
+    partitioning = ds.partitioning(pa.schema([('competitionId', pa.int64()), ('season', pa.string()), ('gameId', pa.int64())]), flavor = 'hive')
+    dataset = ds.dataset(path, format = 'parquet', partitioning = partitioning)
+    # Games can disagree on the type of a column that is empty in some of them
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if len(schemas) > 1:
+        schema = pa.unify_schemas(schemas + [dataset.partitioning.schema], promote_options = 'permissive')
+        dataset = ds.dataset(path, format = 'parquet', partitioning = partitioning, schema = schema)
+    return dataset
+
+def read_dataset(root, kind = 'game_events', columns = None, filters = None, parse_json = False):
+    '''
+    Reads a kind of result of the dataset, only touching the partitions, row groups
+    and columns that are needed.
+
+    Parameters
+    -----------
+
+    root: a string with the directory of the dataset
+    kind: a string with the name of the result, i.e. 'game_events'
+    columns: a list of column names to read, defaults to None (all columns)
+    filters: a list of (column, operator, value) tuples that all have to hold, i.e.
+    [('season', '==', '2022'), ('gameEventType', 'in', ['OTB', 'OUT'])], or a pyarrow
+    expression. Defaults to None (all rows)
+    parse_json: a boolean to decode the columns that hold nested objects, defaults to False
+
+
+    Returns
+    ---------
+
+    df: a dataframe with the selected rows and columns, enumerations as categoricals
+
+    '''
+    dataset = open_dataset(root, kind)
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+    df = dataset.to_table(columns = columns, filter = filters).to_pandas()
+
+    # Partition columns come first, as gameId does in the results of the API
+    partitions = [col for col in PARTITIONS if col in df.columns and df[col].notna().any()]
+    df = df[partitions + [col for col in df.columns if col not in PARTITIONS]]
+    if parse_json:
+        for col in df.columns:
+            if (df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype)) and df[col].map(_is_json).any():
+                df[col] = df[col].map(lambda value: json.loads(value) if _is_json(value) else value)
+    return df
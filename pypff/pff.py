@@ -6,36 +6,1601 @@ Created on Thu Jul 21 11:09:12 2022
 @author: apschram
 """
 import requests
-import pandas as pd
-import numpy as np
-import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import contextvars
+import json
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .normalize import normalize_game_events, concat_tables
+from .stream import loads, iter_array
+from .lazy import LazyModule
+from . import instrument
+from . import queries
+from .cache import GAME_ENTITIES
+from .cache import scope as cache_scope
+from . import scheduler as scheduling
+from .queries import build_query
 
-def get_competitions(url, key):
+# Imported when a dataframe is built, so that asking for records never loads them
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+tqdm = LazyModule('tqdm')
+
+class _RateLimiter:
     ''' 
-    Retrieves information of all competitions available for the given API key.
+    Spaces out the start of requests so that no more than `rate` requests per 
+    second are sent, shared between all threads that use the same limiter.
+    '''
+    def __init__(self, rate = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+        
+    def delay(self):
+        # Reserves the next start and returns the seconds to wait for it
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        return max(0.0, start - now)
+        
+    def wait(self):
+        delay = self.delay()
+        if delay:
+            time.sleep(delay)
+
+_OTB_EVENT_TYPES = frozenset(['FIRSTKICKOFF','SECONDKICKOFF','THIRDKICKOFF','FOURTHKICKOFF','OTB','OUT','ON','OFF','SUB','END'])
+
+_OTB_COLUMNS = ['gameId','gameEventId','gameEventType','possessionEventId','possessionEventType','gameClock','formattedGameClock','startTime','endTime','duration','teamId','teamName','playerId','playerName','endType','offType','outType','playerOnId','playerOnName','playerOffId','playerOffName','challengeEvent','ballCarryEvent']
+
+@instrument.transform
+def _otb_frame(game_id, game_events):
+    ''' 
+    Flattens the gameEvents of the On-The-Ball query into one row per possession 
+    event (or per game event without possession events) in a single pass over 
+    the JSON, instead of expanding nested columns with apply(pd.Series).
     
     Parameters
     -----------
     
-    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
-    key: a string that serves as the API key
+    game_id: an integer with the game of the events
+    game_events: a list of game event dictionaries as returned by the API
+
 
     Returns
     ---------
     
-    df: a dataframe containing the competition information
+    df: a dataframe containing the On-The-Ball events
     
     '''
-    payload = "{\"query\":\"query competitions {\\n    competitions {\\n        id\\n        name\\n        games {\\n            id\\n            season\\n        }\\n    }\\n}\",\"variables\":{}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    # Same ordering as sorting the full dataframe on startTime, so ties end up in the same order
+    order = pd.Series([event.get('startTime') for event in game_events]).sort_values(ascending = True).index
+    
+    columns = {col: [] for col in _OTB_COLUMNS[1:]}
+    
+    def ref(value, field):
+        return value.get(field, None) if isinstance(value, dict) else None
+    
+    for i in order:
+        event = game_events[i]
+        if event.get('gameEventType') not in _OTB_EVENT_TYPES:
+            continue
+        
+        # Challenges and ball carries only flag the other possession events of the same game event
+        possession_events = [pe for pe in (event.get('possessionEvents') or []) if isinstance(pe, dict) and pe.get('id') is not None]
+        types = [pe.get('possessionEventType') for pe in possession_events]
+        rows = [(pe['id'], t) for pe, t in zip(possession_events, types) if t not in ('CH', 'BC')]
+        if rows:
+            challenge, ball_carry = 'CH' in types, 'BC' in types
+        else:
+            rows, challenge, ball_carry = [(np.nan, np.nan)], np.nan, np.nan
+        
+        team, player, player_on, player_off = event.get('team'), event.get('player'), event.get('playerOn'), event.get('playerOff')
+        values = (event.get('id'), event.get('gameEventType'), event.get('gameClock'), event.get('formattedGameClock'),
+                  event.get('startTime'), event.get('endTime'), event.get('duration'), ref(team, 'id'), ref(team, 'name'),
+                  ref(player, 'id'), ref(player, 'nickname'), event.get('endType'), event.get('playerOffType'), event.get('outType'),
+                  ref(player_on, 'id'), ref(player_on, 'nickname'), ref(player_off, 'id'), ref(player_off, 'nickname'))
+        for possession_event_id, possession_event_type in rows:
+            for col, value in zip(('gameEventId','gameEventType','gameClock','formattedGameClock','startTime','endTime','duration',
+                                   'teamId','teamName','playerId','playerName','endType','offType','outType',
+                                   'playerOnId','playerOnName','playerOffId','playerOffName'), values):
+                columns[col].append(value)
+            columns['possessionEventId'].append(possession_event_id)
+            columns['possessionEventType'].append(possession_event_type)
+            columns['challengeEvent'].append(challenge)
+            columns['ballCarryEvent'].append(ball_carry)
+    
+    df = pd.DataFrame(columns)
+    df.insert(0, 'gameId', [game_id] * len(df))
+    
+    df['playerOnId'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnId'], np.nan)
+    df['playerOnName'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnName'], np.nan)
+    df['playerOffId'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffId'], np.nan)
+    df['playerOffName'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffName'], np.nan)
+
+    df['offType'] = np.where(df['offType'].isin(['R']), df['offType'], np.nan)
+    
+    df = df[_OTB_COLUMNS]
+    
+    ints = ['gameId','gameEventId','possessionEventId','teamId','playerId','playerOnId','playerOffId']
+    for col in ints:
+        try:
+            df[col] = df[col].astype(int)
+        except:
+            df[col] = df[col].astype('Int64')
+            
+    return df
+
+def _game_events_payload(game_id, fields = None, exclude = None):
+    # fields and exclude are given relative to a game event
+    return build_query('game', queries.GAME_EVENTS, {'id': ('ID!', game_id)}, fields, exclude, prefix = 'gameEvents')
+
+@instrument.transform
+def _game_events_frame(game_id, game_events, normalize = False, pack_freeze_frames = False, return_type = 'frame', compact = False):
+    if return_type == 'raw':
+        return list(game_events)
+    if return_type == 'records':
+        return _game_events_records(game_id, game_events)
+    if normalize:
+        tables = normalize_game_events([(game_id, game_events)])
+        return _compact(tables) if compact else tables
+    df = pd.DataFrame(list(game_events))
+    df.insert(0, 'gameId', [game_id] * len(df))
+    if 'startTime' in df.columns:
+        df = df.sort_values('startTime', ascending = True).reset_index(drop = True)
+    if pack_freeze_frames:
+        from .freeze_frames import FreezeFrames, LOCATION_COLUMNS
+        # Packed after sorting, so that frame i belongs to row i
+        frames = FreezeFrames.from_frame(df)
+        df = df.drop(columns = [col for col in LOCATION_COLUMNS if col in df.columns]).infer_objects()
+        return (_compact(df) if compact else df), frames
+    return _compact(df) if compact else df.infer_objects()
+
+@instrument.transform
+def _compact(df):
+    from .dtypes import compact
+    return compact(df)
+
+def _game_events_records(game_id, game_events):
+    records = [dict({'gameId': game_id}, **event) for event in game_events]
+    # Events without a startTime go last, as NaN does when sorting the dataframe
+    return sorted(records, key = lambda event: (event.get('startTime') is None, event.get('startTime') or 0))
+
+def _check_pack_freeze_frames(normalize, pack_freeze_frames):
+    if normalize and pack_freeze_frames:
+        raise ValueError("pack_freeze_frames cannot be combined with normalize, use FreezeFrames.from_locations(tables['locations']) instead")
+
+_RETURN_TYPES = ('frame', 'records', 'raw')
+
+def _check_return_type(return_type, normalize = False, pack_freeze_frames = False, compact = False):
+    if return_type not in _RETURN_TYPES:
+        raise ValueError("return_type must be 'frame', 'records' or 'raw', not " + repr(return_type))
+    if return_type != 'frame' and (normalize or pack_freeze_frames or compact):
+        raise ValueError("normalize, pack_freeze_frames and compact build dataframes, they need return_type 'frame'")
+
+def _stadiums(dates, stadiums):
+    ''' 
+    Resolves the pitch of the stadium that was in use on the date of every game, 
+    the first pitch with startDate <= date <= endDate (or no endDate), as one 
+    interval join over all pitches instead of a lookup per game.
+    
+    Returns
+    ---------
+    
+    stadiums: a list with a dictionary of stadiumId, stadiumName, pitchLength and pitchWidth per game
     
+    '''
+    stadiums = list(stadiums)
+    pitches = pd.DataFrame({'game': np.arange(len(stadiums)),
+                            'pitch': [s.get('pitches') if isinstance(s, dict) else None for s in stadiums]}).explode('pitch')
+    pitches = pitches[[isinstance(p, dict) for p in pitches['pitch']]].reset_index(drop = True)
+    
+    start = pd.to_datetime(pd.Series([p.get('startDate') for p in pitches['pitch']], dtype = object))
+    end = pd.to_datetime(pd.Series([p.get('endDate') for p in pitches['pitch']], dtype = object), errors = 'coerce')  # Convert empty strings to NaT
+    date = pd.Series(pd.to_datetime(dates).to_numpy()[pitches['game'].to_numpy()])
+    
+    # Keep the first pitch in the order of the API that matches, as the row-wise lookup did
+    matched = pitches[((date >= start) & (end.isna() | (date <= end))).to_numpy()].drop_duplicates('game')
+    lengths = dict(zip(matched['game'], pd.Series([p.get('length') for p in matched['pitch']]).tolist()))
+    widths = dict(zip(matched['game'], pd.Series([p.get('width') for p in matched['pitch']]).tolist()))
+    
+    return [{'stadiumId': s.get('id') if isinstance(s, dict) else None, 'stadiumName': s.get('name') if isinstance(s, dict) else None,
+             'pitchLength': lengths.get(i), 'pitchWidth': widths.get(i)} for i, s in enumerate(stadiums)]
+
+@instrument.transform
+def _games_frame(data, return_type = 'frame'):
+    if return_type == 'raw':
+        return data
+    if return_type == 'records':
+        return _games_records(data)
+    df = pd.DataFrame.from_dict(data['games'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['competition'] = [{'id': data['id'], 'name': data['name']} for _ in range(len(df))]
+    df['stadium'] = _stadiums(df['date'], df['stadium'])
+    df = df.reindex(sorted(df.columns), axis = 1)
+    return df.infer_objects()
+
+@instrument.transform
+def _game_frame(data, return_type = 'frame'):
+    if return_type == 'raw':
+        return data
+    if return_type == 'records':
+        return _game_records(data)
+    df = pd.DataFrame(data.items()).T
+    df.columns = df.loc[0]
+    df = df[df['awayTeam'] != 'awayTeam'].reset_index(drop = True)
+    df['date'] = pd.to_datetime(df['date'])
+    df['stadium'] = _stadiums(df['date'], df['stadium'])
+    return df.infer_objects()
+
+@instrument.transform
+def _roster_frame(data, return_type = 'frame'):
+    if return_type == 'raw':
+        return data
+    if return_type == 'records':
+        return _roster_records(data)
+    df = pd.DataFrame.from_dict(data['rosters'])
+    df['game_id'] = data['id']
+    df = df.reindex(sorted(df.columns), axis = 1)    
+    return df.infer_objects()
+
+def _date(value):
+    # Parses an ISO date or datetime of the API, None if it is empty or invalid
+    if not isinstance(value, str) or not value:
+        return None
     try:
-        df = pd.DataFrame.from_dict(response.json()['data']['competitions'])
+        date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Compared in UTC, as pandas does with dates that have a timezone
+    return date.astimezone(datetime.timezone.utc).replace(tzinfo = None) if date.tzinfo is not None else date
+
+def _stadium(date, stadium):
+    ''' 
+    Resolves the pitch of the stadium that was in use on the date of one game, 
+    as _stadiums does, without pandas.
+    '''
+    if not isinstance(stadium, dict):
+        return {'stadiumId': None, 'stadiumName': None, 'pitchLength': None, 'pitchWidth': None}
+    date = _date(date)
+    pitch = {}
+    for p in stadium.get('pitches') or []:
+        if not isinstance(p, dict) or date is None:
+            continue
+        start, end = _date(p.get('startDate')), _date(p.get('endDate'))
+        if start is not None and start <= date and (end is None or date <= end):
+            pitch = p
+            break
+    return {'stadiumId': stadium.get('id'), 'stadiumName': stadium.get('name'),
+            'pitchLength': pitch.get('length'), 'pitchWidth': pitch.get('width')}
+
+def _games_records(data):
+    records = []
+    for game in data['games']:
+        record = dict(game, competition = {'id': data['id'], 'name': data['name']}, stadium = _stadium(game.get('date'), game.get('stadium')))
+        records.append({col: record[col] for col in sorted(record)})
+    return records
+
+def _game_records(data):
+    return [dict(data, stadium = _stadium(data.get('date'), data.get('stadium')))]
+
+def _roster_records(data):
+    records = [dict(entry, game_id = data['id']) for entry in data['rosters']]
+    return [{col: record[col] for col in sorted(record)} for record in records]
+
+def _player_record(player_data):
+    first_nationality = player_data['nationality']['country'] if player_data['nationality'] else None
+    second_nationality = player_data['secondNationality']['country'] if player_data['secondNationality'] else None
+    return {
+        'player_id': player_data['id'],
+        'first_name': player_data['firstName'],
+        'last_name': player_data['lastName'],
+        'dob': player_data['dob'],
+        'height': player_data['height'],
+        'nickname': player_data['nickname'],
+        'position_group': player_data['positionGroupType'],
+        'nationality': first_nationality,
+        'second_nationality': second_nationality,
+        'transfermarkt_id': player_data['transfermarktPlayerId'],
+        'rosters': player_data['rosters']  # This will remain a nested list of dicts
+    }
+
+class _PlayerCollector:
+    ''' 
+    Deduplicates the players of rosters game by game, so that memory grows with 
+    the number of players instead of the number of roster entries.
+    
+    Of all entries of a player only the one the original expansion kept is 
+    stored: the one in the highest roster slot k, and of those the one in the 
+    latest game r. Its row label, k * games + r, is assigned once all games 
+    with a roster have been counted.
+    '''
+    def __init__(self):
+        self.players = {}
+        self.games = 0
+        self.slots = 0
+        self.entries = 0
+        
+    @instrument.transform
+    def add(self, rosters):
+        if not isinstance(rosters, list) or all(entry is None for entry in rosters):
+            return
+        r = self.games
+        self.games += 1
+        self.slots = max(self.slots, len(rosters))
+        for k, entry in enumerate(rosters):
+            self.entries += isinstance(entry, dict)
+            player = entry.get('player') if isinstance(entry, dict) else None
+            if not isinstance(player, dict) or player.get('id') is None:
+                continue
+            best = self.players.get(player['id'])
+            if best is None or (k, r) > (best[0], best[1]):
+                self.players[player['id']] = (k, r, player)
+    
+    @instrument.transform
+    def records(self):
+        return [player for _, player in sorted((k * self.games + r, player) for k, r, player in self.players.values())]
+    
+    @instrument.transform
+    def frame(self):
+        rows = sorted((k * self.games + r, player) for k, r, player in self.players.values())
+        df = pd.DataFrame([player for _, player in rows], index = [position for position, _ in rows])
+        if self.entries < self.slots * self.games:
+            # Empty roster slots gave the original expansion an extra column, which left the column labels of object dtype
+            df.columns = pd.Index(df.columns, dtype = object)
+        df = df.dropna(how = 'all', axis = 0)
+        df['id'] = df['id'].astype(int)
         return df.infer_objects()
-    except:
-        print(response.text)
 
-def get_competition(url, key, competition_id):
+@instrument.transform
+def _competitions_frame(competitions, return_type = 'frame'):
+    if return_type != 'frame':
+        return competitions
+    df = pd.DataFrame.from_dict(competitions)
+    return df.infer_objects()
+
+@instrument.transform
+def _competition_frame(competition, return_type = 'frame'):
+    if return_type == 'raw':
+        return competition
+    if return_type == 'records':
+        return [competition]
+    df = pd.DataFrame([competition])
+    return df.infer_objects()
+
+_teams_frame = _competitions_frame
+
+@instrument.transform
+def _team_frame(team, return_type = 'frame'):
+    if return_type == 'raw':
+        return team
+    if return_type == 'records':
+        return [team]
+    df = pd.DataFrame(team.items()).T
+    df.columns = df.loc[0]
+    df = df[df['awayGames'] != 'awayGames'].reset_index(drop = True)
+    return df.infer_objects()
+
+@instrument.transform
+def _players_frame(games, return_type = 'frame'):
+    if return_type == 'raw':
+        return games
+    players = _PlayerCollector()
+    for game in games:
+        players.add(game.get('rosters'))
+    return players.records() if return_type == 'records' else players.frame()
+
+@instrument.transform
+def _player_frame(player_data, return_type = 'frame'):
+    if return_type == 'raw':
+        return player_data
+    player_record = _player_record(player_data)
+    if return_type == 'records':
+        return [player_record]
+    df = pd.DataFrame([player_record])
+    return df.infer_objects()
+
+@instrument.transform
+def _game_event_frame(data, return_type = 'frame'):
+    if return_type == 'raw':
+        return data['gameEvent']
+    if return_type == 'records':
+        return [data['gameEvent']]
+    df = pd.DataFrame(data).T
+    return df.infer_objects()
+
+@instrument.transform
+def _scoring_events_frame(scoring_events):
+    df = pd.DataFrame.from_dict(scoring_events)
+    df = df[df['gameEventType'] == 'OUT']
+    df['gameId'] = df['gameId'].astype(int)
+
+    df_pivot = df.groupby(['gameId','outType'])[['id']].count().reset_index(drop = False)
+    df_pivot = df_pivot.pivot(index = 'gameId', columns = 'outType', values = 'id').fillna(0)
+    df_pivot = df_pivot.rename(columns = {'A':'awayGoals','H':'homeGoals'}).reset_index(drop = False)
+
+    return df.infer_objects(), df_pivot.infer_objects()
+
+def _batch_chunks(root, selection, ids, batch_size = None, limit = None, fields = None, exclude = None, prefix = None):
+    # Splits ids in chunks that each fit in one batched request
+    if not ids:
+        return []
+    if batch_size == 1:
+        return [[i] for i in ids]
+    single = build_query(root, selection, {'id': ('ID!', ids[0])}, fields, exclude, prefix)
+    size = queries.batch_size(len(single), batch_size or limit)
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+def _split_batch(body, ids, text = ''):
+    ''' 
+    Splits the answer to a batched request in the data of every id, as aliased 
+    by queries.build_batch_query, and the errors of the ids that failed.
+    '''
+    # GraphQL answers every alias separately, an error in one game leaves the others intact
+    data = body.get('data') or {}
+    errors = {}
+    for error in body.get('errors') or []:
+        path = error.get('path') or [None]
+        errors.setdefault(path[0], []).append(error.get('message', ''))
+    results, failures = {}, {}
+    for position, i in enumerate(ids):
+        name = queries.alias(position)
+        value = data.get(name)
+        if value is None:
+            failures[i] = '; '.join(errors.get(name, errors.get(None, []))) or text
+        else:
+            results[i] = value
+    return results, failures
+
+def _unique_ids(ids):
+    # Ids taken from a dataframe column are numpy integers, or floats or pd.NA when the column has missing values
+    unique = {}
+    for i in ids:
+        i = i.item() if hasattr(i, 'item') else i
+        # NaN is not equal to itself, and comparing pd.NA gives pd.NA
+        if i is None or (i != i) is not False:
+            continue
+        unique[int(i) if isinstance(i, float) and i.is_integer() else i] = None
+    return list(unique)
+
+def _batch_result(ids, results, failures, transform, return_failures = False, return_type = 'frame', label = 'game'):
+    # Transforms the data of every id in the order of ids, the failures are printed unless they are returned
+    if return_type == 'raw':
+        out = {i: results[i] for i in ids if i in results}
+    else:
+        out = []
+        for i in ids:
+            if i not in results:
+                continue
+            try:
+                out.append(transform(results[i], return_type))
+            except Exception as e:
+                failures[i] = repr(e)
+        if return_type == 'records':
+            out = [record for records in out for record in records]
+        else:
+            out = pd.concat(out, ignore_index = True).infer_objects() if out else pd.DataFrame()
+    if not return_failures:
+        for i, error in failures.items():
+            print('Error in ' + label + ': ' + str(i))
+            print(error)
+    
+    if return_failures:
+        return out, failures
+    return out
+
+@instrument.transform
+def _records_frame(result, return_failures = False):
+    # One dataframe of the records of all ids, which is much faster than concatenating a dataframe per id
+    records, failures = result if return_failures else (result, None)
+    df = pd.DataFrame(records).infer_objects() if records else pd.DataFrame()
+    return (df, failures) if return_failures else df
+
+@instrument.transform
+def _game_events_games_result(games, results, failures, normalize = False, pack_freeze_frames = False, return_type = 'frame', compact = False,
+                              return_failures = False):
+    # Keep the order of the requested games, regardless of the order in which they finished
+    df_list = [results[game_id] for game_id in games if game_id in results]
+    if pack_freeze_frames:
+        from .freeze_frames import FreezeFrames
+        frames = FreezeFrames.concat([frames for _, frames in df_list])
+        df_list = [df for df, _ in df_list]
+    if return_type == 'raw':
+        final_df = {game_id: results[game_id] for game_id in games if game_id in results}
+    elif return_type == 'records':
+        final_df = [record for records in df_list for record in records]
+    elif normalize:
+        final_df = concat_tables(df_list)
+    else:
+        final_df = pd.concat(df_list, ignore_index = True) if df_list else pd.DataFrame()
+        final_df = final_df.infer_objects()
+    if compact:
+        # Categories that are not in the specification differ between games and leave objects after concatenating
+        final_df = _compact(final_df)
+    
+    if pack_freeze_frames and return_failures:
+        return final_df, frames, failures
+    if pack_freeze_frames:
+        return final_df, frames
+    if return_failures:
+        return final_df, failures
+    return final_df
+
+# Each game makes a response of tens of MB, so batches of game events stay small unless asked otherwise
+_EVENTS_BATCH_LIMIT = 4
+
+class PFFClient:
+    ''' 
+    A client for the PFF FC API that keeps its connections open between calls.
+    
+    All requests go through one pooled requests.Session, so consecutive calls 
+    reuse an open TCP/TLS connection instead of paying a new handshake each time. 
+    Requests that fail with HTTP 429 or a 5xx status are retried with exponential 
+    backoff, honouring the Retry-After header sent by the API. With a scheduler, 
+    every request waits for its turn first, and the wait before a retry holds back 
+    all requests of the API key.
+    
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    pool_size: an integer with the number of connections kept open, defaults to 10
+    max_retries: an integer with the number of retries of a failed request, defaults to 3
+    backoff_factor: a float that scales the wait between retries in seconds, defaults to 0.5
+    timeout: a float with the number of seconds to wait for the API, defaults to 60
+    cache: a cache.ResponseCache to reuse earlier responses, which can be shared with clients 
+    of other urls and API keys, defaults to None (no caching)
+    memory_cache: a cache.MemoryCache that is looked up before cache, defaults to None (no memoization)
+    scheduler: a scheduler.Scheduler that paces the requests, which can be shared with 
+    other clients, defaults to None (requests are sent at once)
+    
+    '''
+    def __init__(self, url, key, pool_size = 10, max_retries = 3, backoff_factor = 0.5, timeout = 60, cache = None, memory_cache = None,
+                 scheduler = None):
+        self.url = url
+        self.key = key
+        self.timeout = timeout
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        
+        self.session = requests.Session()
+        self.session.headers.update({'x-api-key': key, 'Content-Type': 'application/json'})
+        self._scheduler = None
+        self._mount()
+        self.scheduler = scheduler
+        
+    @property
+    def scheduler(self):
+        return self._scheduler
+    
+    @scheduler.setter
+    def scheduler(self, scheduler):
+        retried_by_urllib3 = self._scheduler is None
+        self._scheduler = scheduler
+        if retried_by_urllib3 != (scheduler is None):
+            self._mount()
+    
+    def _mount(self):
+        # With a scheduler, answers with a status to retry are retried by _send, so that their wait goes through the scheduler
+        urllib3_status = self._scheduler is None
+        retry = Retry(total = self.max_retries, backoff_factor = self.backoff_factor, status_forcelist = sorted(scheduling.RETRY_STATUS) if urllib3_status else [],
+                      allowed_methods = None, respect_retry_after_header = urllib3_status, raise_on_status = False)
+        adapter = HTTPAdapter(pool_connections = self.pool_size, pool_maxsize = self.pool_size, max_retries = retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+        
+    def close(self):
+        self.session.close()
+        
+    @property
+    def _scope(self):
+        # Entries of the caches are only shared by clients of the same url and API key
+        return cache_scope(self.url, self.key)
+    
+    def _cached(self, payload, entity):
+        # The memory cache is looked up first, answers found on disk are kept in memory from then on
+        memory = self.memory_cache if self.memory_cache is not None and self.memory_cache.keeps(entity) else None
+        scope = self._scope
+        content = memory.get(payload, scope) if memory is not None else None
+        if content is None and self.cache is not None:
+            content = self.cache.get(payload, scope)
+            if content is not None and memory is not None:
+                memory.set(payload, content, entity, scope)
+        return content
+    
+    def _caches(self, entity):
+        return self.cache is not None or (self.memory_cache is not None and self.memory_cache.keeps(entity))
+    
+    def _store(self, payload, content, entity, game = None):
+        if self.memory_cache is not None:
+            self.memory_cache.set(payload, content, entity, self._scope, game)
+        if self.cache is not None:
+            self.cache.set(payload, content, entity, self._scope, game)
+    
+    def _games(self, entity, game_ids):
+        ''' 
+        Retrieves whether the games of responses of an entity are complete, which 
+        tells the caches how long the responses live, see cache.ResponseCache.ttl.
+        
+        Returns
+        ---------
+        
+        games: a dictionary of game id to the date and endPeriod2 of the game
+        
+        '''
+        if entity not in GAME_ENTITIES or not self._caches(entity):
+            return {}
+        results, _ = self._fetch_batch('game', queries.GAME, game_ids, 'game', fields = _COMPLETE_FIELDS)
+        return results
+    
+    def _game(self, payload, entity, content):
+        # The game of a single response, a game itself or the data of the game of the id of the payload
+        if entity == 'game':
+            try:
+                return _complete_fields(loads(content)['data']['game'])
+            except (ValueError, KeyError, TypeError):
+                return None
+        game_id = _payload_id(payload)
+        return self._games(entity, [game_id]).get(game_id) if game_id is not None else None
+    
+    def _send(self, payload, **kwargs):
+        ''' 
+        Posts a payload, after waiting for its turn when the client has a scheduler.
+        
+        Returns
+        ---------
+        
+        response: a requests.Response
+        retries: an integer with the number of times the request was sent again
+        queued: a float with the seconds spent waiting for the scheduler
+        
+        '''
+        scheduler = self._scheduler
+        if scheduler is None:
+            response = self.session.post(self.url, data = payload, timeout = self.timeout, **kwargs)
+            return response, instrument.retries(response), 0.0
+        
+        retries, queued = 0, 0.0
+        while True:
+            queued += scheduler.acquire(self.key)
+            response = self.session.post(self.url, data = payload, timeout = self.timeout, **kwargs)
+            if response.status_code not in scheduling.RETRY_STATUS or retries >= self.max_retries:
+                instrument.record(queue = queued)
+                return response, retries + instrument.retries(response), queued
+            retries += 1
+            response.close()
+            scheduler.backoff(self.key, scheduling.backoff_delay(retries, self.backoff_factor, response.headers.get('Retry-After')))
+    
+    def _post(self, payload, entity = None, **kwargs):
+        # Requests without an entity are not cached, i.e. batched requests that the caller caches per id
+        start = time.perf_counter()
+        if entity is not None:
+            content = self._cached(payload, entity)
+            if content is not None:
+                instrument.request(payload, 200, len(content), time.perf_counter() - start, cached = True)
+                return _cached_response(self.url, content)
+        
+        response, retries, queued = self._send(payload, **kwargs)
+        instrument.request(payload, response.status_code, len(response.content), time.perf_counter() - start - queued, retries)
+        
+        # Only successful answers are cached, GraphQL reports failures with an 'errors' member
+        if entity is not None and response.status_code == 200 and b'"errors"' not in response.content:
+            self._store(payload, response.content, entity, self._game(payload, entity, response.content))
+        return response
+
+    def _post_stream(self, payload, entity = None, chunk_size = 65536, **kwargs):
+        ''' 
+        Yields the body of a response in chunks while it is downloaded, or from 
+        the cache when it holds the response.
+        '''
+        begin = time.perf_counter()
+        if self.cache is not None:
+            content = self.cache.get(payload, self._scope)
+            if content is not None:
+                instrument.request(payload, 200, len(content), time.perf_counter() - begin, cached = True)
+                for start in range(0, len(content), chunk_size):
+                    yield content[start:start + chunk_size]
+                return
+        
+        response, retries, queued = self._send(payload, stream = True, **kwargs)
+        with response:
+            if response.status_code != 200:
+                instrument.request(payload, response.status_code, len(response.content), time.perf_counter() - begin - queued, retries)
+                raise requests.HTTPError(response.text, response = response)
+            
+            # Compress while streaming, so the response never has to be kept in full for the cache
+            compressor = self.cache.compressor() if self.cache is not None else None
+            compressed, tail, errors = [], b'', False
+            chunks = instrument.timed_chunks(response.iter_content(chunk_size), payload, response.status_code, time.perf_counter() - begin - queued,
+                                             retries)
+            for chunk in chunks:
+                if compressor is not None:
+                    compressed.append(compressor.compress(chunk))
+                    errors = errors or b'"errors"' in tail + chunk
+                    tail = chunk[-8:]
+                yield chunk
+            if compressor is not None and not errors:
+                compressed.append(compressor.flush())
+                self.cache.set_compressed(payload, b''.join(compressed), entity, self._scope, self._game(payload, entity, None))
+    
+    def _stream_game_events(self, game_id, normalize, entity, fields = None, exclude = None, pack_freeze_frames = False, return_type = 'frame', compact = False,
+                            **kwargs):
+        payload = _game_events_payload(game_id, fields, exclude)
+        try:
+            chunks = self._post_stream(payload, entity, **kwargs)
+            events = (event for batch in iter_array(chunks, 'gameEvents') for event in batch)
+            return _game_events_frame(game_id, events, normalize, pack_freeze_frames, return_type, compact)
+        except (requests.RequestException, ValueError) as e:
+            print(e)
+    
+    @instrument.instrumented
+    def iter_game_events(self, game_id, batch_size = 500, fields = None, exclude = None):
+        ''' 
+        Retrieves the events of a game in batches, while the response is still 
+        being downloaded, so that processing can start before it has finished.
+        
+        Parameters
+        -----------
+        
+        game_id: an integer to select the game
+        batch_size: an integer with the number of events per batch
+        fields: a list of dotted paths of the event fields to request, see get_game_events
+        exclude: a list of dotted paths of the event fields to leave out, see get_game_events
+
+
+        Returns
+        ---------
+        
+        batches: a generator of lists of events as returned by the API, raising 
+        requests.HTTPError or ValueError when the response has no events
+        
+        '''
+        chunks = self._post_stream(_game_events_payload(game_id, fields, exclude), 'game_events')
+        return iter_array(chunks, 'gameEvents', batch_size)
+    
+    def _fetch_batch(self, root, selection, ids, entity, limiter = None, fields = None, exclude = None, prefix = None):
+        ''' 
+        Retrieves the root field for several ids in one request, i.e. the games of 
+        a list of game ids. Ids in the cache are not requested again, and every id 
+        that is retrieved is cached as if it was requested on its own.
+        
+        Returns
+        ---------
+        
+        results: a dictionary of id to the data of that id
+        failures: a dictionary of id to a string describing why the id failed
+        
+        '''
+        results, failures, missing = {}, {}, {}
+        for i in ids:
+            single = build_query(root, selection, {'id': ('ID!', i)}, fields, exclude, prefix)
+            content = self._cached(single, entity)
+            if content is not None:
+                instrument.request(single, 200, len(content), 0.0, cached = True)
+                results[i] = loads(content)['data'][root]
+            else:
+                missing[i] = single
+        if not missing:
+            return results, failures
+        
+        ids = list(missing)
+        payload = queries.build_batch_query(root, selection, ids, fields, exclude, prefix)
+        try:
+            if limiter is not None:
+                limiter.wait()
+            response = self._post(payload)
+            body = loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            return results, {i: repr(e) for i in ids}
+        
+        batch_results, failures = _split_batch(body, ids, response.text)
+        results.update(batch_results)
+        if self._caches(entity):
+            games = {i: _complete_fields(value) for i, value in batch_results.items()} if entity == 'game' else self._games(entity, list(batch_results))
+            for i, value in batch_results.items():
+                self._store(missing[i], _cache_content(root, value), entity, games.get(i))
+        return results, failures
+
+    def _batch_frames(self, root, selection, ids, entity, transform, batch_size = None, return_failures = False, return_type = 'frame', label = 'game'):
+        ids = list(dict.fromkeys(ids))
+        results, failures = {}, {}
+        for chunk in _batch_chunks(root, selection, ids, batch_size):
+            chunk_results, chunk_failures = self._fetch_batch(root, selection, chunk, entity)
+            results.update(chunk_results)
+            failures.update(chunk_failures)
+        return _batch_result(ids, results, failures, transform, return_failures, return_type, label)
+
+    @instrument.instrumented
+    def get_competitions(self, return_type = 'frame'):
+        ''' 
+        Retrieves information of all competitions available for the given API key.
+        
+        Parameters
+        -----------
+        
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the competition information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('competitions', queries.COMPETITION)
+        response = self._post(payload, 'competitions')
+        
+        try:
+            return _competitions_frame(loads(response.content)['data']['competitions'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_competition(self, competition_id, return_type = 'frame'):
+        ''' 
+        Retrieves information of a competition for a given competition_id.
+        
+        Parameters
+        -----------
+        
+        competition_id: an integer to select the competition
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the competition information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('competition', queries.COMPETITION, {'id': ('ID!', competition_id)})
+        response = self._post(payload, 'competition')
+
+        try:
+            return _competition_frame(loads(response.content)['data']['competition'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_teams(self, return_type = 'frame'):
+        ''' 
+        Retrieves information of all teams available for the given API key.
+        
+        Parameters
+        -----------
+        
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the team information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('teams', queries.TEAM)
+        response = self._post(payload, 'teams')
+        
+        try:
+            return _teams_frame(loads(response.content)['data']['teams'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_team(self, team_id, return_type = 'frame'):
+        ''' 
+        Retrieves information of a team for a given team_id.
+        
+        Parameters
+        -----------
+        
+        team_id: an integer to select the team
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the team information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('team', queries.TEAM, {'id': ('ID!', team_id)})
+        response = self._post(payload, 'team')
+
+        try:
+            return _team_frame(loads(response.content)['data']['team'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_teams_by_id(self, team_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' 
+        Retrieves information of teams for a given list of team_ids, packing several 
+        teams in one request. Every team is requested once, however often it occurs.
+        
+        Parameters
+        -----------
+        
+        team_ids: a list of integers to select the teams, i.e. a column of a dataframe
+        batch_size: an integer with the maximum number of teams per request, defaults 
+        to None (as many as fit in one request)
+        return_failures: a boolean to also return the teams that failed
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API per team_id, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the team information, one row per team as get_team, or records, see return_type
+        failures: a dictionary of team_id to error message, only if return_failures is True
+        
+        '''
+        _check_return_type(return_type)
+        return self._batch_frames('team', queries.TEAM, _unique_ids(team_ids), 'team', _team_frame, batch_size, return_failures, return_type, 'team')
+
+    @instrument.instrumented
+    def get_games(self, competition_id, return_type = 'frame'):
+        ''' 
+        Retrieves information of all games available in a given competition.
+        
+        Parameters
+        -----------
+        
+        competition_id: an integer to select the competition
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the game information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('competition', queries.GAMES, {'id': ('ID!', competition_id)})
+        response = self._post(payload, 'games')
+        
+        try:
+            return _games_frame(loads(response.content)['data']['competition'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_game(self, game_id, return_type = 'frame'):
+        ''' 
+        Retrieves information of a game for a given game_id.
+        
+        Parameters
+        -----------
+        
+        game_id: an integer to select the game
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the game information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('game', queries.GAME_WITH_COMPETITION, {'id': ('ID!', game_id)})
+        response = self._post(payload, 'game')
+        
+        try:
+            return _game_frame(loads(response.content)['data']['game'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_games_by_id(self, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' 
+        Retrieves information of games for a given list of game_ids, packing 
+        several games in one request.
+        
+        Parameters
+        -----------
+        
+        game_ids: a list of integers to select the games
+        batch_size: an integer with the maximum number of games per request, defaults 
+        to None (as many as fit in one request)
+        return_failures: a boolean to also return the games that failed
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API per game_id, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the game information, one row per game, or records, see return_type
+        failures: a dictionary of game_id to error message, only if return_failures is True
+        
+        '''
+        _check_return_type(return_type)
+        return self._batch_frames('game', queries.GAME_WITH_COMPETITION, game_ids, 'game', _game_frame, batch_size, return_failures, return_type)
+
+    @instrument.instrumented
+    def get_players_competition(self, competition_id, chunk_size = None, return_type = 'frame'):
+        ''' 
+        Retrieves information of all players available in a given competition.
+        
+        Parameters
+        -----------
+        
+        competition_id: an integer to select the competition
+        chunk_size: an integer to retrieve the rosters that many games at a time, which 
+        keeps the responses small for large competitions, defaults to None (all games at once)
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the games with their rosters as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the player information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        if chunk_size is not None:
+            return self._players_competition_chunked(competition_id, chunk_size, return_type)
+        
+        payload = build_query('competition', queries.PLAYERS_COMPETITION, {'id': ('ID!', competition_id)})
+        response = self._post(payload, 'players_competition')
+
+        try:
+            return _players_frame(loads(response.content)['data']['competition']['games'], return_type)
+        except:
+            print(response.text)
+
+    def _players_competition_chunked(self, competition_id, chunk_size, return_type = 'frame'):
+        payload = build_query('competition', queries.GAMES, {'id': ('ID!', competition_id)}, ['games.id'])
+        response = self._post(payload, 'games')
+        try:
+            game_ids = [game['id'] for game in loads(response.content)['data']['competition']['games']]
+        except:
+            print(response.text)
+            return
+        
+        # Only one chunk of rosters is decoded at a time, the collector keeps the unique players
+        players, games = _PlayerCollector(), []
+        for chunk in _batch_chunks('game', queries.GAME_PLAYERS, game_ids, chunk_size):
+            results, failures = self._fetch_batch('game', queries.GAME_PLAYERS, chunk, 'game_players')
+            for game_id, error in failures.items():
+                print('Error in game: ' + str(game_id))
+                print(error)
+            for game_id in chunk:
+                if game_id in results and return_type == 'raw':
+                    games.append(results[game_id])
+                elif game_id in results:
+                    players.add(results[game_id].get('rosters'))
+        if return_type == 'raw':
+            return games
+        if return_type == 'records':
+            return players.records()
+        try:
+            return players.frame()
+        except KeyError:
+            return pd.DataFrame()
+
+    @instrument.instrumented
+    def get_player(self, player_id, return_type = 'frame'):
+        ''' 
+        Retrieves information of a player for a given player_id.
+        
+        Parameters
+        -----------
+        
+        player_id: an integer to select the player
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the player information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('player', queries.PLAYER, {'id': ('ID!', player_id)})
+        response = self._post(payload, 'player')
+        
+        try:
+            return _player_frame(loads(response.content)['data']['player'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_players(self, player_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' 
+        Retrieves information of players for a given list of player_ids, packing several 
+        players in one request. Every player is requested once, however often it occurs.
+        
+        Parameters
+        -----------
+        
+        player_ids: a list of integers to select the players, i.e. a column of a dataframe
+        batch_size: an integer with the maximum number of players per request, defaults 
+        to None (as many as fit in one request)
+        return_failures: a boolean to also return the players that failed
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API per player_id, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the player information, one row per player as get_player, or records, see return_type
+        failures: a dictionary of player_id to error message, only if return_failures is True
+        
+        '''
+        _check_return_type(return_type)
+        result = self._batch_frames('player', queries.PLAYER, _unique_ids(player_ids), 'player', _player_frame, batch_size, return_failures,
+                                    'records' if return_type == 'frame' else return_type, 'player')
+        return _records_frame(result, return_failures) if return_type == 'frame' else result
+
+    @instrument.instrumented
+    def get_roster(self, game_id, return_type = 'frame'):
+        ''' 
+        Retrieves roster information of a game for a given game_id.
+        
+        Parameters
+        -----------
+        
+        game_id: an integer to select the game
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the roster information, or records, see return_type
+        
+        '''
+        _check_return_type(return_type)
+        payload = build_query('game', queries.ROSTER, {'id': ('ID!', game_id)})
+        response = self._post(payload, 'roster')
+
+        try:
+            return _roster_frame(loads(response.content)['data']['game'], return_type)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_rosters(self, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+        ''' 
+        Retrieves roster information of games for a given list of game_ids, packing 
+        several games in one request.
+        
+        Parameters
+        -----------
+        
+        game_ids: a list of integers to select the games
+        batch_size: an integer with the maximum number of games per request, defaults 
+        to None (as many as fit in one request)
+        return_failures: a boolean to also return the games that failed
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API per game_id, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the roster information of all games, or records, see return_type
+        failures: a dictionary of game_id to error message, only if return_failures is True
+        
+        '''
+        _check_return_type(return_type)
+        return self._batch_frames('game', queries.ROSTER, game_ids, 'roster', _roster_frame, batch_size, return_failures, return_type)
+
+    @instrument.instrumented
+    def get_game_events(self, game_id, normalize = False, stream = False, fields = None, exclude = None, pack_freeze_frames = False, return_type = 'frame',
+                        compact = False):
+        ''' 
+        Retrieves all events of a game for a given game_id.
+        
+        Parameters
+        -----------
+        
+        game_id: an integer to select the game
+        normalize: a boolean to return normalized tables instead of one nested dataframe
+        stream: a boolean to decode the events while the response is downloaded, which 
+        lowers peak memory for large games
+        fields: a list of dotted paths of the event fields to request, i.e. 
+        ['startTime', 'team', 'possessionEvents.passingEvent'], defaults to None (all fields)
+        exclude: a list of dotted paths of the event fields to leave out, i.e. 
+        queries.NO_FREEZE_FRAMES + queries.NO_GRADES, defaults to None
+        pack_freeze_frames: a boolean to return the offenderLocations and defenderLocations 
+        of the events packed in a freeze_frames.FreezeFrames instead of as columns, defaults to False
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the list of events as returned by the API, defaults to 'frame'
+        compact: a boolean to convert the columns to compact dtypes, i.e. categorical event 
+        types, nullable integer ids and float32 clocks, see dtypes.compact, defaults to False
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the events, or if normalize is True a dictionary 
+        of dataframes as returned by normalize.normalize_game_events, or records, see return_type
+        frames: a FreezeFrames with the freeze frame of every row of df, only if pack_freeze_frames is True
+        
+        '''
+        _check_pack_freeze_frames(normalize, pack_freeze_frames)
+        _check_return_type(return_type, normalize, pack_freeze_frames, compact)
+        if stream:
+            return self._stream_game_events(game_id, normalize, 'game_events', fields, exclude, pack_freeze_frames, return_type, compact)
+        
+        payload = _game_events_payload(game_id, fields, exclude)
+        response = self._post(payload, 'game_events')
+        
+        try:
+            return _game_events_frame(game_id, loads(response.content)['data']['game']['gameEvents'], normalize, pack_freeze_frames, return_type, compact)
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_game_event(self, game_event_id, fields = None, exclude = None, return_type = 'frame'):
+        ''' 
+        Retrieves event for a given game_event_id.
+        
+        Parameters
+        -----------
+        
+        game_event_id: an integer to select the event
+        fields: a list of dotted paths of the event fields to request, see get_game_events
+        exclude: a list of dotted paths of the event fields to leave out, see get_game_events
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the event, or records, see return_type
+        
+        '''    
+        _check_return_type(return_type)
+        payload = build_query('gameEvent', queries.GAME_EVENT, {'id': ('ID!', game_event_id)}, fields, exclude)
+        response = self._post(payload, 'game_event')
+        
+        try:
+            return _game_event_frame(loads(response.content)['data'], return_type)
+        except:
+            print(response.text)
+
+    def _fetch_game_events(self, game_id, limiter, normalize = False, stream = False, fields = None, exclude = None, pack_freeze_frames = False,
+                           return_type = 'frame', compact = False):
+        ''' 
+        Retrieves all events of a single game for get_game_events_games.
+        
+        Returns
+        ---------
+        
+        df: a dataframe (or normalized tables, or records) containing the events, or None if the game failed
+        error: None, or a string describing why the game failed
+        
+        '''
+        if stream:
+            try:
+                limiter.wait()
+                events = (event for batch in self.iter_game_events(game_id, fields = fields, exclude = exclude) for event in batch)
+                return _game_events_frame(game_id, events, normalize, pack_freeze_frames, return_type, compact), None
+            except (requests.RequestException, ValueError) as e:
+                return None, str(e)
+        
+        payload = _game_events_payload(game_id, fields, exclude)
+        try:
+            limiter.wait()
+            response = self._post(payload, 'game_events')
+        except requests.RequestException as e:
+            return None, repr(e)
+        
+        try:
+            return _game_events_frame(game_id, loads(response.content)['data']['game']['gameEvents'], normalize, pack_freeze_frames, return_type, compact), None
+        except:
+            return None, response.text
+
+    def _fetch_game_events_batch(self, game_ids, limiter, normalize = False, stream = False, fields = None, exclude = None, pack_freeze_frames = False,
+                                 return_type = 'frame', compact = False):
+        # Returns a dictionary of game_id to the (df, error) tuple of _fetch_game_events
+        if len(game_ids) == 1:
+            return {game_ids[0]: self._fetch_game_events(game_ids[0], limiter, normalize, stream, fields, exclude, pack_freeze_frames, return_type,
+                                                         compact)}
+        
+        results, failures = self._fetch_batch('game', queries.GAME_EVENTS, game_ids, 'game_events', limiter, fields, exclude, 'gameEvents')
+        out = {game_id: (None, error) for game_id, error in failures.items()}
+        for game_id, data in results.items():
+            try:
+                out[game_id] = (_game_events_frame(game_id, data['gameEvents'], normalize, pack_freeze_frames, return_type, compact), None)
+            except Exception as e:
+                out[game_id] = (None, repr(e))
+        return out
+
+    @instrument.instrumented
+    def get_game_events_games(self, games, max_workers = 1, requests_per_second = None, return_failures = False, normalize = False, stream = False,
+                              fields = None, exclude = None, batch_size = 1, pack_freeze_frames = False, return_type = 'frame', compact = False):
+        ''' 
+        Retrieves all events of games for a given list of games.
+        
+        Games are requested concurrently when max_workers is larger than 1. A game 
+        that fails does not affect the other games; it is left out of the dataframe 
+        and reported instead. Keep max_workers at or below the pool_size of the 
+        client, otherwise the extra connections are not reused.
+        
+        Parameters
+        -----------
+        
+        games: a list of integers to select the games
+        max_workers: an integer with the maximum number of requests in flight, defaults to 1 (serial)
+        requests_per_second: a float to cap the request rate over all workers, defaults to None (no cap)
+        return_failures: a boolean to also return the games that failed
+        normalize: a boolean to return normalized tables instead of one nested dataframe
+        stream: a boolean to decode the events while the responses are downloaded
+        fields: a list of dotted paths of the event fields to request, see get_game_events
+        exclude: a list of dotted paths of the event fields to leave out, see get_game_events
+        batch_size: an integer with the maximum number of games per request, defaults to 1; 
+        None picks the number of games per request automatically. Batched responses are 
+        decoded in full, stream only applies to games that are requested on their own
+        pack_freeze_frames: a boolean to return the offenderLocations and defenderLocations 
+        of the events packed in a freeze_frames.FreezeFrames instead of as columns, which 
+        packs every game as soon as it arrives, defaults to False
+        return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+        row, or 'raw' for a dictionary of game_id to the list of events as returned by the API, 
+        defaults to 'frame'
+        compact: a boolean to convert the columns to compact dtypes, see get_game_events; 
+        every game is converted as soon as it arrives, defaults to False
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the events, or if normalize is True a dictionary 
+        of dataframes as returned by normalize.normalize_game_events, or records, see return_type
+        frames: a FreezeFrames with the freeze frame of every row of df, only if pack_freeze_frames is True
+        failures: a dictionary of game_id to error message, only if return_failures is True
+        
+        '''
+        _check_pack_freeze_frames(normalize, pack_freeze_frames)
+        _check_return_type(return_type, normalize, pack_freeze_frames, compact)
+        games = list(games)
+        limiter = _RateLimiter(requests_per_second)
+        
+        # Fail on an unknown field at once, instead of once for every game
+        _game_events_payload(None, fields, exclude)
+        results = {}
+        failures = {}
+        chunks = _batch_chunks('game', queries.GAME_EVENTS, games, batch_size, _EVENTS_BATCH_LIMIT, fields, exclude, 'gameEvents')
+        
+        # The workers take their turns with the scheduler as one caller
+        with tqdm.tqdm(total = len(games)) as progress, scheduling.caller():
+            with ThreadPoolExecutor(max_workers = max(1, max_workers)) as executor:
+                # Every worker runs in a copy of the context, so that instrumentation counts its requests towards this call
+                futures = {executor.submit(contextvars.copy_context().run, self._fetch_game_events_batch, chunk, limiter, normalize, stream, fields, exclude,
+                                           pack_freeze_frames, return_type, compact): chunk
+                           for chunk in chunks}
+                for future in as_completed(futures):
+                    for game_id, (df, error) in future.result().items():
+                        if error is None:
+                            results[game_id] = df
+                        else:
+                            failures[game_id] = error
+                            if not return_failures:
+                                print('\nError in game: ' + str(game_id))
+                                print(error)
+                    progress.update(len(futures[future]))
+        
+        return _game_events_games_result(games, results, failures, normalize, pack_freeze_frames, return_type, compact, return_failures)
+
+    @instrument.instrumented
+    def get_scoring_events(self, competition_id, season):
+        ''' 
+        Retrieves all scoring events for a given competition and season.
+        
+        Parameters
+        -----------
+        
+        competition_id: an integer to select the competition
+        season: a string to select the season
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the scoring events
+        
+        '''    
+        payload = build_query('scoringEvents', queries.SCORING_EVENT, {'competitionId': ('ID!', competition_id), 'season': ('String!', season)})
+        response = self._post(payload, 'scoring_events')
+        
+        try:
+            return _scoring_events_frame(loads(response.content)['data']['scoringEvents'])
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_otb_data(self, game_id, compact = False):
+        ''' 
+        Retrieves all On-The-Ball events of a game for a given game_id.
+        
+        Parameters
+        -----------
+        
+        game_id: an integer to select the game
+        compact: a boolean to convert the columns to compact dtypes, i.e. categorical event 
+        types, nullable integer ids and float32 clocks, see dtypes.compact, defaults to False
+
+
+        Returns
+        ---------
+        
+        df: a dataframe containing the On-The-Ball events
+        
+        '''
+        payload = build_query('game', queries.OTB_EVENTS, {'id': ('ID!', game_id)})
+        response = self._post(payload, 'otb_data')
+
+        try:
+            df = _otb_frame(game_id, loads(response.content)['data']['game']['gameEvents'])
+            return _compact(df) if compact else df
+        except:
+            print(response.text)
+
+    @instrument.instrumented
+    def get_events(self, game_id, normalize = False, stream = False, fields = None, exclude = None, compact = False):
+        if stream:
+            return self._stream_game_events(game_id, normalize, 'events', fields, exclude, compact = compact, verify = False)
+        
+        payload = _game_events_payload(game_id, fields, exclude)
+        response = self._post(payload, 'events', verify = False)
+        
+        try:
+            return _game_events_frame(game_id, loads(response.content)['data']['game']['gameEvents'], normalize, compact = compact)
+        except:
+            print(response.text)
+
+# The fields of a game that tell whether it is complete, see cache.is_complete
+_COMPLETE_FIELDS = ['date', 'endPeriod2']
+
+def _complete_fields(game):
+    # The fields of a game that tell whether it is complete, or None if it was requested without them
+    if not isinstance(game, dict) or not all(field in game for field in _COMPLETE_FIELDS):
+        return None
+    return {field: game[field] for field in _COMPLETE_FIELDS}
+
+def _payload_id(payload):
+    try:
+        return json.loads(payload)['variables']['id']
+    except (TypeError, ValueError, KeyError):
+        return None
+
+def _cache_content(root, value):
+    # The content of a response to the request of a single id, to cache an id of a batched request
+    return json.dumps({'data': {root: value}}, separators = (',', ':')).encode('utf-8')
+
+def _cached_response(url, content):
+    # Wrap cached content in a Response, so that cached and fresh answers are handled the same way
+    response = requests.models.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = 'utf-8'
+    response._content = content
+    return response
+
+_clients = {}
+_clients_lock = threading.Lock()
+_cache = None
+_scheduler = None
+_memory_cache = None
+
+def _get_client(url, key):
+    # The module-level functions share one client per url and key, so they also reuse connections
+    with _clients_lock:
+        if (url, key) not in _clients:
+            _clients[(url, key)] = PFFClient(url, key, cache = _cache, memory_cache = _memory_cache, scheduler = _scheduler)
+        return _clients[(url, key)]
+
+def set_cache(cache):
+    ''' 
+    Sets the response cache used by the module-level functions.
+    
+    Parameters
+    -----------
+    
+    cache: a cache.ResponseCache, or None to switch caching off
+    
+    '''
+    global _cache
+    with _clients_lock:
+        _cache = cache
+        for client in _clients.values():
+            client.cache = cache
+
+def set_scheduler(scheduler):
+    ''' 
+    Sets the scheduler that paces the requests of the module-level functions, see 
+    scheduler.Scheduler.
+    
+    Parameters
+    -----------
+    
+    scheduler: a scheduler.Scheduler, or None to send requests at once
+    
+    '''
+    global _scheduler
+    with _clients_lock:
+        _scheduler = scheduler
+        for client in _clients.values():
+            client.scheduler = scheduler
+
+def set_memory_cache(memory_cache):
+    ''' 
+    Sets the in-process cache used by the module-level functions, i.e. 
+    MemoryCache(entities = ['player', 'team']) for the players and teams that are 
+    looked up over and over when events are enriched, see cache.MemoryCache. 
+    There is none by default.
+    
+    Parameters
+    -----------
+    
+    memory_cache: a cache.MemoryCache, or None to switch memoization off
+    
+    '''
+    global _memory_cache
+    with _clients_lock:
+        _memory_cache = memory_cache
+        for client in _clients.values():
+            client.memory_cache = memory_cache
+
+def get_memory_cache():
+    ''' 
+    Returns the in-process cache used by the module-level functions, i.e. to look 
+    at get_memory_cache().stats() or to clear it, or None if there is none.
+    '''
+    return _memory_cache
+
+def get_competitions(url, key, return_type = 'frame'):
+    ''' 
+    Retrieves information of all competitions available for the given API key.
+    
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
+
+    Returns
+    ---------
+    
+    df: a dataframe containing the competition information, or records, see return_type
+    
+    '''
+    return _get_client(url, key).get_competitions(return_type = return_type)
+
+def get_competition(url, key, competition_id, return_type = 'frame'):
     ''' 
     Retrieves information of a competition for a given competition_id.
     
@@ -45,23 +1610,18 @@ def get_competition(url, key, competition_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API 
     competition_id: an integer to select the competition
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
     Returns
     ---------
     
-    df: a dataframe containing the competition information
+    df: a dataframe containing the competition information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query competition ($id: ID!) {\\n    competition (id: $id) {\\n        id\\n        name\\n        games {\\n            id\\n            season\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(competition_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-
-    try:
-        df = pd.DataFrame([response.json()['data']['competition']])
-        return df.infer_objects()
-    except:
-        print(response.text)
+    return _get_client(url, key).get_competition(competition_id, return_type = return_type)
 
-def get_teams(url, key):
+def get_teams(url, key, return_type = 'frame'):
     ''' 
     Retrieves information of all teams available for the given API key.
     
@@ -70,23 +1630,18 @@ def get_teams(url, key):
     
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
     Returns
     ---------
     
-    df: a dataframe containing the team information
+    df: a dataframe containing the team information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query teams {\\n    teams {\\n        id\\n        name\\n        shortName\\n        country\\n        homeGames {\\n            id\\n        }\\n        awayGames {\\n            id\\n        }\\n        kits {\\n            id\\n            name\\n            primaryColor\\n            secondaryColor\\n            primaryTextColor\\n            secondaryTextColor\\n        }\\n        homeStadium {\\n            id\\n            name\\n            pitches {\\n                id\\n#                grassType\\n                length\\n                width\\n                startDate\\n                endDate\\n            }\\n        }\\n    }\\n}\",\"variables\":{}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-    
-    try:
-        df = pd.DataFrame.from_dict(response.json()['data']['teams'])
-        return df.infer_objects()
-    except:
-        print(response.text)        
+    return _get_client(url, key).get_teams(return_type = return_type)
 
-def get_team(url, key, team_id):
+def get_team(url, key, team_id, return_type = 'frame'):
     ''' 
     Retrieves information of a team for a given team_id.
     
@@ -96,26 +1651,47 @@ def get_team(url, key, team_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     team_id: an integer to select the team
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
 
     Returns
     ---------
     
-    df: a dataframe containing the team information
+    df: a dataframe containing the team information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query team ($id: ID!) {\\n    team (id: $id) {\\n        id\\n        name\\n        shortName\\n        country\\n        homeGames {\\n            id \\n        }\\n        awayGames {\\n            id\\n        }\\n        kits {\\n            id\\n            name\\n            primaryColor\\n            secondaryColor\\n            primaryTextColor\\n            secondaryTextColor\\n        }\\n        homeStadium {\\n            id\\n            name\\n            pitches {\\n                id\\n#                grassType\\n                length\\n                width\\n                startDate\\n                endDate\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(team_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_team(team_id, return_type = return_type)
 
-    try:
-        df = pd.DataFrame(response.json()['data']['team'].items()).T
-        df.columns = df.loc[0]
-        df = df[df['awayGames'] != 'awayGames'].reset_index(drop = True)
-        return df.infer_objects()
-    except:
-        print(response.text)
+def get_teams_by_id(url, key, team_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' 
+    Retrieves information of teams for a given list of team_ids, packing several 
+    teams in one request. Every team is requested once, however often it occurs, 
+    and teams in the memory cache are not requested again, see set_memory_cache.
+    
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    team_ids: a list of integers to select the teams, i.e. a column of a dataframe
+    batch_size: an integer with the maximum number of teams per request, defaults 
+    to None (as many as fit in one request)
+    return_failures: a boolean to also return the teams that failed
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data per team_id as returned by the API, defaults to 'frame'
+
+
+    Returns
+    ---------
+    
+    df: a dataframe containing the team information, one row per team as get_team, or records, see return_type
+    failures: a dictionary of team_id to error message, only if return_failures is True
+    
+    '''
+    return _get_client(url, key).get_teams_by_id(team_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
 
-def get_games(url, key, competition_id):
+def get_games(url, key, competition_id, return_type = 'frame'):
     ''' 
     Retrieves information of all games available in a given competition.
     
@@ -125,65 +1701,18 @@ def get_games(url, key, competition_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     competition_id: an integer to select the competition
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
     Returns
     ---------
     
-    df: a dataframe containing the game information
+    df: a dataframe containing the game information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query competition ($id: ID!) {\\n    competition (id: $id) {\\n        id\\n        name\\n        games {\\n            id\\n            date\\n            season\\n            week\\n            homeTeam {\\n                id\\n                name\\n                shortName\\n            }\\n            awayTeam {\\n                id\\n                name\\n                shortName\\n            }\\n            startPeriod1\\n            endPeriod1\\n            startPeriod2\\n            endPeriod2\\n            period1\\n            period2\\n            halfPeriod\\n            homeTeamStartLeft\\n            homeTeamKit {\\n                name\\n                primaryColor\\n                primaryTextColor\\n                secondaryColor\\n                secondaryTextColor\\n            }\\n            awayTeamKit {\\n                name\\n                primaryColor\\n                primaryTextColor\\n                secondaryColor\\n                secondaryTextColor\\n            }\\n            stadium {\\n                id\\n                name\\n                pitches {\\n                    id\\n#                    grassType\\n                    length\\n                    width\\n                    startDate\\n                    endDate\\n                }\\n            }\\n            videos {\\n                id\\n                fps\\n                videoUrl\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(competition_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-    
-    try:
-        df = pd.DataFrame.from_dict(response.json()['data']['competition']['games'])
-        
-        competition = pd.DataFrame(index = df.index)
-        competition.loc[:,'id'] = response.json()['data']['competition']['id']
-        competition.loc[:,'name'] = response.json()['data']['competition']['name']
-        competition['competition'] = competition[['id','name']].to_dict(orient = 'records')
-        
-        df[['stadiumId','stadiumName','pitches']] = df['stadium'].apply(pd.Series)
-        df['date'] = pd.to_datetime(df['date'])
-        df_pitches = df['pitches'].apply(pd.Series)
-        
-        for i in df_pitches.columns:
-            df_pitches[f'startDate_{i}'] = df_pitches[i].apply(lambda x: x.get('startDate', None) if isinstance(x, dict) else None)
-            df_pitches[f'startDate_{i}'] = pd.to_datetime(df_pitches[f'startDate_{i}'])
-            df_pitches[f'endDate_{i}'] = df_pitches[i].apply(lambda x: x.get('endDate', None) if isinstance(x, dict) else None)
-            df_pitches[f'endDate_{i}'] = pd.to_datetime(df_pitches[f'endDate_{i}'])
-            
-        df_pitches['id'] = df['id']
-        df_pitches['date'] = df['date']
-        
-        # Find the correct pitch index and store it in df_pitches
-        df_pitches["pitch_index"] = df.apply(lambda row: next(
-            (i for i in range(len(df_pitches.columns) // 2)  # Iterate over pitch indices
-             if row["date"] >= df_pitches.at[row.name, f"startDate_{i}"] and
-                (pd.isna(df_pitches.at[row.name, f"endDate_{i}"]) or row["date"] <= df_pitches.at[row.name, f"endDate_{i}"])),
-            None  # Default to None if no match is found
-        ), axis=1)
-        
-        df_pitches['pitch'] = df_pitches.apply(
-            lambda row: row.get(row["pitch_index"], None) if pd.notna(row["pitch_index"]) else None, 
-            axis=1
-        )
-
-        df_pitches['pitchLength'] = df_pitches['pitch'].apply(lambda x: x.get('length', None) if isinstance(x, dict) else None)
-        df_pitches['pitchWidth'] = df_pitches['pitch'].apply(lambda x: x.get('width', None) if isinstance(x, dict) else None)
-        
-        df = df.merge(competition[['competition']], how = 'left', left_index = True, right_index = True)
-        df = df.merge(df_pitches[['id','pitchLength','pitchWidth']], how = 'left', on = 'id')
-        
-        df['stadium'] = df.apply(lambda row: {col: row[col] for col in ['stadiumId','stadiumName','pitchLength','pitchWidth']}, axis=1)
-        df = df.drop(columns = ['stadiumId','stadiumName','pitches','pitchLength','pitchWidth'])
-        
-        df = df.reindex(sorted(df.columns), axis = 1).infer_objects()
-        return df.infer_objects()
-    except:
-        print(response.text)
+    return _get_client(url, key).get_games(competition_id, return_type = return_type)
 
-def get_game(url, key, game_id):
+def get_game(url, key, game_id, return_type = 'frame'):
     ''' 
     Retrieves information of a game for a given game_id.
     
@@ -193,47 +1722,46 @@ def get_game(url, key, game_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     game_id: an integer to select the game
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
 
     Returns
     ---------
     
-    df: a dataframe containing the game information
+    df: a dataframe containing the game information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n        competition {\\n            id\\n            name\\n        }\\n        date\\n        season\\n        week\\n        homeTeam {\\n            id\\n            name\\n            shortName\\n        }\\n        awayTeam {\\n            id\\n            name\\n            shortName\\n        }\\n        startPeriod1\\n        endPeriod1\\n        startPeriod2\\n        endPeriod2\\n        period1\\n        period2\\n        halfPeriod\\n        homeTeamStartLeft\\n        homeTeamKit {\\n            name\\n            primaryColor\\n            primaryTextColor\\n            secondaryColor\\n            secondaryTextColor\\n        }\\n        awayTeamKit {\\n            name\\n            primaryColor\\n            primaryTextColor\\n            secondaryColor\\n            secondaryTextColor\\n        }\\n        stadium {\\n            id\\n            name\\n            pitches {\\n                id\\n#                grassType\\n                length\\n                width\\n                startDate\\n                endDate\\n            }\\n        }\\n        videos {\\n            id\\n            fps\\n            videoUrl\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_game(game_id, return_type = return_type)
+
+def get_games_by_id(url, key, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' 
+    Retrieves information of games for a given list of game_ids, packing 
+    several games in one request.
     
-    try:
-        df = pd.DataFrame(response.json()['data']['game'].items()).T
-        df.columns = df.loc[0]
-        df = df[df['awayTeam'] != 'awayTeam'].reset_index(drop = True)
-        
-        # Unpack stadium column to retrieve pitch dimensions
-        df[['stadiumId','stadiumName','pitches']] = df['stadium'].apply(pd.Series)
-        df['date'] = pd.to_datetime(df['date'])
-        df_pitches = df['pitches'].apply(pd.Series).T[0].apply(pd.Series)
-        df_pitches['startDate'] = pd.to_datetime(df_pitches['startDate'])
-        df_pitches['endDate'] = pd.to_datetime(df_pitches['endDate'], errors='coerce')  # Convert empty strings to NaT
-        
-        # One-liner to find the pitchLength
-        df['pitchLength'] = df['date'].apply(lambda d: df_pitches.loc[
-            (df_pitches['startDate'] <= d) & ((df_pitches['endDate'].isna()) | (df_pitches['endDate'] >= d)), 'length'
-        ].values[0])
-        
-        # One-liner to find the pitchWidth
-        df['pitchWidth'] = df['date'].apply(lambda d: df_pitches.loc[
-            (df_pitches['startDate'] <= d) & ((df_pitches['endDate'].isna()) | (df_pitches['endDate'] >= d)), 'width'
-        ].values[0])
-        
-        df['stadium'] = df.apply(lambda row: {col: row[col] for col in ['stadiumId','stadiumName','pitchLength','pitchWidth']}, axis=1)
-        df = df.drop(columns = ['stadiumId','stadiumName','pitches','pitchLength','pitchWidth'])
-        
-        return df.infer_objects()
-    except:
-        print(response.text)
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    game_ids: a list of integers to select the games
+    batch_size: an integer with the maximum number of games per request, defaults 
+    to None (as many as fit in one request)
+    return_failures: a boolean to also return the games that failed
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data per game_id as returned by the API, defaults to 'frame'
 
-def get_players_competition(url, key, competition_id):
+
+    Returns
+    ---------
+    
+    df: a dataframe containing the game information, one row per game, or records, see return_type
+    failures: a dictionary of game_id to error message, only if return_failures is True
+    
+    '''
+    return _get_client(url, key).get_games_by_id(game_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+def get_players_competition(url, key, competition_id, chunk_size = None, return_type = 'frame'):
     ''' 
     Retrieves information of all players available in a given competition.
     
@@ -243,47 +1771,20 @@ def get_players_competition(url, key, competition_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     competition_id: an integer to select the competition
+    chunk_size: an integer to retrieve the rosters that many games at a time, which 
+    keeps the responses small for large competitions, defaults to None (all games at once)
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the games with their rosters as returned by the API, defaults to 'frame'
 
     Returns
     ---------
     
-    df: a dataframe containing the player information
+    df: a dataframe containing the player information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query competition ($id: ID!) {\\n    competition (id: $id) {\\n        games {\\n            rosters {\\n                player {\\n                    id\\n                    firstName\\n                    lastName\\n                    nickname\\n                    positionGroupType\\n                    nationality {\\n                        id\\n                        country\\n                    }\\n                    secondNationality {\\n                        id\\n                        country\\n                    }\\n                    weight\\n                    height\\n                    dob\\n                    gender\\n                    countryOfBirth {\\n                        id\\n                        country\\n                    }\\n                    euMember\\n                transfermarktPlayerId\\n}\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(competition_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_players_competition(competition_id, chunk_size = chunk_size, return_type = return_type)
 
-    try:
-        df = pd.DataFrame(response.json()['data']['competition']['games'])
-        df = df['rosters'].apply(pd.Series)
-        df = df.dropna(how = 'all', axis = 0)
-        
-        oneCol = []
-        colLength = len(list(df.columns))
-        for k in range(colLength):
-            oneCol.append(df[k])
-        
-        df = pd.concat(oneCol, ignore_index = True)
-        df = df.apply(pd.Series)['player'].apply(pd.Series)
-        
-        df = df.reset_index(drop = False)
-        df['rank'] = df.groupby('id')['index'].rank('dense', ascending = False)
-        df = df[df['rank'] == 1]
-        # df = df.drop_duplicates()
-        for col in [0,'index','rank']:
-            try:
-                df = df.drop(columns = [col])
-            except:
-                continue
-        df = df.dropna(how = 'all', axis = 0)
-        
-        df['id'] = df['id'].astype(int)
-        
-        return df.infer_objects()
-    except:
-        print(response.text)
-
-def get_player(url, key, player_id):
+def get_player(url, key, player_id, return_type = 'frame'):
     ''' 
     Retrieves information of a player for a given player_id.
     
@@ -293,40 +1794,46 @@ def get_player(url, key, player_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     player_id: an integer to select the player
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
     Returns
     ---------
     
-    df: a dataframe containing the player information
+    df: a dataframe containing the player information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query player ($id: ID!) {\\n    player (id: $id) {\\n        id\\n        firstName\\n        lastName\\n        nickname\\n        positionGroupType\\n        nationality {\\n            id\\n            country\\n        }\\n        secondNationality {\\n            id\\n            country\\n        }\\n        weight\\n        height\\n        dob\\n        gender\\n        countryOfBirth {\\n            id\\n            country\\n        }\\n        euMember\\n        rosters {\\n            game {\\n                id\\n            }\\n            started\\n        }\\n        transfermarktPlayerId\\n    }\\n}\",\"variables\":{\"id\":" + str(player_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_player(player_id, return_type = return_type)
+
+def get_players(url, key, player_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' 
+    Retrieves information of players for a given list of player_ids, packing several 
+    players in one request. Every player is requested once, however often it occurs, 
+    and players in the memory cache are not requested again, see set_memory_cache.
     
-    try:
-        player_data = response.json()['data']['player']
-        first_nationality = player_data['nationality']['country'] if player_data['nationality'] else None
-        second_nationality = player_data['secondNationality']['country'] if player_data['secondNationality'] else None
-        player_record = {
-            'player_id': player_data['id'],
-            'first_name': player_data['firstName'],
-            'last_name': player_data['lastName'],
-            'dob': player_data['dob'],
-            'height': player_data['height'],
-            'nickname': player_data['nickname'],
-            'position_group': player_data['positionGroupType'],
-            'nationality': first_nationality,
-            'second_nationality': second_nationality,
-            'transfermarkt_id': player_data['transfermarktPlayerId'],
-            'rosters': player_data['rosters']  # This will remain a nested list of dicts
-        }
-        
-        df = pd.DataFrame([player_record])
-        return df.infer_objects()
-    except:
-        print(response.text)
-        
-def get_roster(url, key, game_id):
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    player_ids: a list of integers to select the players, i.e. a column of a dataframe
+    batch_size: an integer with the maximum number of players per request, defaults 
+    to None (as many as fit in one request)
+    return_failures: a boolean to also return the players that failed
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data per player_id as returned by the API, defaults to 'frame'
+
+
+    Returns
+    ---------
+    
+    df: a dataframe containing the player information, one row per player as get_player, or records, see return_type
+    failures: a dictionary of player_id to error message, only if return_failures is True
+    
+    '''
+    return _get_client(url, key).get_players(player_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+def get_roster(url, key, game_id, return_type = 'frame'):
     ''' 
     Retrieves roster information of a game for a given game_id.
     
@@ -336,26 +1843,47 @@ def get_roster(url, key, game_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     game_id: an integer to select the game
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
 
     Returns
     ---------
     
-    df: a dataframe containing the roster information
+    df: a dataframe containing the roster information, or records, see return_type
     
     '''
-    payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n    rosters {\\n        player {\\n            id\\n            nickname\\n        }\\n        positionGroupType\\n        shirtNumber\\n        team {\\n            id\\n            name\\n        }\\n        started\\n    }\\n}\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_roster(game_id, return_type = return_type)
 
-    try:
-        df = pd.DataFrame.from_dict(response.json()['data']['game']['rosters'])
-        df['game_id'] = response.json()['data']['game']['id']
-        df = df.reindex(sorted(df.columns), axis = 1)    
-        return df.infer_objects()
-    except:
-        print(response.text)
+def get_rosters(url, key, game_ids, batch_size = None, return_failures = False, return_type = 'frame'):
+    ''' 
+    Retrieves roster information of games for a given list of game_ids, packing 
+    several games in one request.
+    
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    game_ids: a list of integers to select the games
+    batch_size: an integer with the maximum number of games per request, defaults 
+    to None (as many as fit in one request)
+    return_failures: a boolean to also return the games that failed
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data per game_id as returned by the API, defaults to 'frame'
 
-def get_game_events(url, key, game_id):
+
+    Returns
+    ---------
+    
+    df: a dataframe containing the roster information of all games, or records, see return_type
+    failures: a dictionary of game_id to error message, only if return_failures is True
+    
+    '''
+    return _get_client(url, key).get_rosters(game_ids, batch_size = batch_size, return_failures = return_failures, return_type = return_type)
+
+def get_game_events(url, key, game_id, normalize = False, stream = False, fields = None, exclude = None, pack_freeze_frames = False, return_type = 'frame',
+                    compact = False):
     ''' 
     Retrieves all events of a game for a given game_id.
     
@@ -365,26 +1893,58 @@ def get_game_events(url, key, game_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     game_id: an integer to select the game
+    normalize: a boolean to return normalized tables instead of one nested dataframe
+    stream: a boolean to decode the events while the response is downloaded, which 
+    lowers peak memory for large games
+    fields: a list of dotted paths of the event fields to request, i.e. 
+    ['startTime', 'team', 'possessionEvents.passingEvent'], defaults to None (all fields)
+    exclude: a list of dotted paths of the event fields to leave out, i.e. 
+    queries.NO_FREEZE_FRAMES + queries.NO_GRADES, defaults to None
+    pack_freeze_frames: a boolean to return the offenderLocations and defenderLocations 
+    of the events packed in a freeze_frames.FreezeFrames instead of as columns, defaults to False
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the list of events as returned by the API, defaults to 'frame'
+    compact: a boolean to convert the columns to compact dtypes, i.e. categorical event 
+    types, nullable integer ids and float32 clocks, see dtypes.compact, defaults to False
 
 
     Returns
     ---------
     
-    df: a dataframe containing the events
+    df: a dataframe containing the events, or if normalize is True a dictionary 
+    of dataframes as returned by normalize.normalize_game_events, or records, see return_type
+    frames: a FreezeFrames with the freeze frame of every row of df, only if pack_freeze_frames is True
     
     '''
-    payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n        gameEvents {\\n            id\\n            advantageType\\n            bodyType\\n            duration\\n            earlyDistribution\\n            endTime\\n            endType\\n            formattedGameClock\\n            gameClock\\n            gameEventType\\n            heightType\\n            initialTouchType\\n            insertedAt\\n            otherPlayer {\\n                id\\n                nickname\\n            }\\n            outType\\n            player {\\n                id\\n                nickname\\n            }\\n            playerOff {\\n                id\\n                nickname\\n            }\\n            playerOffType\\n            playerOn {\\n                id\\n                nickname\\n            }\\n            pressurePlayer {\\n                id\\n                nickname\\n            }\\n            pressureType\\n            scoreValue\\n            setpieceType\\n            startTime\\n            subType\\n            team {\\n                id\\n                name\\n            }\\n            touches\\n            touchesInBox\\n            updatedAt\\n            videoAngleType\\n            video {\\n                id\\n            }\\n            videoMissing\\n            videoUrl\\n            defenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            offenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            possessionEvents {\\n                duration\\n                endTime\\n                formattedGameClock\\n                gameClock\\n                id\\n                insertedAt\\n                possessionEventType\\n                startTime\\n                updatedAt\\n                videoUrl\\n                ballCarryEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    ballCarryType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    carryType\\n                    createsSpace\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    id\\n                    insertedAt\\n                    ballCarryOutcome\\n                    linesBrokenType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    touchOutcomeType\\n                    touchType\\n                    updatedAt\\n                }\\n                challengeEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    challengeOutcomeType\\n                    challengeType\\n                    challengeWinnerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerHomePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerAwayPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    dribbleType\\n                    insertedAt\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    tackleAttemptType\\n                    trickType\\n                    updatedAt\\n                }\\n                clearanceEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearanceBodyType\\n                    clearanceOutcomeType\\n                    clearancePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                crossEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    completeToPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    crossHighPointType\\n                    crossOutcomeType\\n                    crossType\\n                    crossZoneType\\n                    crosserBodyType\\n                    crosserPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    defenderBallHeightType\\n                    defenderBodyType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    intendedTargetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBallHeightType\\n                    receiverBodyType\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                passingEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    defenderBodyType\\n                    defenderHeightType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    passAccuracyType\\n                    passBodyType\\n                    passHighPointType\\n                    passOutcomeType\\n                    passType\\n                    passerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBodyType\\n                    receiverFacingType\\n                    receiverHeightType\\n                    receiverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    targetFacingType\\n                    targetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n                reboundEvent {\\n                    advantageType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    originateType\\n                    reboundBodyType\\n                    reboundHeightType\\n                    reboundHighPointType\\n                    reboundOutcomeType\\n                    rebounderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                shootingEvent {\\n                    advantageType\\n                    badParry\\n                    ballHeightType\\n                    ballMoving\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    bodyMovementType\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    keeperTouchType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    saveHeightType\\n                    saveReboundType\\n                    saveable\\n                    saverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shooterPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotBodyType\\n                    shotInitialHeightType\\n                    shotNatureType\\n                    shotOutcomeType\\n                    shotType\\n                    updatedAt\\n                }\\n                fouls {\\n                    badCall\\n                    correctDecision\\n                    culpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    foulOutcomeType\\n                    foulType\\n                    insertedAt\\n                    potentialOffenseType\\n                    sequence\\n                    updatedAt\\n                    var\\n                    varCulpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    varOutcomeType\\n                    varPotentialOffenseType\\n                    varReasonType\\n                    victimPlayer {\\n                        id\\n                        nickname\\n                    }\\n                }\\n                grades {\\n                    gradeLabel\\n                    gradeStyle\\n                    gradeType\\n                    insertedAt\\n                    playerGrade\\n                    player {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    return _get_client(url, key).get_game_events(game_id, normalize = normalize, stream = stream, fields = fields, exclude = exclude,
+                                                 pack_freeze_frames = pack_freeze_frames, return_type = return_type, compact = compact)
+
+def iter_game_events(url, key, game_id, batch_size = 500, fields = None, exclude = None):
+    ''' 
+    Retrieves the events of a game in batches, while the response is still 
+    being downloaded, so that processing can start before it has finished.
     
-    try:
-        df = pd.DataFrame(response.json()['data']['game']['gameEvents'])
-        df.insert(0, 'gameId', [game_id] * len(df))
-        df = df.sort_values('startTime', ascending = True).reset_index(drop = True)
-        return df.infer_objects()
-    except:
-        print(response.text)        
+    Parameters
+    -----------
+    
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    game_id: an integer to select the game
+    batch_size: an integer with the number of events per batch
+    fields: a list of dotted paths of the event fields to request, see get_game_events
+    exclude: a list of dotted paths of the event fields to leave out, see get_game_events
 
-def get_game_event(url, key, game_event_id):    
+
+    Returns
+    ---------
+    
+    batches: a generator of lists of events as returned by the API, raising 
+    requests.HTTPError or ValueError when the response has no events
+    
+    '''
+    return _get_client(url, key).iter_game_events(game_id, batch_size = batch_size, fields = fields, exclude = exclude)
+
+def get_game_event(url, key, game_event_id, fields = None, exclude = None, return_type = 'frame'):    
     ''' 
     Retrieves event for a given game_event_id.
     
@@ -394,56 +1954,67 @@ def get_game_event(url, key, game_event_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     game_event_id: an integer to select the event
+    fields: a list of dotted paths of the event fields to request, see get_game_events
+    exclude: a list of dotted paths of the event fields to leave out, see get_game_events
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for the data as returned by the API, defaults to 'frame'
 
 
     Returns
     ---------
     
-    df: a dataframe containing the event
-    
-    '''    
-    payload = "{\"query\":\"query gameEvent ($id: ID!) {\\n    gameEvent (id: $id) {\\n            id\\n        advantageType\\n        bodyType\\n        duration\\n        earlyDistribution\\n        endTime\\n        endType\\n        formattedGameClock\\n        gameClock\\n        gameEventType\\n        heightType\\n        initialTouchType\\n        insertedAt\\n        otherPlayer {\\n            id\\n            nickname\\n        }\\n        outType\\n        player {\\n            id\\n            nickname\\n        }\\n        playerOff {\\n            id\\n            nickname\\n        }\\n        playerOffType\\n        playerOn {\\n            id\\n            nickname\\n        }\\n        pressurePlayer {\\n            id\\n            nickname\\n        }\\n        pressureType\\n        scoreValue\\n        setpieceType\\n        startTime\\n        subType\\n        team {\\n            id\\n            name\\n        }\\n        touches\\n        touchesInBox\\n        updatedAt\\n        videoAngleType\\n        video {\\n            id\\n        }\\n        videoMissing\\n        videoUrl\\n        defenderLocations {\\n            eventModule\\n            name\\n            x\\n            y\\n        }\\n        offenderLocations {\\n            eventModule\\n            name\\n            x\\n            y\\n        }\\n        possessionEvents {\\n            duration\\n            endTime\\n            formattedGameClock\\n            gameClock\\n            id\\n            insertedAt\\n            possessionEventType\\n            startTime\\n            updatedAt\\n            videoUrl\\n            ballCarryEvent {\\n                additionalChallenger1 {\\n                    id\\n                    nickname\\n                }\\n                additionalChallenger2 {\\n                    id\\n                    nickname\\n                }\\n                additionalChallenger3 {\\n                    id\\n                    nickname\\n                }\\n                advantageType\\n                ballCarrierPlayer {\\n                    id\\n                    nickname\\n                }\\n                ballCarryType\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                carryType\\n                createsSpace\\n                defenderPlayer {\\n                    id\\n                    nickname\\n                }\\n                id\\n                insertedAt\\n                ballCarryOutcome\\n                linesBrokenType\\n                opportunityType\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                touchOutcomeType\\n                touchType\\n                updatedAt\\n            }\\n            challengeEvent {\\n                additionalChallenger1 {\\n                    id\\n                    nickname\\n                }\\n                additionalChallenger2 {\\n                    id\\n                    nickname\\n                }\\n                additionalChallenger3 {\\n                    id\\n                    nickname\\n                }\\n                advantageType\\n                ballCarrierPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                challengeOutcomeType\\n                challengeType\\n                challengeWinnerPlayer {\\n                    id\\n                    nickname\\n                }\\n                challengerHomePlayer {\\n                    id\\n                    nickname\\n                }\\n                challengerAwayPlayer {\\n                    id\\n                    nickname\\n                }\\n                challengerPlayer {\\n                    id\\n                    nickname\\n                }\\n                createsSpace\\n                dribbleType\\n                insertedAt\\n                keeperPlayer {\\n                    id\\n                    nickname\\n                }\\n                linesBrokenType\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                opportunityType\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                tackleAttemptType\\n                trickType\\n                updatedAt\\n            }\\n            clearanceEvent {\\n                advantageType\\n                ballHeightType\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                blockerPlayer {\\n                    id\\n                    nickname\\n                }\\n                clearanceBodyType\\n                clearanceOutcomeType\\n                clearancePlayer {\\n                    id\\n                    nickname\\n                }\\n                createsSpace\\n                failedInterventionPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer1 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer2 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer3 {\\n                    id\\n                    nickname\\n                }\\n                insertedAt\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                opportunityType\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                pressureType\\n                shotInitialHeightType\\n                shotOutcomeType\\n                updatedAt\\n            }\\n            crossEvent {\\n                advantageType\\n                ballHeightType\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                blockerPlayer {\\n                    id\\n                    nickname\\n                }\\n                clearerPlayer {\\n                    id\\n                    nickname\\n                }\\n                completeToPlayer {\\n                    id\\n                    nickname\\n                }\\n                createsSpace\\n                crossHighPointType\\n                crossOutcomeType\\n                crossType\\n                crossZoneType\\n                crosserBodyType\\n                crosserPlayer {\\n                    id\\n                    nickname\\n                }\\n                defenderBallHeightType\\n                defenderBodyType\\n                defenderPlayer {\\n                    id\\n                    nickname\\n                }\\n                deflectorBodyType\\n                deflectorPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer1 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer2 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer3 {\\n                    id\\n                    nickname\\n                }\\n                incompletionReasonType\\n                insertedAt\\n                intendedTargetPlayer {\\n                    id\\n                    nickname\\n                }\\n                keeperPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                noLook\\n                opportunityType\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                pressureType\\n                receiverBallHeightType\\n                receiverBodyType\\n                secondIncompletionReasonType\\n                shotInitialHeightType\\n                shotOutcomeType\\n                updatedAt\\n            }\\n            passingEvent {\\n                advantageType\\n                ballHeightType\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                blockerPlayer {\\n                    id\\n                    nickname\\n                }\\n                createsSpace\\n                defenderBodyType\\n                defenderHeightType\\n                defenderPlayer {\\n                    id\\n                    nickname\\n                }\\n                deflectorBodyType\\n                deflectorPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer1 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer2 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer3 {\\n                    id\\n                    nickname\\n                }\\n                incompletionReasonType\\n                insertedAt\\n                linesBrokenType\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                noLook\\n                opportunityType\\n                passAccuracyType\\n                passBodyType\\n                passHighPointType\\n                passOutcomeType\\n                passType\\n                passerPlayer {\\n                    id\\n                    nickname\\n                }\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                pressureType\\n                receiverBodyType\\n                receiverFacingType\\n                receiverHeightType\\n                receiverPlayer {\\n                    id\\n                    nickname\\n                }\\n                secondIncompletionReasonType\\n                shotInitialHeightType\\n                shotOutcomeType\\n                targetFacingType\\n                targetPlayer {\\n                    id\\n                    nickname\\n                }\\n                updatedAt\\n            }\\n            reboundEvent {\\n                advantageType\\n                blockerPlayer {\\n                    id\\n                    nickname\\n                }\\n                insertedAt\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                originateType\\n                reboundBodyType\\n                reboundHeightType\\n                reboundHighPointType\\n                reboundOutcomeType\\n                rebounderPlayer {\\n                    id\\n                    nickname\\n                }\\n                shotInitialHeightType\\n                shotOutcomeType\\n                updatedAt\\n            }\\n            shootingEvent {\\n                advantageType\\n                badParry\\n                ballHeightType\\n                ballMoving\\n                betterOptionPlayer {\\n                    id\\n                    nickname\\n                }\\n                betterOptionTime\\n                betterOptionType\\n                blockerPlayer {\\n                    id\\n                    nickname\\n                }\\n                bodyMovementType\\n                clearerPlayer {\\n                    id\\n                    nickname\\n                }\\n                createsSpace\\n                deflectorBodyType\\n                deflectorPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer1 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer2 {\\n                    id\\n                    nickname\\n                }\\n                failedInterventionPlayer3 {\\n                    id\\n                    nickname\\n                }\\n                insertedAt\\n                keeperTouchType\\n                missedTouchPlayer {\\n                    id\\n                    nickname\\n                }\\n                missedTouchType\\n                noLook\\n                pressurePlayer {\\n                    id\\n                    nickname\\n                }\\n                pressureType\\n                saveHeightType\\n                saveReboundType\\n                saveable\\n                saverPlayer {\\n                    id\\n                    nickname\\n                }\\n                shooterPlayer {\\n                    id\\n                    nickname\\n                }\\n                shotBodyType\\n                shotInitialHeightType\\n                shotNatureType\\n                shotOutcomeType\\n                shotType\\n                updatedAt\\n            } \\n            fouls {\\n                badCall\\n                correctDecision\\n                culpritPlayer {\\n                    id\\n                    nickname\\n                }\\n                foulOutcomeType\\n                foulType\\n                insertedAt\\n                potentialOffenseType\\n                sequence\\n                updatedAt\\n                var\\n                varCulpritPlayer {\\n                    id\\n                    nickname\\n                }\\n                varOutcomeType\\n                varPotentialOffenseType\\n                varReasonType\\n                victimPlayer {\\n                    id\\n                    nickname\\n                }\\n            }\\n            grades {\\n                gradeLabel\\n                gradeStyle\\n                gradeType\\n                insertedAt\\n                playerGrade\\n                player {\\n                    id\\n                    nickname\\n                }\\n                updatedAt\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_event_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
+    df: a dataframe containing the event, or records, see return_type
     
-    try:
-        df = pd.DataFrame(response.json()['data']).T
-        return df.infer_objects()
-    except:
-        print(response.text)
-        
-def get_game_events_games(url, key, games):
+    '''
+    return _get_client(url, key).get_game_event(game_event_id, fields = fields, exclude = exclude, return_type = return_type)
+
+def get_game_events_games(url, key, games, max_workers = 1, requests_per_second = None, return_failures = False, normalize = False, stream = False,
+                          fields = None, exclude = None, batch_size = 1, pack_freeze_frames = False, return_type = 'frame', compact = False):
     ''' 
     Retrieves all events of games for a given list of games.
     
+    Games are requested concurrently when max_workers is larger than 1. A game 
+    that fails does not affect the other games; it is left out of the dataframe 
+    and reported instead.
+    
     Parameters
     -----------
     
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     games: a list of integers to select the games
+    max_workers: an integer with the maximum number of requests in flight, defaults to 1 (serial)
+    requests_per_second: a float to cap the request rate over all workers, defaults to None (no cap)
+    return_failures: a boolean to also return the games that failed
+    normalize: a boolean to return normalized tables instead of one nested dataframe
+    stream: a boolean to decode the events while the responses are downloaded
+    fields: a list of dotted paths of the event fields to request, see get_game_events
+    exclude: a list of dotted paths of the event fields to leave out, see get_game_events
+    batch_size: an integer with the maximum number of games per request, defaults to 1; 
+    None picks the number of games per request automatically. Batched responses are 
+    decoded in full, stream only applies to games that are requested on their own
+    pack_freeze_frames: a boolean to return the offenderLocations and defenderLocations 
+    of the events packed in a freeze_frames.FreezeFrames instead of as columns, which 
+    packs every game as soon as it arrives, defaults to False
+    return_type: a string, 'frame' for a dataframe, 'records' for a list of dictionaries, one per 
+    row, or 'raw' for a dictionary of game_id to the list of events as returned by the API, 
+    defaults to 'frame'
+    compact: a boolean to convert the columns to compact dtypes, see get_game_events; 
+    every game is converted as soon as it arrives, defaults to False
 
 
     Returns
     ---------
     
-    df: a dataframe containing the events
+    df: a dataframe containing the events, or if normalize is True a dictionary 
+    of dataframes as returned by normalize.normalize_game_events, or records, see return_type
+    frames: a FreezeFrames with the freeze frame of every row of df, only if pack_freeze_frames is True
+    failures: a dictionary of game_id to error message, only if return_failures is True
     
     '''
-    df_list = []
-    for game_id in tqdm.tqdm(games):
-        payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n        gameEvents {\\n            id\\n            advantageType\\n            bodyType\\n            duration\\n            earlyDistribution\\n            endTime\\n            endType\\n            formattedGameClock\\n            gameClock\\n            gameEventType\\n            heightType\\n            initialTouchType\\n            insertedAt\\n            otherPlayer {\\n                id\\n                nickname\\n            }\\n            outType\\n            player {\\n                id\\n                nickname\\n            }\\n            playerOff {\\n                id\\n                nickname\\n            }\\n            playerOffType\\n            playerOn {\\n                id\\n                nickname\\n            }\\n            pressurePlayer {\\n                id\\n                nickname\\n            }\\n            pressureType\\n            scoreValue\\n            setpieceType\\n            startTime\\n            subType\\n            team {\\n                id\\n                name\\n            }\\n            touches\\n            touchesInBox\\n            updatedAt\\n            videoAngleType\\n            video {\\n                id\\n            }\\n            videoMissing\\n            videoUrl\\n            defenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            offenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            possessionEvents {\\n                duration\\n                endTime\\n                formattedGameClock\\n                gameClock\\n                id\\n                insertedAt\\n                possessionEventType\\n                startTime\\n                updatedAt\\n                videoUrl\\n                ballCarryEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    ballCarryType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    carryType\\n                    createsSpace\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    id\\n                    insertedAt\\n                    ballCarryOutcome\\n                    linesBrokenType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    touchOutcomeType\\n                    touchType\\n                    updatedAt\\n                }\\n                challengeEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    challengeOutcomeType\\n                    challengeType\\n                    challengeWinnerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerHomePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerAwayPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    dribbleType\\n                    insertedAt\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    tackleAttemptType\\n                    trickType\\n                    updatedAt\\n                }\\n                clearanceEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearanceBodyType\\n                    clearanceOutcomeType\\n                    clearancePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                crossEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    completeToPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    crossHighPointType\\n                    crossOutcomeType\\n                    crossType\\n                    crossZoneType\\n                    crosserBodyType\\n                    crosserPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    defenderBallHeightType\\n                    defenderBodyType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    intendedTargetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBallHeightType\\n                    receiverBodyType\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                passingEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    defenderBodyType\\n                    defenderHeightType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    passAccuracyType\\n                    passBodyType\\n                    passHighPointType\\n                    passOutcomeType\\n                    passType\\n                    passerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBodyType\\n                    receiverFacingType\\n                    receiverHeightType\\n                    receiverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    targetFacingType\\n                    targetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n                reboundEvent {\\n                    advantageType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    originateType\\n                    reboundBodyType\\n                    reboundHeightType\\n                    reboundHighPointType\\n                    reboundOutcomeType\\n                    rebounderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                shootingEvent {\\n                    advantageType\\n                    badParry\\n                    ballHeightType\\n                    ballMoving\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    bodyMovementType\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    keeperTouchType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    saveHeightType\\n                    saveReboundType\\n                    saveable\\n                    saverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shooterPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotBodyType\\n                    shotInitialHeightType\\n                    shotNatureType\\n                    shotOutcomeType\\n                    shotType\\n                    updatedAt\\n                }\\n                fouls {\\n                    badCall\\n                    correctDecision\\n                    culpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    foulOutcomeType\\n                    foulType\\n                    insertedAt\\n                    potentialOffenseType\\n                    sequence\\n                    updatedAt\\n                    var\\n                    varCulpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    varOutcomeType\\n                    varPotentialOffenseType\\n                    varReasonType\\n                    victimPlayer {\\n                        id\\n                        nickname\\n                    }\\n                }\\n                grades {\\n                    gradeLabel\\n                    gradeStyle\\n                    gradeType\\n                    insertedAt\\n                    playerGrade\\n                    player {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-        response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-        
-        try:
-            df = pd.DataFrame(response.json()['data']['game']['gameEvents'])
-            df.insert(0, 'gameId', [game_id] * len(df))
-            df = df.sort_values('startTime', ascending = True).reset_index(drop = True)
-            df_list.append(df)
-        except:
-            print('\nError in game: ' + str(game_id))
-            print(response.text) 
-    final_df = pd.concat(df_list, ignore_index = True)
-    return final_df.infer_objects()
+    return _get_client(url, key).get_game_events_games(games, max_workers = max_workers, requests_per_second = requests_per_second, return_failures = return_failures, normalize = normalize, stream = stream,
+                                                     fields = fields, exclude = exclude, batch_size = batch_size, pack_freeze_frames = pack_freeze_frames, return_type = return_type,
+                                                     compact = compact)
 
 def get_scoring_events(url, key, competition_id, season):
     ''' 
@@ -463,24 +2034,10 @@ def get_scoring_events(url, key, competition_id, season):
     
     df: a dataframe containing the scoring events
     
-    '''    
-    payload = "{\"query\":\"  query($competitionId: ID!, $season: String!) {\\n       scoringEvents(competitionId: $competitionId, season: $season) {\\n            id\\n           gameEventType\\n           gameId\\n            period\\n            startTime\\n            formattedGameClock\\n            outType\\n        }\\n    }\\n\",\"variables\":{\"competitionId\":" + str(competition_id) + ",\"season\":\"" + str(season) + "\"}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-    
-    try:
-        df = pd.DataFrame.from_dict(response.json()['data']['scoringEvents'])
-        df = df[df['gameEventType'] == 'OUT']
-        df['gameId'] = df['gameId'].astype(int)
-        
-        df_pivot = df.groupby(['gameId','outType'])[['id']].count().reset_index(drop = False)
-        df_pivot = df_pivot.pivot(index = 'gameId', columns = 'outType', values = 'id').fillna(0)
-        df_pivot = df_pivot.rename(columns = {'A':'awayGoals','H':'homeGoals'}).reset_index(drop = False)
-        
-        return df.infer_objects(), df_pivot.infer_objects()
-    except:
-        print(response.text)
-        
-def get_otb_data(url, key, game_id):
+    '''
+    return _get_client(url, key).get_scoring_events(competition_id, season)
+
+def get_otb_data(url, key, game_id, compact = False):
     ''' 
     Retrieves all On-The-Ball events of a game for a given game_id.
     
@@ -490,6 +2047,8 @@ def get_otb_data(url, key, game_id):
     url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
     key: a string that serves as the API key
     game_id: an integer to select the game
+    compact: a boolean to convert the columns to compact dtypes, i.e. categorical event 
+    types, nullable integer ids and float32 clocks, see dtypes.compact, defaults to False
 
 
     Returns
@@ -498,82 +2057,7 @@ def get_otb_data(url, key, game_id):
     df: a dataframe containing the On-The-Ball events
     
     '''
-    payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n        gameEvents {\\n            id\\n            duration\\n            endTime\\n            endType\\n            formattedGameClock\\n            gameClock\\n            gameEventType\\n            outType\\n            player {\\n                id\\n                nickname\\n            }\\n            playerOff {\\n                id\\n                nickname\\n            }\\n            playerOffType\\n            playerOn {\\n                id\\n                nickname\\n            }\\n            startTime\\n            team {\\n                id\\n                name\\n            }\\n            possessionEvents {\\n                formattedGameClock\\n                gameClock\\n                id\\n                possessionEventType\\n                startTime\\n                \\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload)
-
-    try:
-        df = pd.DataFrame(response.json()['data']['game']['gameEvents'])
-        df = df.rename(columns = {'id':'gameEventId','playerOffType':'offType'})
-        df.insert(0, 'gameId', [game_id] * len(df))
-        df = df.sort_values('startTime', ascending = True).reset_index(drop = True)   
-        
-        df = df[df['gameEventType'].isin(['FIRSTKICKOFF','SECONDKICKOFF','THIRDKICKOFF','FOURTHKICKOFF','OTB','OUT','ON','OFF','SUB','END'])]
-        
-        df['teamId'] = df['team'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
-        df['teamName'] = df['team'].apply(lambda x: x.get('name', None) if isinstance(x, dict) else None)
-        df['playerId'] = df['player'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
-        df['playerName'] = df['player'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)
-        df['playerOnId'] = df['playerOn'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
-        df['playerOnName'] = df['playerOn'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)
-        df['playerOffId'] = df['playerOff'].apply(lambda x: x.get('id', None) if isinstance(x, dict) else None)
-        df['playerOffName'] = df['playerOff'].apply(lambda x: x.get('nickname', None) if isinstance(x, dict) else None)  
-        
-        possessionEvents = df['possessionEvents'].apply(pd.Series)
-        possessionEvents.index = df['gameEventId']
-    
-        # Since there can be multiple possession events per game event, we need to loop over them
-        temp_list1 = []
-        for i in range(possessionEvents.shape[-1]):
-            temp1 = possessionEvents[i].apply(pd.Series)
-            temp1 = temp1.reset_index(drop = False)
-            temp1 = temp1.rename(columns = {'id':'possessionEventId'})
-            temp1 = temp1.drop(columns = [0])
-            temp1 = temp1.dropna(how = 'all', axis = 0)
-            temp_list1.append(temp1)
-        possessionEvents = pd.concat(temp_list1, ignore_index = True)
-        possessionEvents = possessionEvents[~possessionEvents['possessionEventId'].isnull()]
-        
-        challengeEvents = possessionEvents[possessionEvents['possessionEventType'] == 'CH'].copy()
-        possessionEvents = possessionEvents[possessionEvents['possessionEventType'] != 'CH'].copy()
-    
-        ballCarryEvents = possessionEvents[possessionEvents['possessionEventType'] == 'BC'].copy()
-        possessionEvents = possessionEvents[possessionEvents['possessionEventType'] != 'BC'].copy()
-            
-        possessionEvents['challengeEvent'] = possessionEvents['gameEventId'].isin(challengeEvents['gameEventId'])
-        possessionEvents['ballCarryEvent'] = possessionEvents['gameEventId'].isin(ballCarryEvents['gameEventId'])
-        
-        df = df.merge(possessionEvents[['gameEventId','possessionEventId','possessionEventType','challengeEvent','ballCarryEvent']], how = 'left', on = 'gameEventId')
-        
-        df['playerOnId'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnId'], np.nan)
-        df['playerOnName'] = np.where(df['gameEventType'].isin(['SUB','ON']), df['playerOnName'], np.nan)
-        df['playerOffId'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffId'], np.nan)
-        df['playerOffName'] = np.where(df['gameEventType'].isin(['SUB','OFF']), df['playerOffName'], np.nan)
+    return _get_client(url, key).get_otb_data(game_id, compact = compact)
 
-        df['offType'] = np.where(df['offType'].isin(['R']), df['offType'], np.nan)
-        
-        df = df.drop(columns = ['team','player','playerOn','playerOff','possessionEvents'])
-        
-        df = df[['gameId','gameEventId','gameEventType','possessionEventId','possessionEventType','gameClock','formattedGameClock','startTime','endTime','duration','teamId','teamName','playerId','playerName','endType','offType','outType','playerOnId','playerOnName','playerOffId','playerOffName','challengeEvent','ballCarryEvent']]
-    
-        ints = ['gameId','gameEventId','possessionEventId','teamId','playerId','playerOnId','playerOffId']
-        for col in ints:
-            try:
-                df[col] = df[col].astype(int)
-            except:
-                df[col] = df[col].astype('Int64')
-                
-        return df
-    except:
-        print(response.text)
-        
-def get_events(url, key, game_id):
-    payload = "{\"query\":\"query game ($id: ID!) {\\n    game (id: $id) {\\n        id\\n        gameEvents {\\n            id\\n            advantageType\\n            bodyType\\n            duration\\n            earlyDistribution\\n            endTime\\n            endType\\n            formattedGameClock\\n            gameClock\\n            gameEventType\\n            heightType\\n            initialTouchType\\n            insertedAt\\n            otherPlayer {\\n                id\\n                nickname\\n            }\\n            outType\\n            player {\\n                id\\n                nickname\\n            }\\n            playerOff {\\n                id\\n                nickname\\n            }\\n            playerOffType\\n            playerOn {\\n                id\\n                nickname\\n            }\\n            pressurePlayer {\\n                id\\n                nickname\\n            }\\n            pressureType\\n            scoreValue\\n            setpieceType\\n            startTime\\n            subType\\n            team {\\n                id\\n                name\\n            }\\n            touches\\n            touchesInBox\\n            updatedAt\\n            videoAngleType\\n            video {\\n                id\\n            }\\n            videoMissing\\n            videoUrl\\n            defenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            offenderLocations {\\n                eventModule\\n                name\\n                x\\n                y\\n            }\\n            possessionEvents {\\n                duration\\n                endTime\\n                formattedGameClock\\n                gameClock\\n                id\\n                insertedAt\\n                possessionEventType\\n                startTime\\n                updatedAt\\n                videoUrl\\n                ballCarryEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    ballCarryType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    carryType\\n                    createsSpace\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    id\\n                    insertedAt\\n                    ballCarryOutcome\\n                    linesBrokenType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    touchOutcomeType\\n                    touchType\\n                    updatedAt\\n                }\\n                challengeEvent {\\n                    additionalChallenger1 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger2 {\\n                        id\\n                        nickname\\n                    }\\n                    additionalChallenger3 {\\n                        id\\n                        nickname\\n                    }\\n                    advantageType\\n                    ballCarrierPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    challengeOutcomeType\\n                    challengeType\\n                    challengeWinnerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerHomePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerAwayPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    challengerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    dribbleType\\n                    insertedAt\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    tackleAttemptType\\n                    trickType\\n                    updatedAt\\n                }\\n                clearanceEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearanceBodyType\\n                    clearanceOutcomeType\\n                    clearancePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                crossEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    completeToPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    crossHighPointType\\n                    crossOutcomeType\\n                    crossType\\n                    crossZoneType\\n                    crosserBodyType\\n                    crosserPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    defenderBallHeightType\\n                    defenderBodyType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    intendedTargetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    keeperPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBallHeightType\\n                    receiverBodyType\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                passingEvent {\\n                    advantageType\\n                    ballHeightType\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    defenderBodyType\\n                    defenderHeightType\\n                    defenderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    incompletionReasonType\\n                    insertedAt\\n                    linesBrokenType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    opportunityType\\n                    passAccuracyType\\n                    passBodyType\\n                    passHighPointType\\n                    passOutcomeType\\n                    passType\\n                    passerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    receiverBodyType\\n                    receiverFacingType\\n                    receiverHeightType\\n                    receiverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    secondIncompletionReasonType\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    targetFacingType\\n                    targetPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n                reboundEvent {\\n                    advantageType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    originateType\\n                    reboundBodyType\\n                    reboundHeightType\\n                    reboundHighPointType\\n                    reboundOutcomeType\\n                    rebounderPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotInitialHeightType\\n                    shotOutcomeType\\n                    updatedAt\\n                }\\n                shootingEvent {\\n                    advantageType\\n                    badParry\\n                    ballHeightType\\n                    ballMoving\\n                    betterOptionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    betterOptionTime\\n                    betterOptionType\\n                    blockerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    bodyMovementType\\n                    clearerPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    createsSpace\\n                    deflectorBodyType\\n                    deflectorPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer1 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer2 {\\n                        id\\n                        nickname\\n                    }\\n                    failedInterventionPlayer3 {\\n                        id\\n                        nickname\\n                    }\\n                    insertedAt\\n                    keeperTouchType\\n                    missedTouchPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    missedTouchType\\n                    noLook\\n                    pressurePlayer {\\n                        id\\n                        nickname\\n                    }\\n                    pressureType\\n                    saveHeightType\\n                    saveReboundType\\n                    saveable\\n                    saverPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shooterPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    shotBodyType\\n                    shotInitialHeightType\\n                    shotNatureType\\n                    shotOutcomeType\\n                    shotType\\n                    updatedAt\\n                }\\n                fouls {\\n                    badCall\\n                    correctDecision\\n                    culpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    foulOutcomeType\\n                    foulType\\n                    insertedAt\\n                    potentialOffenseType\\n                    sequence\\n                    updatedAt\\n                    var\\n                    varCulpritPlayer {\\n                        id\\n                        nickname\\n                    }\\n                    varOutcomeType\\n                    varPotentialOffenseType\\n                    varReasonType\\n                    victimPlayer {\\n                        id\\n                        nickname\\n                    }\\n                }\\n                grades {\\n                    gradeLabel\\n                    gradeStyle\\n                    gradeType\\n                    insertedAt\\n                    playerGrade\\n                    player {\\n                        id\\n                        nickname\\n                    }\\n                    updatedAt\\n                }\\n            }\\n        }\\n    }\\n}\",\"variables\":{\"id\":" + str(game_id) + "}}"
-    response = requests.request("POST", url, headers = {'x-api-key': key, 'Content-Type': 'application/json'}, data = payload, verify = False)
-    
-    try:
-        df = pd.DataFrame(response.json()['data']['game']['gameEvents'])
-        df.insert(0, 'gameId', [game_id] * len(df))
-        df = df.sort_values('startTime', ascending = True).reset_index(drop = True)
-        return df.infer_objects()
-    except:
-        print(response.text)  
\ No newline at end of file
+def get_events(url, key, game_id, normalize = False, stream = False, fields = None, exclude = None, compact = False):
+    return _get_client(url, key).get_events(game_id, normalize = normalize, stream = stream, fields = fields, exclude = exclude, compact = compact)
@@ -0,0 +1,780 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GraphQL documents for the PFF FC API.
+
+The selections of the queries are kept as plain GraphQL text and turned into
+compact request payloads by build_query(). A selection can be narrowed with
+fields (dotted paths to keep) and exclude (dotted paths to drop), i.e.
+
+    build_query('gameEvent', GAME_EVENT, {'id': ('ID!', 1234)}, exclude = NO_FREEZE_FRAMES)
+
+only asks the API for the parts of the game events that are needed, which
+makes both the request and the response smaller.
+"""
+import json
+import re
+
+COMPETITION = '''
+id
+name
+games {
+    id
+    season
+}
+'''
+
+TEAM = '''
+id
+name
+shortName
+country
+homeGames {
+    id
+}
+awayGames {
+    id
+}
+kits {
+    id
+    name
+    primaryColor
+    secondaryColor
+    primaryTextColor
+    secondaryTextColor
+}
+homeStadium {
+    id
+    name
+    pitches {
+        id
+        length
+        width
+        startDate
+        endDate
+    }
+}
+'''
+
+GAME = '''
+id
+date
+season
+week
+homeTeam {
+    id
+    name
+    shortName
+}
+awayTeam {
+    id
+    name
+    shortName
+}
+startPeriod1
+endPeriod1
+startPeriod2
+endPeriod2
+period1
+period2
+halfPeriod
+homeTeamStartLeft
+homeTeamKit {
+    name
+    primaryColor
+    primaryTextColor
+    secondaryColor
+    secondaryTextColor
+}
+awayTeamKit {
+    name
+    primaryColor
+    primaryTextColor
+    secondaryColor
+    secondaryTextColor
+}
+stadium {
+    id
+    name
+    pitches {
+        id
+        length
+        width
+        startDate
+        endDate
+    }
+}
+videos {
+    id
+    fps
+    videoUrl
+}
+'''
+
+# A game on its own also names its competition
+GAME_WITH_COMPETITION = GAME.replace('\nid\n', '''
+id
+competition {
+    id
+    name
+}
+''', 1)
+
+GAMES = '''
+id
+name
+games {
+''' + GAME + '''
+}
+'''
+
+PLAYER = '''
+id
+firstName
+lastName
+nickname
+positionGroupType
+nationality {
+    id
+    country
+}
+secondNationality {
+    id
+    country
+}
+weight
+height
+dob
+gender
+countryOfBirth {
+    id
+    country
+}
+euMember
+rosters {
+    game {
+        id
+    }
+    started
+}
+transfermarktPlayerId
+'''
+
+# The players of the rosters of a game
+GAME_PLAYERS = '''
+rosters {
+    player {
+        id
+        firstName
+        lastName
+        nickname
+        positionGroupType
+        nationality {
+            id
+            country
+        }
+        secondNationality {
+            id
+            country
+        }
+        weight
+        height
+        dob
+        gender
+        countryOfBirth {
+            id
+            country
+        }
+        euMember
+        transfermarktPlayerId
+    }
+}
+'''
+
+PLAYERS_COMPETITION = '''
+games {
+''' + GAME_PLAYERS + '''
+}
+'''
+
+ROSTER = '''
+id
+rosters {
+    player { id nickname }
+    positionGroupType
+    shirtNumber
+    team {
+        id
+        name
+    }
+    started
+}
+'''
+
+GAME_EVENT = '''
+id
+advantageType
+bodyType
+duration
+earlyDistribution
+endTime
+endType
+formattedGameClock
+gameClock
+gameEventType
+heightType
+initialTouchType
+insertedAt
+otherPlayer { id nickname }
+outType
+player { id nickname }
+playerOff { id nickname }
+playerOffType
+playerOn { id nickname }
+pressurePlayer { id nickname }
+pressureType
+scoreValue
+setpieceType
+startTime
+subType
+team {
+    id
+    name
+}
+touches
+touchesInBox
+updatedAt
+videoAngleType
+video {
+    id
+}
+videoMissing
+videoUrl
+defenderLocations {
+    eventModule
+    name
+    x
+    y
+}
+offenderLocations {
+    eventModule
+    name
+    x
+    y
+}
+possessionEvents {
+    duration
+    endTime
+    formattedGameClock
+    gameClock
+    id
+    insertedAt
+    possessionEventType
+    startTime
+    updatedAt
+    videoUrl
+    ballCarryEvent {
+        additionalChallenger1 { id nickname }
+        additionalChallenger2 { id nickname }
+        additionalChallenger3 { id nickname }
+        advantageType
+        ballCarrierPlayer { id nickname }
+        ballCarryType
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        carryType
+        createsSpace
+        defenderPlayer { id nickname }
+        id
+        insertedAt
+        ballCarryOutcome
+        linesBrokenType
+        opportunityType
+        pressurePlayer { id nickname }
+        touchOutcomeType
+        touchType
+        updatedAt
+    }
+    challengeEvent {
+        additionalChallenger1 { id nickname }
+        additionalChallenger2 { id nickname }
+        additionalChallenger3 { id nickname }
+        advantageType
+        ballCarrierPlayer { id nickname }
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        challengeOutcomeType
+        challengeType
+        challengeWinnerPlayer { id nickname }
+        challengerHomePlayer { id nickname }
+        challengerAwayPlayer { id nickname }
+        challengerPlayer { id nickname }
+        createsSpace
+        dribbleType
+        insertedAt
+        keeperPlayer { id nickname }
+        linesBrokenType
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        opportunityType
+        pressurePlayer { id nickname }
+        tackleAttemptType
+        trickType
+        updatedAt
+    }
+    clearanceEvent {
+        advantageType
+        ballHeightType
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        blockerPlayer { id nickname }
+        clearanceBodyType
+        clearanceOutcomeType
+        clearancePlayer { id nickname }
+        createsSpace
+        failedInterventionPlayer { id nickname }
+        failedInterventionPlayer1 { id nickname }
+        failedInterventionPlayer2 { id nickname }
+        failedInterventionPlayer3 { id nickname }
+        insertedAt
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        opportunityType
+        pressurePlayer { id nickname }
+        pressureType
+        shotInitialHeightType
+        shotOutcomeType
+        updatedAt
+    }
+    crossEvent {
+        advantageType
+        ballHeightType
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        blockerPlayer { id nickname }
+        clearerPlayer { id nickname }
+        completeToPlayer { id nickname }
+        createsSpace
+        crossHighPointType
+        crossOutcomeType
+        crossType
+        crossZoneType
+        crosserBodyType
+        crosserPlayer { id nickname }
+        defenderBallHeightType
+        defenderBodyType
+        defenderPlayer { id nickname }
+        deflectorBodyType
+        deflectorPlayer { id nickname }
+        failedInterventionPlayer { id nickname }
+        failedInterventionPlayer1 { id nickname }
+        failedInterventionPlayer2 { id nickname }
+        failedInterventionPlayer3 { id nickname }
+        incompletionReasonType
+        insertedAt
+        intendedTargetPlayer { id nickname }
+        keeperPlayer { id nickname }
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        noLook
+        opportunityType
+        pressurePlayer { id nickname }
+        pressureType
+        receiverBallHeightType
+        receiverBodyType
+        secondIncompletionReasonType
+        shotInitialHeightType
+        shotOutcomeType
+        updatedAt
+    }
+    passingEvent {
+        advantageType
+        ballHeightType
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        blockerPlayer { id nickname }
+        createsSpace
+        defenderBodyType
+        defenderHeightType
+        defenderPlayer { id nickname }
+        deflectorBodyType
+        deflectorPlayer { id nickname }
+        failedInterventionPlayer { id nickname }
+        failedInterventionPlayer1 { id nickname }
+        failedInterventionPlayer2 { id nickname }
+        failedInterventionPlayer3 { id nickname }
+        incompletionReasonType
+        insertedAt
+        linesBrokenType
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        noLook
+        opportunityType
+        passAccuracyType
+        passBodyType
+        passHighPointType
+        passOutcomeType
+        passType
+        passerPlayer { id nickname }
+        pressurePlayer { id nickname }
+        pressureType
+        receiverBodyType
+        receiverFacingType
+        receiverHeightType
+        receiverPlayer { id nickname }
+        secondIncompletionReasonType
+        shotInitialHeightType
+        shotOutcomeType
+        targetFacingType
+        targetPlayer { id nickname }
+        updatedAt
+    }
+    reboundEvent {
+        advantageType
+        blockerPlayer { id nickname }
+        insertedAt
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        originateType
+        reboundBodyType
+        reboundHeightType
+        reboundHighPointType
+        reboundOutcomeType
+        rebounderPlayer { id nickname }
+        shotInitialHeightType
+        shotOutcomeType
+        updatedAt
+    }
+    shootingEvent {
+        advantageType
+        badParry
+        ballHeightType
+        ballMoving
+        betterOptionPlayer { id nickname }
+        betterOptionTime
+        betterOptionType
+        blockerPlayer { id nickname }
+        bodyMovementType
+        clearerPlayer { id nickname }
+        createsSpace
+        deflectorBodyType
+        deflectorPlayer { id nickname }
+        failedInterventionPlayer { id nickname }
+        failedInterventionPlayer1 { id nickname }
+        failedInterventionPlayer2 { id nickname }
+        failedInterventionPlayer3 { id nickname }
+        insertedAt
+        keeperTouchType
+        missedTouchPlayer { id nickname }
+        missedTouchType
+        noLook
+        pressurePlayer { id nickname }
+        pressureType
+        saveHeightType
+        saveReboundType
+        saveable
+        saverPlayer { id nickname }
+        shooterPlayer { id nickname }
+        shotBodyType
+        shotInitialHeightType
+        shotNatureType
+        shotOutcomeType
+        shotType
+        updatedAt
+    }
+    fouls {
+        badCall
+        correctDecision
+        culpritPlayer { id nickname }
+        foulOutcomeType
+        foulType
+        insertedAt
+        potentialOffenseType
+        sequence
+        updatedAt
+        var
+        varCulpritPlayer { id nickname }
+        varOutcomeType
+        varPotentialOffenseType
+        varReasonType
+        victimPlayer { id nickname }
+    }
+    grades {
+        gradeLabel
+        gradeStyle
+        gradeType
+        insertedAt
+        playerGrade
+        player { id nickname }
+        updatedAt
+    }
+}
+'''
+
+# The fields get_otb_data flattens
+OTB_EVENT = '''
+id
+duration
+endTime
+endType
+formattedGameClock
+gameClock
+gameEventType
+outType
+player { id nickname }
+playerOff { id nickname }
+playerOffType
+playerOn { id nickname }
+startTime
+team {
+    id
+    name
+}
+possessionEvents {
+    formattedGameClock
+    gameClock
+    id
+    possessionEventType
+    startTime
+}
+'''
+
+# The events of a game, with the game id
+GAME_EVENTS = '''
+id
+gameEvents {
+''' + GAME_EVENT + '''
+}
+'''
+
+OTB_EVENTS = '''
+id
+gameEvents {
+''' + OTB_EVENT + '''
+}
+'''
+
+SCORING_EVENT = '''
+id
+gameEventType
+gameId
+period
+startTime
+formattedGameClock
+outType
+'''
+
+# Selections to pass as exclude, i.e. get_game_events(game_id, exclude = NO_FREEZE_FRAMES + NO_GRADES)
+NO_FREEZE_FRAMES = ['defenderLocations', 'offenderLocations']
+NO_GRADES = ['possessionEvents.grades']
+NO_FOULS = ['possessionEvents.fouls']
+NO_SUB_EVENTS = ['possessionEvents.' + name for name in
+                 ['ballCarryEvent', 'challengeEvent', 'clearanceEvent', 'crossEvent', 'passingEvent', 'reboundEvent', 'shootingEvent']]
+
+# Limits of a batched request, see build_batch_query
+MAX_PAYLOAD_BYTES = 64 * 1024
+MAX_ALIASES = 50
+
+_TOKENS = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|[{}]')
+_parsed = {}
+
+def parse(selection):
+    '''
+    Turns the text of a selection into a dictionary of field name to None, for
+    a scalar, or to the dictionary of its own selection, for an object.
+    '''
+    tree = _parsed.get(selection)
+    if tree is not None:
+        return tree
+    tokens = _TOKENS.findall(re.sub(r'#[^\n]*', '', selection))
+    stack = [{}]
+    for position, token in enumerate(tokens):
+        if token == '{':
+            continue
+        if token == '}':
+            stack.pop()
+        elif position + 1 < len(tokens) and tokens[position + 1] == '{':
+            stack[-1][token] = {}
+            stack.append(stack[-1][token])
+        else:
+            stack[-1][token] = None
+    if len(stack) != 1:
+        raise ValueError('unbalanced braces in selection')
+    _parsed[selection] = stack[0]
+    return stack[0]
+
+def _find(tree, path, field):
+    node = tree
+    for name in path:
+        if not isinstance(node, dict) or name not in node:
+            raise ValueError('unknown field ' + field)
+        node = node[name]
+    return node
+
+def select(tree, fields = None, exclude = None, prefix = None):
+    '''
+    Narrows a parsed selection.
+
+    Parameters
+    -----------
+
+    tree: a dictionary as returned by parse()
+    fields: a list of dotted paths to keep, i.e. ['startTime', 'possessionEvents.passingEvent'],
+    an object keeps its full selection unless fields names some of its members, objects keep
+    their id when they have one. Defaults to None (keep everything)
+    exclude: a list of dotted paths to drop, i.e. ['defenderLocations', 'possessionEvents.grades']
+    prefix: a string with the dotted path of the object the paths start from, i.e. 'gameEvents'
+    to select fields of the events of a game. Defaults to None (the top of the selection)
+
+
+    Returns
+    ---------
+
+    tree: a new dictionary with the selected fields, in the order of the original selection
+
+    '''
+    start = prefix.split('.') if prefix else []
+    if fields is not None:
+        kept = {}
+        for field in fields:
+            path = start + field.split('.')
+            _find(tree, path, field)
+            node = kept
+            for name in path[:-1]:
+                node = node.setdefault(name, {})
+            node[path[-1]] = True
+        tree = _keep(tree, kept)
+    else:
+        tree = _copy(tree)
+    for field in exclude or []:
+        path = start + field.split('.')
+        _find(tree, path, field)
+        del _find(tree, path[:-1], field)[path[-1]]
+    return tree
+
+def _copy(tree):
+    return {name: _copy(sub) if sub is not None else None for name, sub in tree.items()}
+
+def _keep(tree, kept):
+    out = {}
+    for name, sub in tree.items():
+        if name in kept:
+            if kept[name] is True or sub is None:
+                out[name] = _copy(sub) if sub is not None else None
+            else:
+                out[name] = _keep(sub, kept[name])
+        elif name == 'id':
+            out[name] = None
+    return out
+
+def render(tree):
+    '''
+    Renders a selection as a compact GraphQL selection set, i.e. '{id team{id name}}'.
+    Objects without fields left are dropped, as GraphQL does not allow empty selections.
+    '''
+    parts = []
+    for name, sub in tree.items():
+        if sub is None:
+            parts.append(name)
+        else:
+            rendered = render(sub)
+            if rendered:
+                parts.append(name + rendered)
+    if not parts:
+        return ''
+    return '{' + ' '.join(parts).replace('} ', '}') + '}'
+
+def _json_default(value):
+    # numpy integers, i.e. ids taken from a dataframe
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(type(value).__name__ + ' is not JSON serializable')
+
+def build_query(root, selection, variables = None, fields = None, exclude = None, prefix = None):
+    '''
+    Builds the JSON payload of a GraphQL request.
+
+    Parameters
+    -----------
+
+    root: a string with the name of the root field, i.e. 'game'
+    selection: a string with the selection of the root field, i.e. GAME_EVENT
+    variables: a dictionary of argument name to a (GraphQL type, value) tuple, i.e. {'id': ('ID!', 1234)}
+    fields: a list of dotted paths of the selection to keep, see select()
+    exclude: a list of dotted paths of the selection to drop, see select()
+    prefix: a string with the dotted path of the object fields and exclude refer to, see select()
+
+
+    Returns
+    ---------
+
+    payload: a string with the JSON body of the request
+
+    '''
+    variables = variables or {}
+    tree = parse(selection)
+    if fields is not None or exclude is not None:
+        tree = select(tree, fields, exclude, prefix)
+    body = render(tree)
+    arguments = ','.join(name + ':$' + name for name in variables)
+    definitions = ','.join('$' + name + ':' + kind for name, (kind, _) in variables.items())
+    query = 'query ' + root
+    if variables:
+        query += '(' + definitions + ')'
+    query += '{' + root
+    if variables:
+        query += '(' + arguments + ')'
+    query += body + '}'
+    values = {name: value for name, (_, value) in variables.items()}
+    return json.dumps({'query': query, 'variables': values}, separators = (',', ':'), default = _json_default)
+
+def alias(position):
+    return 'g' + str(position)
+
+def build_batch_query(root, selection, ids, fields = None, exclude = None, prefix = None):
+    '''
+    Builds the JSON payload of one GraphQL request for several ids, i.e. several
+    games, by giving every root field its own alias: g0: game(id: $g0) {...}.
+    The selection is repeated for every alias, so the request does not depend
+    on the type names of the schema as fragments would.
+
+    Parameters
+    -----------
+
+    root: a string with the name of the root field, i.e. 'game'
+    selection: a string with the selection of the root field, i.e. ROSTER
+    ids: a list of ids, the answer for ids[i] is stored under alias(i)
+    fields: a list of dotted paths of the selection to keep, see select()
+    exclude: a list of dotted paths of the selection to drop, see select()
+    prefix: a string with the dotted path of the object fields and exclude refer to, see select()
+
+
+    Returns
+    ---------
+
+    payload: a string with the JSON body of the request
+
+    '''
+    tree = parse(selection)
+    if fields is not None or exclude is not None:
+        tree = select(tree, fields, exclude, prefix)
+    body = render(tree)
+    names = [alias(position) for position in range(len(ids))]
+    definitions = ','.join('$' + name + ':ID!' for name in names)
+    query = 'query ' + root + 's(' + definitions + '){' + ''.join(name + ':' + root + '(id:$' + name + ')' + body for name in names) + '}'
+    return json.dumps({'query': query, 'variables': dict(zip(names, ids))}, separators = (',', ':'), default = _json_default)
+
+def batch_size(payload_bytes, limit = None):
+    '''
+    Returns how many ids fit in one batched request, given the size of the
+    payload for a single id and an optional upper limit.
+    '''
+    size = min(MAX_ALIASES, MAX_PAYLOAD_BYTES // max(1, payload_bytes))
+    if limit is not None:
+        size = min(size, limit)
+    return max(1, size)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Client-side scheduling of API requests, for use with pff.PFFClient.
+
+A Scheduler hands out the requests of every API key from a token bucket, so that
+no more than the allowed rate is sent however many callers share the key. Waiting
+requests are served by priority class first, and within a class in turn per
+caller, so that one bulk job with many workers cannot crowd out the others. An
+answer with HTTP 429 or a 5xx status holds back all requests of its key for the
+Retry-After of the answer, or an exponential backoff when there is none.
+
+    from pypff import scheduler
+
+    pff.set_scheduler(scheduler.Scheduler(rate = 10))
+
+    with scheduler.priority('bulk'), scheduler.caller('backfill'):
+        pff.get_game_events_games(url, key, games, max_workers = 8)
+
+Requests of the worker threads of a call count towards the caller and priority
+that were set when the call was made. The clients of pypff.aio wait for their turn
+with acquire_async, without blocking the event loop; every task is a caller of
+its own, and the requests of one call of a client count as those of one caller.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+
+# Retried with backoff, as by the Retry of PFFClient
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+
+# Lower levels are served first, integers can be used for finer levels
+PRIORITIES = {'interactive': 0, 'normal': 1, 'bulk': 2}
+
+# Seconds between the checks of an asyncio request whether it is its turn
+_POLL = 0.01
+
+_priority = contextvars.ContextVar('pypff_priority', default = 'normal')
+_caller = contextvars.ContextVar('pypff_caller', default = None)
+
+@contextlib.contextmanager
+def priority(level):
+    '''
+    Gives the requests made in a with block a priority class, i.e. with priority('bulk'): ...
+
+    Parameters
+    -----------
+
+    level: a string, 'interactive', 'normal' or 'bulk', or an integer, lower levels are served first
+
+    '''
+    _level(level)
+    token = _priority.set(level)
+    try:
+        yield level
+    finally:
+        _priority.reset(token)
+
+@contextlib.contextmanager
+def caller(name = None):
+    '''
+    Queues the requests made in a with block, including those of the threads started
+    in it, as those of one caller, which takes its turn with the other callers.
+
+    Parameters
+    -----------
+
+    name: a hashable to identify the caller, defaults to None (the current caller,
+    or a new one if there is none)
+
+    '''
+    if name is None:
+        name = current_caller()
+    token = _caller.set(name)
+    try:
+        yield name
+    finally:
+        _caller.reset(token)
+
+def current_caller():
+    '''
+    Returns the caller set with caller(), or the current asyncio task or thread if there is none.
+    '''
+    name = _caller.get()
+    if name is not None:
+        return name
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return ('task', id(task)) if task is not None else ('thread', threading.get_ident())
+
+def _level(level):
+    if isinstance(level, int) and not isinstance(level, bool):
+        return level
+    if level not in PRIORITIES:
+        raise ValueError('priority must be an integer or one of ' + ', '.join(PRIORITIES) + ', not ' + repr(level))
+    return PRIORITIES[level]
+
+def backoff_delay(retries, backoff_factor, retry_after = None):
+    '''
+    Returns the seconds to wait before retry number retries: the Retry-After of the
+    answer if there is one, else as urllib3 no wait before the first retry and
+    doubling waits after it.
+    '''
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return 0.0 if retries <= 1 else backoff_factor * 2 ** (retries - 1)
+
+class _Bucket:
+    # The tokens of one API key and the requests that wait for them, per level per caller in turn
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = {}
+
+    def delay(self, now):
+        # Seconds until a token is available and the key is no longer held back
+        pause = max(0.0, self.paused_until - now)
+        if not self.rate:
+            return pause
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(pause, (1.0 - self.tokens) / self.rate)
+
+    def take(self):
+        if self.rate:
+            self.tokens -= 1.0
+
+    def head(self):
+        if not self.waiting:
+            return None
+        callers = self.waiting[min(self.waiting)]
+        return callers[next(iter(callers))][0]
+
+    def add(self, level, name, waiter):
+        self.waiting.setdefault(level, collections.OrderedDict()).setdefault(name, collections.deque()).append(waiter)
+
+    def remove(self, level, name, waiter):
+        callers = self.waiting[level]
+        queue = callers[name]
+        served = queue[0] is waiter
+        queue.remove(waiter)
+        if not queue:
+            del callers[name]
+        elif served:
+            # The caller goes to the back of the line of its level
+            callers.move_to_end(name)
+        if not callers:
+            del self.waiting[level]
+
+    def depth(self):
+        return sum(len(queue) for callers in self.waiting.values() for queue in callers.values())
+
+class Scheduler:
+    '''
+    Hands out requests per API key at no more than a rate per second, serving the
+    waiting requests by priority class and in turn per caller, see the module
+    documentation. One scheduler can be shared by all clients of a process.
+
+    Parameters
+    -----------
+
+    rate: a float with the requests per second of every API key, defaults to None (no limit)
+    burst: an integer with the requests that can be sent at once after a quiet period, defaults
+    to 1, which spaces requests evenly so that the bucket of the API absorbs any jitter on the way
+    rates: a dictionary of API key to requests per second that overrides rate for that key
+    recent: an integer with the number of recent waits kept for the percentiles of metrics,
+    defaults to 1024
+
+    '''
+    def __init__(self, rate = None, burst = 1, rates = None, recent = 1024):
+        self.rate = rate
+        self.burst = burst
+        self.rates = dict(rates or {})
+        self._condition = threading.Condition()
+        self._buckets = {}
+        self._recent = collections.deque(maxlen = recent)
+        self._metrics = {}
+        self.throttled = 0
+        self.max_depth = 0
+
+    def _bucket(self, key):
+        if key not in self._buckets:
+            self._buckets[key] = _Bucket(self.rates.get(key, self.rate), max(1.0, float(self.burst)))
+        return self._buckets[key]
+
+    def acquire(self, key, level = None, name = None):
+        '''
+        Waits until a request with an API key may be sent.
+
+        Parameters
+        -----------
+
+        key: a string with the API key of the request
+        level: the priority class of the request, defaults to None (the one set with priority())
+        name: the caller of the request, defaults to None (the one set with caller())
+
+        Returns
+        ---------
+
+        seconds: a float with the time waited
+
+        '''
+        bucket, level, name, waiter, start = self._enqueue(key, level, name)
+        with self._condition:
+            try:
+                while True:
+                    if bucket.head() is waiter:
+                        delay = bucket.delay(time.monotonic())
+                        if delay <= 0:
+                            bucket.take()
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+            finally:
+                # Served, or given up on, i.e. interrupted: the next request in line takes over
+                bucket.remove(level, name, waiter)
+                self._condition.notify_all()
+            waited = time.monotonic() - start
+            self._record(level, waited)
+        return waited
+
+    async def acquire_async(self, key, level = None, name = None):
+        '''
+        Waits until a request with an API key may be sent, as acquire, without blocking
+        the event loop. Takes the same arguments and returns the time waited.
+        '''
+        bucket, level, name, waiter, start = self._enqueue(key, level, name)
+        try:
+            while True:
+                with self._condition:
+                    delay = bucket.delay(time.monotonic()) if bucket.head() is waiter else _POLL
+                    if delay <= 0:
+                        bucket.take()
+                        break
+                await asyncio.sleep(min(delay, _POLL))
+        finally:
+            # Served, or cancelled: the next request in line takes over
+            with self._condition:
+                bucket.remove(level, name, waiter)
+                self._condition.notify_all()
+        with self._condition:
+            waited = time.monotonic() - start
+            self._record(level, waited)
+        return waited
+
+    def _enqueue(self, key, level, name):
+        # Puts a new request in line for its key, level and caller
+        level = _level(level if level is not None else _priority.get())
+        name = name if name is not None else current_caller()
+        waiter = object()
+        with self._condition:
+            bucket = self._bucket(key)
+            bucket.add(level, name, waiter)
+            self.max_depth = max(self.max_depth, sum(other.depth() for other in self._buckets.values()))
+        return bucket, level, name, waiter, time.monotonic()
+
+    def _record(self, level, waited):
+        metrics = self._metrics.setdefault(level, {'requests': 0, 'wait': 0.0, 'max_wait': 0.0})
+        metrics['requests'] += 1
+        metrics['wait'] += waited
+        metrics['max_wait'] = max(metrics['max_wait'], waited)
+        self._recent.append(waited)
+
+    def backoff(self, key, seconds):
+        '''
+        Holds back all requests of an API key for a number of seconds, i.e. the
+        Retry-After of an answer with HTTP 429. The bucket starts empty afterwards.
+        '''
+        with self._condition:
+            bucket = self._bucket(key)
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+            bucket.tokens = 0.0
+            self.throttled += 1
+            self._condition.notify_all()
+
+    def depth(self):
+        '''
+        Returns the number of requests that are waiting, over all API keys.
+        '''
+        with self._condition:
+            return sum(bucket.depth() for bucket in self._buckets.values())
+
+    def metrics(self):
+        '''
+        Returns a dictionary with the requests that are waiting ('queued') and the most
+        that ever waited at once ('max_queued'), the requests handed out, the answers
+        that held back a key ('throttled'), the total, mean, 95th percentile and maximum
+        wait in seconds, and 'priorities', the requests and waits per priority class.
+        '''
+        with self._condition:
+            priorities = {level: dict(metrics) for level, metrics in sorted(self._metrics.items())}
+            queued = sum(bucket.depth() for bucket in self._buckets.values())
+            recent = sorted(self._recent)
+            max_queued, throttled = self.max_depth, self.throttled
+        names = {level: name for name, level in PRIORITIES.items()}
+        priorities = {names.get(level, level): metrics for level, metrics in priorities.items()}
+        for metrics in priorities.values():
+            metrics['mean_wait'] = metrics['wait'] / metrics['requests']
+        requests = sum(metrics['requests'] for metrics in priorities.values())
+        wait = sum(metrics['wait'] for metrics in priorities.values())
+        return {'queued': queued, 'max_queued': max_queued, 'requests': requests, 'throttled': throttled, 'wait': wait,
+                'mean_wait': wait / requests if requests else 0.0,
+                'p95_wait': recent[min(len(recent) - 1, int(0.95 * len(recent)))] if recent else 0.0,
+                'max_wait': max([metrics['max_wait'] for metrics in priorities.values()], default = 0.0),
+                'priorities': priorities}
+
+    def reset_metrics(self):
+        with self._condition:
+            self._metrics = {}
+            self._recent.clear()
+            self.throttled = 0
+            self.max_depth = 0
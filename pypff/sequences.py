@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sequences and possessions of play, derived from the On-The-Ball data.
+
+get_otb_data returns a row per possession event, with the team on the ball, and
+the kickoffs, OUT and END events that stop play. From one or many games of those
+rows, concatenated in any order, this module finds
+
+- sequences: the events of one team in a row while the ball is in play, which
+  end when the other team gets the ball or play stops,
+- possessions: the events of one team in a row within a period, which only end
+  when the other team gets the ball, so that a possession can hold several
+  sequences, i.e. a throw-in or a free kick of the same team,
+
+with change points over all games at once, instead of a loop over the rows:
+
+- assign(): the rows with the sequence and possession of every event,
+- sequences(): a row per sequence with its team, start and end, duration,
+  event counts, and how it started and ended,
+- possessions(): the same per possession.
+
+Sequences and possessions are numbered from 1 within every game, so games give
+the same result on their own as together with others, and a season can be split
+in chunks of whole games that are processed in parallel:
+
+    chunks = [df for _, df in otb.groupby(otb['gameId'] % 8)]
+    with ProcessPoolExecutor() as executor:
+        result = pd.concat(executor.map(sequences.sequences, chunks), ignore_index = True)
+
+The dataframe of get_game_events (not normalized) can be passed as well; its
+events are flattened as by get_otb_data first.
+"""
+import numpy as np
+import pandas as pd
+
+KICKOFFS = ['FIRSTKICKOFF', 'SECONDKICKOFF', 'THIRDKICKOFF', 'FOURTHKICKOFF']
+
+# Events that stop play; SUB, ON and OFF happen while play is stopped and are left out
+_BREAKS = KICKOFFS + ['OUT', 'END']
+
+_COLUMNS = ['gameId', 'gameEventId', 'gameEventType', 'possessionEventId', 'possessionEventType', 'startTime', 'endTime', 'gameClock', 'teamId', 'outType',
+            'challengeEvent', 'ballCarryEvent']
+
+_SUMMARY_COLUMNS = ['teamId', 'start', 'end', 'startGameClock', 'endGameClock', 'duration', 'gameEvents', 'possessionEvents', 'challenges',
+                    'ballCarries', 'startReason', 'endReason', 'outType', 'startType', 'endType']
+
+_SEQUENCE_COLUMNS = ['gameId', 'period', 'sequence', 'possession'] + _SUMMARY_COLUMNS
+_POSSESSION_COLUMNS = ['gameId', 'period', 'possession', 'sequences'] + _SUMMARY_COLUMNS
+
+def _flat(df):
+    # The rows of get_game_events are game events with nested possession events, which are flattened as by get_otb_data
+    if 'possessionEventType' in df.columns or 'possessionEvents' not in df.columns:
+        return df
+    from .pff import _otb_frame
+    frames = []
+    for game_id, game in df.groupby('gameId', sort = False):
+        records = game.to_dict('records')
+        for record in records:
+            if not isinstance(record.get('possessionEvents'), list):
+                record['possessionEvents'] = None
+        frames.append(_otb_frame(game_id, records))
+    return pd.concat(frames, ignore_index = True) if frames else pd.DataFrame(columns = _COLUMNS)
+
+class _Play:
+    '''
+    The rows of the games in order, the rows that are in play, and where their
+    sequences and possessions start.
+    '''
+    def __init__(self, df):
+        events = df[[col for col in _COLUMNS if col in df.columns]].reset_index(drop = True)
+        for col in _COLUMNS:
+            if col not in events.columns:
+                events[col] = np.nan
+        game = pd.to_numeric(events['gameId']).to_numpy()
+        times = events['startTime'].to_numpy(float)
+        # The possession events of a game event share its startTime and are ordered by their ids
+        ids = [pd.to_numeric(events[col], errors = 'coerce').to_numpy(float, na_value = np.inf) for col in ['possessionEventId', 'gameEventId']]
+        # Concatenated results of get_otb_data are in order already, which is cheaper to check than to sort
+        order = np.lexsort(tuple(ids) + (np.where(np.isnan(times), np.inf, times), game))
+        if not (order == np.arange(len(order))).all():
+            events, game, times = events.take(order).reset_index(drop = True), game[order], times[order]
+        self.rows = order
+        self.events = events
+        n = len(events)
+
+        types = events['gameEventType'].to_numpy(object)
+        team = pd.to_numeric(events['teamId']).to_numpy(float)
+        is_break = np.isin(types, _BREAKS)
+        new_game = np.ones(n, dtype = bool)
+        new_game[1:] = game[1:] != game[:-1]
+        position = np.arange(n)
+
+        # Play stops at every break, the row that stopped it is found at the start of every stretch of play
+        stretch = np.cumsum(is_break | new_game)
+        stretch_start = np.maximum.accumulate(np.where(is_break | new_game, position, 0))
+        self.restart = np.where(is_break[stretch_start], types[stretch_start], None)
+        # The first break at or after every row, within its game
+        after = np.where(is_break, position, n)
+        after = np.minimum.accumulate(after[::-1])[::-1]
+        found = after < n
+        found[found] = game[after[found]] == game[found]
+        self.next_break = np.where(found, after, -1)
+
+        kickoff = pd.Series(np.isin(types, KICKOFFS)).groupby(game).cumsum().to_numpy()
+        period = np.maximum(kickoff, 1)
+
+        self.play = np.flatnonzero((types == 'OTB') & ~np.isnan(team) & ~np.isnan(times))
+        play = self.play
+        self.game, self.period, self.team, self.stretch = game[play], period[play], team[play], stretch[play]
+
+        # A sequence starts when the game, the stretch of play or the team changes, a possession when the game, the period or the team does
+        first = np.zeros(len(play), dtype = bool)
+        first[:1] = True
+        changed = lambda values: first | np.r_[False, values[1:] != values[:-1]]
+        same_team = ~changed(self.team)
+        self.new_game = changed(self.game)
+        self.new_stretch = changed(self.stretch)
+        self.new_sequence = self.new_game | self.new_stretch | ~same_team
+        self.new_possession = self.new_game | changed(self.period) | ~same_team
+
+    def numbers(self, starts):
+        # Running numbers from 1 within every game
+        number = np.cumsum(starts)
+        game_first = np.maximum.accumulate(np.where(self.new_game, np.arange(len(starts)), 0))
+        return number - number[game_first] + 1 if len(starts) else number
+
+    def summary(self, starts):
+        events, play = self.events, self.play
+        begin = np.flatnonzero(starts)
+        if not len(begin):
+            return pd.DataFrame(columns = ['gameId', 'period'] + _SUMMARY_COLUMNS)
+        last = np.r_[begin[1:], len(play)] - 1
+        first_row, last_row = play[begin], play[last]
+
+        start_time = events['startTime'].to_numpy(float)[play]
+        end_time = np.fmax(np.fmax.reduceat(events['endTime'].to_numpy(float)[play], begin), np.fmax.reduceat(start_time, begin))
+        clock = events['gameClock'].to_numpy(float)
+        possession_types = events['possessionEventType'].to_numpy(object)
+        event_ids = events['gameEventId'].to_numpy(object)[play]
+        new_event = starts | np.r_[True, event_ids[1:] != event_ids[:-1]]
+        flag = lambda col: new_event & events[col].eq(True).fillna(False).to_numpy(bool)[play]
+
+        # How every run started: after a break, or taking the ball from the other team within a stretch of play
+        restart = self.restart[first_row]
+        after_break = np.where(np.isin(restart, KICKOFFS), 'KICKOFF', np.where(restart == None, 'START', 'STOPPAGE'))
+        taken = np.where(flag('challengeEvent')[begin], 'CHALLENGE', 'TURNOVER')
+        start_reason = np.where(self.new_stretch[begin] | self.new_game[begin], after_break, taken)
+
+        # How every run ended: the other team took the ball within the stretch of play, or play stopped
+        following = np.r_[begin[1:], len(play)]
+        has_next = following < len(play)
+        next_index = np.minimum(following, len(play) - 1)
+        turnover = has_next & ~self.new_game[next_index] & ~self.new_stretch[next_index]
+        next_break = self.next_break[last_row]
+        break_type = np.where(next_break >= 0, events['gameEventType'].to_numpy(object)[next_break], None)
+        stopped = break_type == 'OUT'
+        end_reason = np.where(turnover, 'TURNOVER', np.where(stopped, 'STOPPAGE', 'END'))
+        out_type = np.where(stopped & ~turnover, events['outType'].to_numpy(object)[next_break], None)
+
+        result = pd.DataFrame({'gameId': self.game[begin].astype('int64'), 'period': self.period[begin].astype('int64'),
+                               'teamId': self.team[begin].astype('int64'), 'start': start_time[begin], 'end': end_time,
+                               'startGameClock': clock[first_row],
+                               'endGameClock': clock[last_row] + end_time - start_time[last],
+                               'duration': end_time - start_time[begin],
+                               'gameEvents': np.add.reduceat(new_event.astype('int64'), begin),
+                               'possessionEvents': np.add.reduceat(pd.notna(possession_types[play]).astype('int64'), begin),
+                               'challenges': np.add.reduceat(flag('challengeEvent').astype('int64'), begin),
+                               'ballCarries': np.add.reduceat(flag('ballCarryEvent').astype('int64'), begin),
+                               'startReason': start_reason.astype(object), 'endReason': end_reason.astype(object), 'outType': out_type,
+                               'startType': possession_types[first_row], 'endType': possession_types[last_row]})
+        return result
+
+def assign(df):
+    '''
+    Numbers the sequence and possession of every event.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data or get_game_events, or several of them concatenated
+
+
+    Returns
+    ---------
+
+    df: the rows of df in the same order, with the columns sequence and possession added, numbered
+    from 1 within every game. Rows that are not in play, i.e. kickoffs, OUT, SUB and END events,
+    have <NA>. Rows of get_game_events get the sequence and possession of their first possession event
+
+    '''
+    flat = _flat(df)
+    play = _Play(flat)
+    rows = play.rows[play.play]
+    result = df.copy()
+    for name, starts in [('sequence', play.new_sequence), ('possession', play.new_possession)]:
+        values = np.zeros(len(flat), dtype = 'int64')
+        values[rows] = play.numbers(starts)
+        mask = np.ones(len(flat), dtype = bool)
+        mask[rows] = False
+        column = pd.arrays.IntegerArray(values, mask)
+        if flat is not df:
+            # Back from the flattened possession events to the game events
+            first = pd.Series(column, index = flat['gameEventId'].to_numpy()).dropna()
+            column = pd.to_numeric(df['id']).map(first[~first.index.duplicated()]).astype('Int64').array
+        result[name] = column
+    return result
+
+def sequences(df):
+    '''
+    Finds the sequences of play of every game.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data or get_game_events, or several of them concatenated
+
+
+    Returns
+    ---------
+
+    df: a dataframe with a row per sequence and the columns gameId, period, sequence, possession,
+    teamId, start and end (startTime), startGameClock, endGameClock, duration in seconds, the
+    number of gameEvents and possessionEvents, and of game events with a challenge or a ball carry,
+    startReason ('KICKOFF', 'STOPPAGE', 'TURNOVER', 'CHALLENGE' when the ball was won in a
+    challenge, or 'START' when the data starts in play), endReason ('TURNOVER', 'STOPPAGE' or
+    'END'), outType of the OUT event that stopped play, and the possessionEventType of the first
+    and the last event as startType and endType
+
+    '''
+    play = _Play(_flat(df))
+    result = play.summary(play.new_sequence)
+    result.insert(2, 'sequence', play.numbers(play.new_sequence)[play.new_sequence])
+    result.insert(3, 'possession', play.numbers(play.new_possession)[play.new_sequence])
+    return result[_SEQUENCE_COLUMNS]
+
+def possessions(df):
+    '''
+    Finds the possessions of every game.
+
+    Parameters
+    -----------
+
+    df: a dataframe as returned by get_otb_data or get_game_events, or several of them concatenated
+
+
+    Returns
+    ---------
+
+    df: a dataframe with a row per possession and the columns of sequences(), with the number of
+    sequences instead of the sequence. A possession ends with 'STOPPAGE' when the other team
+    restarts play after it
+
+    '''
+    play = _Play(_flat(df))
+    result = play.summary(play.new_possession)
+    result.insert(2, 'possession', play.numbers(play.new_possession)[play.new_possession])
+    begin = np.flatnonzero(play.new_possession)
+    result.insert(3, 'sequences', np.add.reduceat(play.new_sequence.astype('int64'), begin) if len(begin) else [])
+    return result[_POSSESSION_COLUMNS]
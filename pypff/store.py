@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A local store of game events and On-The-Ball data, indexed for filtered queries.
+
+Results of get_game_events_games and get_otb_data are added to a single SQLite
+file. Every game event is kept as its compressed JSON, next to the columns that
+queries filter on: game, team, player, gameEventType, the possessionEventTypes of
+its possession events and gameClock. On-The-Ball rows are flat and kept as they
+are. Those columns are indexed, so a question such as all shots of a player in
+a season reads the matching events only, instead of scanning every game:
+
+    store = EventStore('~/pff/events.sqlite')
+    store.add_game_events(pff.get_game_events_games(url, key, games), competition_id, season)
+    shots = store.game_events(player_id = 1000, possession_event_type = 'SH', season = season)
+
+Queries return the same dataframes as the API functions, for the events that match.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from . import pff
+from .lazy import LazyModule
+from .stream import loads
+
+pd = LazyModule('pandas')
+
+# The columns of the On-The-Ball table, as returned by get_otb_data
+OTB_COLUMNS = pff._OTB_COLUMNS
+_OTB_IDS = ['gameId', 'gameEventId', 'possessionEventId', 'teamId', 'playerId', 'playerOnId', 'playerOffId']
+_OTB_FLAGS = ['challengeEvent', 'ballCarryEvent']
+_OTB_REAL = ['gameClock', 'startTime', 'endTime', 'duration']
+# Columns that get_otb_data fills with np.where, which leaves them objects
+_OTB_OBJECTS = ['offType', 'playerOnName', 'playerOffName']
+
+_SCHEMA = ['''CREATE TABLE IF NOT EXISTS games (
+                  game_id INTEGER PRIMARY KEY,
+                  competition_id INTEGER,
+                  season TEXT,
+                  updated REAL)''',
+           '''CREATE TABLE IF NOT EXISTS game_events (
+                  id TEXT PRIMARY KEY,
+                  game_id INTEGER,
+                  team_id INTEGER,
+                  player_id INTEGER,
+                  game_event_type TEXT,
+                  game_clock REAL,
+                  start_time REAL,
+                  data BLOB)''',
+           '''CREATE TABLE IF NOT EXISTS possession_events (
+                  id TEXT PRIMARY KEY,
+                  game_event_id TEXT,
+                  game_id INTEGER,
+                  possession_event_type TEXT)''',
+           'CREATE TABLE IF NOT EXISTS otb_data (' + ', '.join('"%s" %s' % (col, 'INTEGER' if col in _OTB_IDS + _OTB_FLAGS else 'REAL' if col in _OTB_REAL else 'TEXT')
+                                                              for col in OTB_COLUMNS) + ')',
+           'CREATE INDEX IF NOT EXISTS games_season ON games (competition_id, season)',
+           'CREATE INDEX IF NOT EXISTS game_events_game ON game_events (game_id, start_time)',
+           'CREATE INDEX IF NOT EXISTS game_events_team ON game_events (team_id, game_event_type)',
+           'CREATE INDEX IF NOT EXISTS game_events_player ON game_events (player_id, game_event_type)',
+           'CREATE INDEX IF NOT EXISTS game_events_type ON game_events (game_event_type, game_clock)',
+           'CREATE INDEX IF NOT EXISTS game_events_clock ON game_events (game_clock)',
+           'CREATE INDEX IF NOT EXISTS possession_events_type ON possession_events (possession_event_type, game_id)',
+           'CREATE INDEX IF NOT EXISTS possession_events_game_event ON possession_events (game_event_id)',
+           'CREATE INDEX IF NOT EXISTS possession_events_game ON possession_events (game_id)',
+           'CREATE INDEX IF NOT EXISTS otb_data_game ON otb_data ("gameId", "startTime")',
+           'CREATE INDEX IF NOT EXISTS otb_data_team ON otb_data ("teamId", "possessionEventType")',
+           'CREATE INDEX IF NOT EXISTS otb_data_player ON otb_data ("playerId", "possessionEventType")',
+           'CREATE INDEX IF NOT EXISTS otb_data_type ON otb_data ("possessionEventType", "gameClock")',
+           'CREATE INDEX IF NOT EXISTS otb_data_game_event_type ON otb_data ("gameEventType")',
+           'CREATE INDEX IF NOT EXISTS otb_data_clock ON otb_data ("gameClock")']
+
+# The columns that the filters of the queries use, per table
+_FILTER_COLUMNS = {
+    'game_events': {'game_id': 'game_id', 'team_id': 'team_id', 'player_id': 'player_id', 'game_event_type': 'game_event_type',
+                    'game_clock': 'game_clock'},
+    'otb_data': {'game_id': '"gameId"', 'team_id': '"teamId"', 'player_id': '"playerId"', 'game_event_type': '"gameEventType"',
+                 'possession_event_type': '"possessionEventType"', 'game_clock': '"gameClock"'},
+}
+_GAME_COLUMNS = {'game_events': 'game_id', 'otb_data': '"gameId"'}
+
+def _id(value):
+    # Ids are strings in the API and integers in the dataframes, they are stored as integers where they can be
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _ref(value, field = 'id'):
+    return value.get(field) if isinstance(value, dict) else None
+
+def _plain(value):
+    # NaN, None and pd.NA of a dataframe are the null of the API, numpy scalars become Python values
+    if value is None or isinstance(value, (str, bool, dict, list)):
+        return value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        return value
+    return value.item() if hasattr(value, 'item') else value
+
+def _values(value):
+    # A single value or any iterable of values, i.e. a list or a column of a dataframe
+    if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+        return [value]
+    return list(value)
+
+def _events_by_game(game_events):
+    # The game events of every game as dictionaries without gameId, as the API returns them
+    if isinstance(game_events, dict):
+        if any(hasattr(value, 'columns') for value in game_events.values()):
+            raise ValueError('normalized tables cannot be stored, add the result of get_game_events_games without normalize')
+        return {game_id: list(events) for game_id, events in game_events.items()}
+    if hasattr(game_events, 'columns'):
+        if 'gameId' not in game_events.columns:
+            raise ValueError('the game events have no gameId column')
+        game_events = game_events.to_dict('records')
+    games = {}
+    for record in game_events:
+        event = {name: _plain(value) for name, value in record.items()}
+        games.setdefault(event.pop('gameId'), []).append(event)
+    return games
+
+class EventStore:
+    '''
+    A local SQLite store of game events and On-The-Ball data, with indexes on game,
+    team, player, event type and game clock.
+
+    Adding a game replaces what was stored for it before. Add results as returned
+    by the API, not compacted: float32 clocks are stored with their rounding.
+
+    Parameters
+    -----------
+
+    path: a string with the location of the store file, defaults to '~/.cache/pypff/events.sqlite'
+    compression_level: an integer between 1 and 9 passed to zlib for the JSON of the game events, defaults to 6
+
+    '''
+    def __init__(self, path = None, compression_level = 6):
+        if path is None:
+            path = os.path.join('~', '.cache', 'pypff', 'events.sqlite')
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout = 30, check_same_thread = False)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def _add_games(self, game_ids, competition_id, season):
+        # Games keep the competition and season they were added with, unless new ones are given
+        now = time.time()
+        self._conn.executemany('''INSERT INTO games VALUES (?, ?, ?, ?)
+                                  ON CONFLICT (game_id) DO UPDATE SET competition_id = COALESCE(excluded.competition_id, competition_id),
+                                  season = COALESCE(excluded.season, season), updated = excluded.updated''',
+                               [(game_id, _id(competition_id), None if season is None else str(season), now) for game_id in game_ids])
+
+    def add_game_events(self, game_events, competition_id = None, season = None):
+        '''
+        Adds game events to the store, replacing the events stored for the same games.
+
+        Parameters
+        -----------
+
+        game_events: a dataframe as returned by get_game_events or get_game_events_games, their records
+        (return_type = 'records'), or a dictionary of game id to its list of game events, as returned
+        by get_game_events_games with return_type = 'raw'
+        competition_id: an integer with the competition of the games, defaults to None (unknown, or as stored before)
+        season: a string with the season of the games, defaults to None (unknown, or as stored before)
+
+
+        Returns
+        ---------
+
+        count: an integer with the number of game events added
+
+        '''
+        events_rows, possession_rows = [], []
+        games = _events_by_game(game_events)
+        for game_id, events in games.items():
+            game_id = _id(game_id)
+            for event in events:
+                event_id = str(event['id'])
+                data = zlib.compress(json.dumps(event, separators = (',', ':')).encode('utf-8'), self.compression_level)
+                events_rows.append((event_id, game_id, _id(_ref(event.get('team'))), _id(_ref(event.get('player'))), event.get('gameEventType'),
+                                    event.get('gameClock'), event.get('startTime'), sqlite3.Binary(data)))
+                for possession_event in event.get('possessionEvents') or []:
+                    if isinstance(possession_event, dict) and possession_event.get('id') is not None:
+                        possession_rows.append((str(possession_event['id']), event_id, game_id, possession_event.get('possessionEventType')))
+
+        game_ids = [(_id(game_id),) for game_id in games]
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM game_events WHERE game_id = ?', game_ids)
+            self._conn.executemany('DELETE FROM possession_events WHERE game_id = ?', game_ids)
+            self._add_games([game_id for game_id, in game_ids], competition_id, season)
+            self._conn.executemany('INSERT OR REPLACE INTO game_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)', events_rows)
+            self._conn.executemany('INSERT OR REPLACE INTO possession_events VALUES (?, ?, ?, ?)', possession_rows)
+        return len(events_rows)
+
+    def add_otb_data(self, df, competition_id = None, season = None):
+        '''
+        Adds On-The-Ball data to the store, replacing the rows stored for the same games.
+
+        Parameters
+        -----------
+
+        df: a dataframe as returned by get_otb_data, or several of them concatenated
+        competition_id, season: see add_game_events
+
+
+        Returns
+        ---------
+
+        count: an integer with the number of rows added
+
+        '''
+        if 'gameId' not in df.columns:
+            raise ValueError('the On-The-Ball data has no gameId column')
+        columns = [col for col in OTB_COLUMNS if col in df.columns]
+        rows = [tuple(_plain(value) for value in row) for row in df[columns].itertuples(index = False, name = None)]
+        game_ids = [(_id(game_id),) for game_id in dict.fromkeys(df['gameId'].tolist())]
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM otb_data WHERE "gameId" = ?', game_ids)
+            self._add_games([game_id for game_id, in game_ids], competition_id, season)
+            self._conn.executemany('INSERT INTO otb_data (%s) VALUES (%s)' % (', '.join('"%s"' % col for col in columns), ', '.join('?' * len(columns))),
+                                   rows)
+        return len(rows)
+
+    def _where(self, table, competition_id = None, season = None, game_id = None, team_id = None, player_id = None, game_event_type = None,
+               possession_event_type = None, game_clock = None):
+        # The WHERE clause and its parameters for the filters of a query, each one a single value or a list of values
+        columns = _FILTER_COLUMNS[table]
+        clauses, params = [], []
+
+        def condition(column, values):
+            clauses.append('%s IN (%s)' % (column, ', '.join('?' * len(values))))
+            params.extend(values)
+
+        for name, value in (('game_id', game_id), ('team_id', team_id), ('player_id', player_id)):
+            if value is not None:
+                condition(columns[name], [_id(i) for i in _values(value)])
+        if game_event_type is not None:
+            condition(columns['game_event_type'], _values(game_event_type))
+        if possession_event_type is not None:
+            if table == 'game_events':
+                # Game events that have a possession event of the type
+                values = _values(possession_event_type)
+                clauses.append('id IN (SELECT game_event_id FROM possession_events WHERE possession_event_type IN (%s))' % ', '.join('?' * len(values)))
+                params.extend(values)
+            else:
+                condition(columns['possession_event_type'], _values(possession_event_type))
+        if competition_id is not None or season is not None:
+            games, games_params = [], []
+            if competition_id is not None:
+                values = [_id(i) for i in _values(competition_id)]
+                games.append('competition_id IN (%s)' % ', '.join('?' * len(values)))
+                games_params.extend(values)
+            if season is not None:
+                values = [str(value) for value in _values(season)]
+                games.append('season IN (%s)' % ', '.join('?' * len(values)))
+                games_params.extend(values)
+            clauses.append('%s IN (SELECT game_id FROM games WHERE %s)' % (_GAME_COLUMNS[table], ' AND '.join(games)))
+            params.extend(games_params)
+        if game_clock is not None:
+            start, end = game_clock
+            if start is not None:
+                clauses.append(columns['game_clock'] + ' >= ?')
+                params.append(float(start))
+            if end is not None:
+                clauses.append(columns['game_clock'] + ' <= ?')
+                params.append(float(end))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def game_events(self, competition_id = None, season = None, game_id = None, team_id = None, player_id = None, game_event_type = None,
+                    possession_event_type = None, game_clock = None, normalize = False, pack_freeze_frames = False, return_type = 'frame',
+                    compact = False):
+        '''
+        Returns the stored game events that match all of the filters. Every filter is a single
+        value or a list of values, i.e. game_event_type = ['OTB', 'OUT'].
+
+        Parameters
+        -----------
+
+        competition_id: an integer with the competition of the games, as given to add_game_events
+        season: a string with the season of the games, as given to add_game_events
+        game_id: an integer with the game of the events
+        team_id: an integer with the team of the events
+        player_id: an integer with the player of the events, the player on the ball
+        game_event_type: a string with the gameEventType of the events, i.e. 'OTB'
+        possession_event_type: a string with a possessionEventType, i.e. 'SH', the game events
+        that have a possession event of that type are returned with all their possession events
+        game_clock: a (from, to) tuple of gameClock seconds, either may be None, defaults to None (all)
+        normalize, pack_freeze_frames, return_type, compact: see get_game_events_games
+
+
+        Returns
+        ---------
+
+        df: a dataframe as returned by get_game_events_games for the events that match, games
+        ordered by id, or its tables, freeze frames or records, see the parameters
+
+        '''
+        pff._check_pack_freeze_frames(normalize, pack_freeze_frames)
+        pff._check_return_type(return_type, normalize, pack_freeze_frames, compact)
+        where, params = self._where('game_events', competition_id, season, game_id, team_id, player_id, game_event_type,
+                                    possession_event_type, game_clock)
+        with self._lock:
+            rows = self._conn.execute('SELECT game_id, data FROM game_events' + where + ' ORDER BY game_id, rowid', params).fetchall()
+
+        games = {}
+        for game_id, data in rows:
+            games.setdefault(game_id, []).append(zlib.decompress(data))
+        # One document per game decodes faster than one per event
+        results = {game_id: pff._game_events_frame(game_id, loads(b'[' + b','.join(events) + b']'), normalize, pack_freeze_frames, return_type,
+                                                   compact)
+                   for game_id, events in games.items()}
+        return pff._game_events_games_result(list(games), results, {}, normalize, pack_freeze_frames, return_type, compact)
+
+    def otb_data(self, competition_id = None, season = None, game_id = None, team_id = None, player_id = None, game_event_type = None,
+                 possession_event_type = None, game_clock = None, compact = False):
+        '''
+        Returns the stored On-The-Ball rows that match all of the filters, see game_events.
+        possession_event_type filters on the possessionEventType of every row.
+
+        Returns
+        ---------
+
+        df: a dataframe as returned by get_otb_data for the rows that match, games ordered by id
+
+        '''
+        where, params = self._where('otb_data', competition_id, season, game_id, team_id, player_id, game_event_type,
+                                    possession_event_type, game_clock)
+        with self._lock:
+            df = pd.read_sql_query('SELECT %s FROM otb_data%s ORDER BY "gameId", rowid' % (', '.join('"%s"' % col for col in OTB_COLUMNS), where),
+                                   self._conn, params = params)
+
+        # The dtypes of get_otb_data
+        for col in _OTB_IDS:
+            try:
+                df[col] = df[col].astype(int)
+            except (TypeError, ValueError):
+                df[col] = df[col].astype('Int64')
+        for col in _OTB_FLAGS:
+            df[col] = df[col].map({1: True, 0: False})
+        df = df.infer_objects()
+        for col in _OTB_OBJECTS:
+            df[col] = df[col].astype(object).where(df[col].notna(), float('nan'))
+        return pff._compact(df) if compact else df
+
+    def games(self):
+        '''
+        Returns a dataframe of the stored games with their competitionId, season, the number of
+        gameEvents and otbData rows, and the time they were last updated.
+        '''
+        with self._lock:
+            df = pd.read_sql_query('''SELECT game_id AS gameId, competition_id AS competitionId, season,
+                                      (SELECT COUNT(*) FROM game_events WHERE game_events.game_id = games.game_id) AS gameEvents,
+                                      (SELECT COUNT(*) FROM otb_data WHERE otb_data."gameId" = games.game_id) AS otbData,
+                                      updated FROM games ORDER BY game_id''', self._conn)
+        df['updated'] = pd.to_datetime(df['updated'], unit = 's')
+        return df
+
+    def missing(self, game_ids, kind = 'game_events'):
+        '''
+        Returns the games of game_ids that have no stored data of a kind, to only fetch those.
+
+        Parameters
+        -----------
+
+        game_ids: a list of integers with the ids of the games
+        kind: a string, 'game_events' or 'otb_data', defaults to 'game_events'
+
+        '''
+        if kind not in _GAME_COLUMNS:
+            raise ValueError("kind must be 'game_events' or 'otb_data', not " + repr(kind))
+        with self._lock:
+            stored = {game_id for game_id, in self._conn.execute('SELECT DISTINCT %s FROM %s' % (_GAME_COLUMNS[kind], kind))}
+        return [game_id for game_id in game_ids if _id(game_id) not in stored]
+
+    def remove(self, game_ids):
+        '''
+        Removes games and all their data from the store.
+
+        Returns
+        ---------
+
+        removed: an integer with the number of game events and On-The-Ball rows removed
+
+        '''
+        game_ids = [(_id(game_id),) for game_id in _values(game_ids)]
+        with self._lock, self._conn:
+            removed = sum(self._conn.execute('DELETE FROM game_events WHERE game_id = ?', game_id).rowcount +
+                          self._conn.execute('DELETE FROM otb_data WHERE "gameId" = ?', game_id).rowcount for game_id in game_ids)
+            self._conn.executemany('DELETE FROM possession_events WHERE game_id = ?', game_ids)
+            self._conn.executemany('DELETE FROM games WHERE game_id = ?', game_ids)
+        return removed
+
+    def query_plan(self, kind = 'game_events', **filters):
+        '''
+        Returns how SQLite answers a query, as a list of strings, i.e. to check that the
+        filters of store.query_plan(player_id = 1000, possession_event_type = 'SH') use an index.
+        '''
+        if kind not in _GAME_COLUMNS:
+            raise ValueError("kind must be 'game_events' or 'otb_data', not " + repr(kind))
+        where, params = self._where(kind, **filters)
+        with self._lock:
+            rows = self._conn.execute('EXPLAIN QUERY PLAN SELECT * FROM %s%s' % (kind, where), params).fetchall()
+        return [row[-1] for row in rows]
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of games, game events, possession events and
+        On-The-Ball rows, and the size of the store in bytes.
+        '''
+        with self._lock:
+            counts = {table: self._conn.execute('SELECT COUNT(*) FROM ' + table).fetchone()[0]
+                      for table in ('games', 'game_events', 'possession_events', 'otb_data')}
+        counts['bytes'] = sum(os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path))
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON decoding helpers for API responses.
+
+loads() decodes a full response with orjson when it is installed and falls back
+to the standard library otherwise. iter_array() decodes the items of one array
+in a response while the body is still being downloaded, so the full response
+never has to be held in memory as bytes, text and Python objects at once.
+"""
+import codecs
+import json
+import re
+import time
+
+from . import instrument
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_MIN_REFILL = 65536
+_SEPARATORS = re.compile(r'[\s,]*')
+_BEFORE_VALUE = re.compile(r'\s*:\s*')
+
+def loads(content):
+    '''
+    Decodes a JSON document given as bytes or str.
+    '''
+    start = time.perf_counter()
+    value = orjson.loads(content) if orjson is not None else json.loads(content)
+    instrument.record(parse = time.perf_counter() - start)
+    return value
+
+def iter_array(chunks, key, batch_size = 500):
+    '''
+    Decodes the items of the first array stored under key, i.e. 'gameEvents',
+    from a JSON document that arrives in chunks.
+
+    Parameters
+    -----------
+
+    chunks: an iterable of bytes, i.e. response.iter_content()
+    key: a string with the name of the member that holds the array
+    batch_size: an integer with the number of items per batch
+
+
+    Returns
+    ---------
+
+    batches: a generator of lists of decoded items
+
+    '''
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    marker = '"' + key + '"'
+    buffer = ''
+    pos = 0
+    parse = 0.0
+
+    def fill(min_bytes = 1):
+        # Drops the consumed part of the buffer and appends at least min_bytes of the next chunks
+        nonlocal buffer, pos
+        pieces, size = [], 0
+        for chunk in chunks:
+            pieces.append(text.decode(chunk))
+            size += len(chunk)
+            if size >= min_bytes:
+                break
+        if not size:
+            return False
+        buffer = buffer[pos:] + ''.join(pieces)
+        pos = 0
+        return True
+
+    # Find the start of the array
+    while True:
+        found = buffer.find(marker, pos)
+        if found >= 0:
+            value = _BEFORE_VALUE.match(buffer, found + len(marker))
+            if value is not None and value.end() < len(buffer):
+                pos = value.end()
+                break
+            if value is None and buffer[found + len(marker):].strip():
+                # The same text inside a string value, not the member itself
+                pos = found + 1
+                continue
+            pos = found
+        else:
+            pos = max(pos, len(buffer) - len(marker))
+        if not fill():
+            raise ValueError(key + ' not found in response: ' + buffer[:500])
+
+    # Enough of the value to tell null from an array, a null split over two chunks included
+    while len(buffer) - pos < len('null') and fill():
+        pass
+    if buffer.startswith('null', pos):
+        return
+    if buffer[pos] != '[':
+        raise ValueError(key + ' is not an array in response')
+    pos += 1
+
+    batch = []
+    while True:
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError('response ended inside ' + key)
+            continue
+        if buffer[pos] == ']':
+            break
+        start = time.perf_counter()
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            parse += time.perf_counter() - start
+            # The item is incomplete, wait for enough data to make decoding it again worthwhile
+            if not fill(max(_MIN_REFILL, len(buffer) - pos)):
+                raise
+            continue
+        parse += time.perf_counter() - start
+        if end == len(buffer) and not isinstance(item, (dict, list, str)) and fill():
+            # A number or literal that ends with the buffer may go on in the next chunk
+            continue
+        batch.append(item)
+        pos = end
+        if len(batch) >= batch_size:
+            instrument.record(parse = parse)
+            parse = 0.0
+            yield batch
+            batch = []
+    instrument.record(parse = parse)
+    if batch:
+        yield batch
+
+    # Read the rest of the body, so the connection can be reused
+    for _ in chunks:
+        pass
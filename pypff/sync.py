@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keeps a local copy of the game events of a competition up to date.
+
+A manifest records, per competition and season, which games have been pulled
+and what the games listing said about them at the time. A sync only fetches
+the games that are new, changed since the last sync, or not yet complete, and
+stores every game in its own file next to the manifest.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+
+from . import queries
+from .pff import _get_client
+from .queries import build_query
+from .stream import loads
+
+MANIFEST = 'manifest.json'
+
+# The fields of the games listing that decide whether a game is fetched again
+LISTING_FIELDS = ['games.id', 'games.date', 'games.season', 'games.startPeriod1', 'games.endPeriod2']
+
+class SeasonSync:
+    '''
+    Syncs the game events of competitions to a directory.
+
+    Parameters
+    -----------
+
+    client: a pff.PFFClient to retrieve the data with
+    directory: a string with the directory that holds the manifest and the games
+    settle_days: a float with the number of days after kick-off during which a game that has
+    ended is still fetched again, as its events are reviewed after the game. Defaults to 2
+    max_workers, requests_per_second, batch_size, fields, exclude: passed on to get_game_events_games
+
+    '''
+    def __init__(self, client, directory, settle_days = 2, max_workers = 1, requests_per_second = None, batch_size = 1,
+                 fields = None, exclude = None):
+        self.client = client
+        self.directory = os.path.expanduser(directory)
+        self.settle_days = settle_days
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.batch_size = batch_size
+        self.fields = fields
+        self.exclude = exclude
+        os.makedirs(self.directory, exist_ok = True)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding = 'utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        # Write to a temporary file first, so an interrupted sync never leaves a broken manifest
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w', encoding = 'utf-8') as f:
+            json.dump(self.manifest, f, indent = 1, sort_keys = True)
+        os.replace(path + '.tmp', path)
+
+    def _path(self, competition_id, season, game_id):
+        return os.path.join(self.directory, str(competition_id), str(season), str(game_id) + '.pkl.gz')
+
+    def listing(self, competition_id):
+        '''
+        Retrieves the id, date, season and status of all games of a competition.
+        The listing is never taken from the cache, as it is what tells a sync what changed.
+        '''
+        payload = build_query('competition', queries.GAMES, {'id': ('ID!', competition_id)}, LISTING_FIELDS)
+        response = self.client._post(payload)
+        try:
+            games = loads(response.content)['data']['competition']['games']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError('games of competition ' + str(competition_id) + ' could not be retrieved: ' + response.text[:500])
+        df = pd.DataFrame(games, columns = [field.split('.')[-1] for field in LISTING_FIELDS])
+        # Missing periods come back as NaN, which is not valid JSON in the manifest and never equals itself
+        for column in ['startPeriod1', 'endPeriod2']:
+            df[column] = df[column].astype(object).where(df[column].notna(), None)
+        return df
+
+    def _status(self, game, now):
+        # 'scheduled' games have not been played, 'complete' games will not change anymore
+        date = pd.to_datetime(game['date'], errors = 'coerce', utc = True)
+        if pd.isna(date) or date > now:
+            return 'scheduled'
+        if not pd.isna(game['endPeriod2']) and now - date > pd.Timedelta(days = self.settle_days):
+            return 'complete'
+        return 'incomplete'
+
+    def plan(self, competition_id, season = None):
+        '''
+        Compares the games listing with the manifest, without fetching any games.
+
+        Parameters
+        -----------
+
+        competition_id: an integer to select the competition
+        season: a string to select the season, defaults to None (all seasons)
+
+
+        Returns
+        ---------
+
+        df: a dataframe with the id, date, season and status of every game and the action
+        of the next sync: 'new', 'changed' or 'incomplete' games are fetched, 'up to date'
+        and 'scheduled' games are not
+
+        '''
+        df = self.listing(competition_id)
+        if season is not None:
+            df = df[df['season'].astype(str) == str(season)].reset_index(drop = True)
+        now = pd.Timestamp.now(tz = 'UTC')
+
+        statuses, actions = [], []
+        for game in df.to_dict(orient = 'records'):
+            status = self._status(game, now)
+            entry = self.manifest.get(_key(competition_id, game['season']), {}).get(str(game['id']))
+            if status == 'scheduled':
+                action = 'scheduled'
+            elif entry is None:
+                action = 'new'
+            elif not _same(entry['date'], game['date']) or not _same(entry['endPeriod2'], game['endPeriod2']):
+                action = 'changed'
+            elif entry['status'] != 'complete':
+                action = 'incomplete'
+            else:
+                action = 'up to date'
+            statuses.append(status)
+            actions.append(action)
+        df['status'] = statuses
+        df['action'] = actions
+        return df
+
+    def sync(self, competition_id, season = None):
+        '''
+        Fetches the games of a competition that are new, changed or not yet complete,
+        stores them and updates the manifest.
+
+        Parameters
+        -----------
+
+        competition_id: an integer to select the competition
+        season: a string to select the season, defaults to None (all seasons)
+
+
+        Returns
+        ---------
+
+        summary: a dictionary with the lists of game ids that were 'fetched' and 'skipped',
+        and a dictionary of game id to error message for the games that 'failed'
+
+        '''
+        df = self.plan(competition_id, season)
+        todo = df[df['action'].isin(['new', 'changed', 'incomplete'])]
+        summary = {'fetched': [], 'skipped': [int(i) for i in df.loc[~df.index.isin(todo.index), 'id']], 'failed': {}}
+        if not len(todo):
+            return summary
+
+        games = {int(game['id']): game for game in todo.to_dict(orient = 'records')}
+        # A game cached before it was complete would be answered from the cache again
+        caches = [cache for cache in (self.client.cache, self.client.memory_cache) if cache is not None]
+        for game_id in games:
+            for cache in caches:
+                cache.invalidate('game_events', id = game_id)
+        events, failures = self.client.get_game_events_games(list(games), max_workers = self.max_workers, requests_per_second = self.requests_per_second,
+                                                             return_failures = True, fields = self.fields, exclude = self.exclude, batch_size = self.batch_size)
+        summary['failed'] = failures
+        parts = dict(tuple(events.groupby('gameId', sort = False))) if len(events) else {}
+
+        for game_id, game in games.items():
+            if game_id in failures:
+                continue
+            part = parts.get(game_id, pd.DataFrame()).reset_index(drop = True)
+            path = self._path(competition_id, game['season'], game_id)
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            part.to_pickle(path)
+            self.manifest.setdefault(_key(competition_id, game['season']), {})[str(game_id)] = {
+                'date': game['date'], 'endPeriod2': game['endPeriod2'], 'status': game['status'],
+                'rows': len(part), 'fetched': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+            summary['fetched'].append(game_id)
+            if game['status'] == 'complete':
+                for cache in caches:
+                    cache.keep(game_id)
+        self._write_manifest()
+        return summary
+
+    def load(self, competition_id, season = None, game_ids = None):
+        '''
+        Loads the stored game events of a competition.
+
+        Parameters
+        -----------
+
+        competition_id: an integer to select the competition
+        season: a string to select the season, defaults to None (all seasons)
+        game_ids: a list of integers to select the games, defaults to None (all games)
+
+
+        Returns
+        ---------
+
+        df: a dataframe containing the events, as returned by get_game_events_games
+
+        '''
+        df_list = []
+        for key, games in sorted(self.manifest.items()):
+            stored_competition, stored_season = key.split('/', 1)
+            if stored_competition != str(competition_id) or (season is not None and stored_season != str(season)):
+                continue
+            for game_id in games:
+                if game_ids is None or int(game_id) in game_ids:
+                    df_list.append(pd.read_pickle(self._path(competition_id, stored_season, game_id)))
+        if not df_list:
+            return pd.DataFrame()
+        return pd.concat(df_list, ignore_index = True).infer_objects()
+
+def _key(competition_id, season):
+    return str(competition_id) + '/' + str(season)
+
+def _same(stored, listed):
+    # Manifests written before missing periods were stored as null may hold NaN
+    if pd.isna(stored) and pd.isna(listed):
+        return True
+    return stored == listed
+
+def sync_season(url, key, directory, competition_id, season = None, **kwargs):
+    '''
+    Fetches the games of a competition that are new, changed or not yet complete
+    to a local directory, see SeasonSync.
+
+    Parameters
+    -----------
+
+    url: a string that points toward the API, i.e. 'https://faraday.pff.com/api'
+    key: a string that serves as the API key
+    directory: a string with the directory that holds the manifest and the games
+    competition_id: an integer to select the competition
+    season: a string to select the season, defaults to None (all seasons)
+    kwargs: passed on to SeasonSync, i.e. max_workers = 8
+
+
+    Returns
+    ---------
+
+    summary: a dictionary with the lists of game ids that were 'fetched' and 'skipped',
+    and a dictionary of game id to error message for the games that 'failed'
+
+    '''
+    return SeasonSync(_get_client(url, key), directory, **kwargs).sync(competition_id, season)
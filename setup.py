@@ -16,5 +16,6 @@ setup(name='PyPFF',
       packages=find_packages(),
       py_modules=['pff','normalize'],
       install_requires=['pandas','requests','pyhumps'],
+      extras_require={'fast': ['orjson'], 'parquet': ['pyarrow'], 'async': ['aiohttp']},
       package_data = {'': ['*.pickle']},
      )
\ No newline at end of file
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of pypff.sync against a client with a fixed games listing.
+"""
+import json
+import os
+
+import pandas as pd
+
+from pypff.sync import MANIFEST
+from pypff.sync import SeasonSync
+
+class Response:
+    def __init__(self, data):
+        self.text = json.dumps(data)
+        self.content = self.text.encode('utf-8')
+
+class Client:
+    cache = None
+    memory_cache = None
+
+    def __init__(self, games):
+        self.games = games
+
+    def _post(self, payload):
+        return Response({'data': {'competition': {'games': self.games}}})
+
+    def get_game_events_games(self, game_ids, **kwargs):
+        events = pd.DataFrame({'gameId': game_ids, 'gameEventId': range(len(game_ids))})
+        return events, {}
+
+GAMES = [
+    {'id': 1, 'date': '2020-08-01T19:00:00Z', 'season': '2020', 'startPeriod1': 0.0, 'endPeriod2': 6500.0},
+    # An old game without the end of the second half, i.e. still being collected
+    {'id': 2, 'date': '2020-08-02T19:00:00Z', 'season': '2020', 'startPeriod1': 0.0, 'endPeriod2': None},
+]
+
+def test_null_end_period(tmp_path):
+    season_sync = SeasonSync(Client(GAMES), tmp_path)
+    plan = season_sync.plan(1).set_index('id')
+    assert plan.loc[1, 'status'] == 'complete'
+    assert plan.loc[2, 'status'] == 'incomplete'
+
+    summary = season_sync.sync(1)
+    assert sorted(summary['fetched']) == [1, 2]
+    with open(os.path.join(tmp_path, MANIFEST), encoding = 'utf-8') as f:
+        manifest = json.loads(f.read(), parse_constant = _reject)
+    assert manifest['1/2020']['2']['endPeriod2'] is None
+
+    # Incomplete games are fetched again, but not reported as changed
+    plan = SeasonSync(Client(GAMES), tmp_path).plan(1).set_index('id')
+    assert plan.loc[1, 'action'] == 'up to date'
+    assert plan.loc[2, 'action'] == 'incomplete'
+
+def test_nan_in_old_manifest(tmp_path):
+    with open(os.path.join(tmp_path, MANIFEST), 'w', encoding = 'utf-8') as f:
+        f.write('{"1/2020": {"2": {"date": "2020-08-02T19:00:00Z", "endPeriod2": NaN, "status": "incomplete", "rows": 1}}}')
+    plan = SeasonSync(Client(GAMES), tmp_path).plan(1).set_index('id')
+    assert plan.loc[2, 'action'] == 'incomplete'
+
+def _reject(constant):
+    raise AssertionError(constant + ' in the manifest')